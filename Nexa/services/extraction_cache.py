@@ -0,0 +1,272 @@
+"""
+ExtractionCache
+---------------
+Content-addressed cache of extracted document text.
+
+Entries are keyed by the SHA-256 of the file bytes plus the extractor name and
+version, so re-uploading the same document (under any name, by any user) skips
+extraction entirely, while an extractor change invalidates only its own
+entries. Texts are stored zlib-compressed under the SHA-256 of the text itself,
+so identical outputs are kept on disk once no matter how many files map to
+them. Writes and reads are streamed; no full text is needed in memory.
+
+The cache is pruned at most once per PRUNE_INTERVAL when entries are added:
+entries unused for max_age are dropped, then the least recently used texts
+until the stored texts fit in max_bytes.
+"""
+
+import codecs
+import hashlib
+import os
+import sqlite3
+import tempfile
+import time
+import zlib
+from typing import Iterator, Optional
+
+
+# Bytes read per step when hashing files and decompressing texts.
+READ_BYTES = 1024 * 1024
+
+# Size and age limits (compressed bytes, seconds); 0 disables a limit.
+MAX_CACHE_BYTES = int(os.getenv("EXTRACTION_CACHE_MAX_MB", "2048")) * 1024 * 1024
+MAX_ENTRY_AGE = int(os.getenv("EXTRACTION_CACHE_MAX_AGE_DAYS", "90")) * 86400
+PRUNE_INTERVAL = 3600
+
+
+def file_digest(file_path: str) -> str:
+    """SHA-256 hex digest of a file, read incrementally."""
+    hasher = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(READ_BYTES), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+class ExtractionCacheWriter:
+    """
+    Streams one extraction result into the cache.
+
+    Nothing becomes visible until commit(); a writer closed without committing
+    (extraction failed or the consumer stopped early) leaves no trace.
+    """
+
+    def __init__(self, cache: "ExtractionCache", file_hash: str, extractor_key: str):
+        self.cache = cache
+        self.file_hash = file_hash
+        self.extractor_key = extractor_key
+        self._hasher = hashlib.sha256()
+        self._compressor = zlib.compressobj(6)
+        self._size = 0
+        fd, self._tmp_path = tempfile.mkstemp(dir=cache.texts_dir, suffix=".tmp")
+        self._file = os.fdopen(fd, "wb")
+
+    def write(self, text: str):
+        data = text.encode("utf-8")
+        self._hasher.update(data)
+        self._size += len(data)
+        self._file.write(self._compressor.compress(data))
+
+    def commit(self) -> str:
+        """Finish the entry and return the text hash it points to."""
+        self._file.write(self._compressor.flush())
+        self._file.close()
+        text_hash = self._hasher.hexdigest()
+        self.cache._adopt(self._tmp_path, text_hash, self._size)
+        self.cache._link(self.file_hash, self.extractor_key, text_hash)
+        self._tmp_path = None
+        self.cache._maybe_prune()
+        return text_hash
+
+    def close(self):
+        """Discard the entry unless it was committed."""
+        if self._tmp_path:
+            self._file.close()
+            os.remove(self._tmp_path)
+            self._tmp_path = None
+
+
+class ExtractionCache:
+    """Disk cache of extracted text keyed by file content hash and extractor version."""
+
+    def __init__(self, cache_dir: str, max_bytes: int = MAX_CACHE_BYTES, max_age: float = MAX_ENTRY_AGE):
+        """
+        Initialize the cache.
+
+        :param cache_dir: Directory holding the index database and compressed texts
+        :param max_bytes: Compressed size the stored texts are pruned down to (0: unlimited)
+        :param max_age: Seconds an entry may go unused before it is pruned (0: forever)
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._last_prune = 0.0
+        self.texts_dir = os.path.join(cache_dir, "texts")
+        self.db_path = os.path.join(cache_dir, "index.db")
+        os.makedirs(self.texts_dir, exist_ok=True)
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        conn = self._connect()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS extraction_entries (
+                file_hash TEXT NOT NULL,
+                extractor_key TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL,
+                PRIMARY KEY (file_hash, extractor_key)
+            );
+            CREATE INDEX IF NOT EXISTS idx_extraction_entries_text ON extraction_entries(text_hash);
+
+            CREATE TABLE IF NOT EXISTS extraction_texts (
+                text_hash TEXT PRIMARY KEY,
+                text_size INTEGER NOT NULL,
+                stored_size INTEGER NOT NULL,
+                created_at REAL NOT NULL
+            );
+        """)
+        conn.commit()
+        conn.close()
+
+    def _text_path(self, text_hash: str) -> str:
+        return os.path.join(self.texts_dir, text_hash[:2], f"{text_hash}.z")
+
+    # ---------------------------------------------------------------
+    # Reads
+    # ---------------------------------------------------------------
+
+    def lookup(self, file_hash: str, extractor_key: str) -> Optional[str]:
+        """Return the text hash cached for a file and extractor, or None."""
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT text_hash FROM extraction_entries WHERE file_hash = ? AND extractor_key = ?",
+            (file_hash, extractor_key),
+        ).fetchone()
+        if row:
+            conn.execute(
+                "UPDATE extraction_entries SET last_used_at = ? WHERE file_hash = ? AND extractor_key = ?",
+                (time.time(), file_hash, extractor_key),
+            )
+            conn.commit()
+        conn.close()
+        if row and os.path.exists(self._text_path(row["text_hash"])):
+            return row["text_hash"]
+        return None
+
+    def iter_text(self, text_hash: str) -> Iterator[str]:
+        """Stream a cached text back, decompressing as it goes."""
+        decompressor = zlib.decompressobj()
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        with open(self._text_path(text_hash), "rb") as f:
+            for block in iter(lambda: f.read(READ_BYTES), b""):
+                text = decoder.decode(decompressor.decompress(block))
+                if text:
+                    yield text
+        tail = decoder.decode(decompressor.flush(), final=True)
+        if tail:
+            yield tail
+
+    # ---------------------------------------------------------------
+    # Writes
+    # ---------------------------------------------------------------
+
+    def writer(self, file_hash: str, extractor_key: str) -> ExtractionCacheWriter:
+        """Start streaming a new extraction result for a file and extractor."""
+        return ExtractionCacheWriter(self, file_hash, extractor_key)
+
+    def _adopt(self, tmp_path: str, text_hash: str, text_size: int):
+        """Move a finished text into place, or drop it if the same text is already stored."""
+        path = self._text_path(text_hash)
+        if os.path.exists(path):
+            os.remove(tmp_path)
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        stored_size = os.path.getsize(tmp_path)
+        os.replace(tmp_path, path)
+
+        conn = self._connect()
+        conn.execute("""
+            INSERT OR IGNORE INTO extraction_texts (text_hash, text_size, stored_size, created_at)
+            VALUES (?, ?, ?, ?)
+        """, (text_hash, text_size, stored_size, time.time()))
+        conn.commit()
+        conn.close()
+
+    def _link(self, file_hash: str, extractor_key: str, text_hash: str):
+        now = time.time()
+        conn = self._connect()
+        conn.execute("""
+            INSERT OR REPLACE INTO extraction_entries
+            (file_hash, extractor_key, text_hash, created_at, last_used_at)
+            VALUES (?, ?, ?, ?, ?)
+        """, (file_hash, extractor_key, text_hash, now, now))
+        conn.commit()
+        conn.close()
+
+    # ---------------------------------------------------------------
+    # Eviction
+    # ---------------------------------------------------------------
+
+    def _maybe_prune(self):
+        if time.time() - self._last_prune >= PRUNE_INTERVAL:
+            self.prune()
+
+    def prune(self) -> int:
+        """Drop stale entries, then least recently used texts over max_bytes; returns texts removed."""
+        self._last_prune = time.time()
+        conn = self._connect()
+        try:
+            if self.max_age:
+                conn.execute(
+                    "DELETE FROM extraction_entries WHERE last_used_at < ?", (time.time() - self.max_age,)
+                )
+            if self.max_bytes:
+                total = conn.execute("SELECT COALESCE(SUM(stored_size), 0) FROM extraction_texts").fetchone()[0]
+                if total > self.max_bytes:
+                    # Texts by their most recent use; ones without entries sort first.
+                    texts = conn.execute("""
+                        SELECT t.text_hash, t.stored_size, MAX(e.last_used_at) AS used_at
+                        FROM extraction_texts t
+                        LEFT JOIN extraction_entries e ON e.text_hash = t.text_hash
+                        GROUP BY t.text_hash
+                        ORDER BY used_at
+                    """).fetchall()
+                    for row in texts:
+                        if total <= self.max_bytes:
+                            break
+                        conn.execute("DELETE FROM extraction_entries WHERE text_hash = ?", (row["text_hash"],))
+                        total -= row["stored_size"]
+            orphans = [row["text_hash"] for row in conn.execute("""
+                SELECT text_hash FROM extraction_texts
+                WHERE text_hash NOT IN (SELECT text_hash FROM extraction_entries)
+            """)]
+            conn.executemany("DELETE FROM extraction_texts WHERE text_hash = ?", [(h,) for h in orphans])
+            conn.commit()
+        finally:
+            conn.close()
+
+        # Rows go first, so a concurrent lookup never returns a text being removed.
+        for text_hash in orphans:
+            path = self._text_path(text_hash)
+            if os.path.exists(path):
+                os.remove(path)
+        return len(orphans)
+
+    def clear(self):
+        """Drop every entry and stored text."""
+        conn = self._connect()
+        rows = conn.execute("SELECT text_hash FROM extraction_texts").fetchall()
+        conn.execute("DELETE FROM extraction_entries")
+        conn.execute("DELETE FROM extraction_texts")
+        conn.commit()
+        conn.close()
+        for row in rows:
+            path = self._text_path(row["text_hash"])
+            if os.path.exists(path):
+                os.remove(path)
@@ -1,4 +1,5 @@
 # extractors/__init__.py
+from .base_extractor import BaseExtractor, ExtractionLimitError
 from .pdf_extractor import PDFExtractor
 from .docx_extractor import DocxExtractor
 from .csv_extractor import CSVExtractor
@@ -12,4 +13,5 @@ __all__ = [
     "PDFExtractor", "DocxExtractor", "CSVExtractor",
     "JSONExtractor", "TXTExtractor", "MarkdownExtractor",
     "YAMLExtractor", "TOMLExtractor",
+    "BaseExtractor", "ExtractionLimitError",
 ]
@@ -1,13 +1,106 @@
 # extractors/base_extractor.py
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+
+
+# Default upper bound for a chunk from iter_chunks(), in characters.
+DEFAULT_CHUNK_CHARS = 64 * 1024
+
+# Largest piece streaming extractors read at once (caps very long lines).
+READ_CHARS = 64 * 1024
+
+
+class ExtractionLimitError(ValueError):
+    """Raised when a file exceeds an extractor's size or page limits."""
+
+
+@dataclass
+class TextChunk:
+    """A bounded slice of extracted text; offset is its character position in the full text."""
+    offset: int
+    text: str
+
 
 class BaseExtractor(ABC):
     """Abstract base class for all extractors."""
 
+    # Placed between the pieces yielded by iter_text() to form the full text.
+    separator = ""
+
+    # Bump when an extractor's output changes so cached extractions are redone.
+    version = 1
+
     def __init__(self, file_path: str):
         self.file_path = file_path
 
+    def check_limits(self):
+        """Raise ExtractionLimitError if the file is over this extractor's limits."""
+
     @abstractmethod
     def extract_text(self) -> str:
         """Read file and return extracted plain text."""
         pass
+
+    def iter_text(self) -> Iterator[str]:
+        """
+        Yield extracted text piece by piece (e.g. one page at a time).
+        Extractors that can stream override this; the default yields extract_text() once.
+        """
+        yield self.extract_text()
+
+    def _iter_stripped(self) -> Iterator[str]:
+        """
+        Join iter_text() pieces with the separator and strip the ends, without
+        materializing the whole text. Trailing whitespace is held back until
+        more text follows, so the output matches a final str.strip().
+        """
+        started = False
+        pending = ""
+        for index, piece in enumerate(self.iter_text()):
+            if index:
+                piece = self.separator + piece
+            if not started:
+                piece = piece.lstrip()
+                if not piece:
+                    continue
+                started = True
+            body = piece.rstrip()
+            if body:
+                yield pending + body
+                pending = piece[len(body):]
+            else:
+                pending += piece
+
+    def iter_chunks(self, chunk_chars: int = DEFAULT_CHUNK_CHARS) -> Iterator[TextChunk]:
+        """
+        Yield the extracted text as chunks of at most chunk_chars characters.
+        Concatenating the chunk texts gives exactly extract_text().
+        """
+        return chunk_text(self._iter_stripped(), chunk_chars)
+
+    @classmethod
+    def cache_key(cls) -> str:
+        """Identifies this extractor's output format in the extraction cache."""
+        return f"{cls.__name__}:v{cls.version}"
+
+
+def chunk_text(pieces: Iterable[str], chunk_chars: int = DEFAULT_CHUNK_CHARS) -> Iterator[TextChunk]:
+    """Re-cut a stream of text pieces into TextChunks of at most chunk_chars characters."""
+    offset = 0
+    buffer = []
+    buffered = 0
+    for piece in pieces:
+        buffer.append(piece)
+        buffered += len(piece)
+        if buffered < chunk_chars:
+            continue
+        text = "".join(buffer)
+        cut = len(text) - len(text) % chunk_chars
+        for start in range(0, cut, chunk_chars):
+            yield TextChunk(offset, text[start:start + chunk_chars])
+            offset += chunk_chars
+        buffer = [text[cut:]] if cut < len(text) else []
+        buffered = len(text) - cut
+    if buffered:
+        yield TextChunk(offset, "".join(buffer))
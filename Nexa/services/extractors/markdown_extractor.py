@@ -1,15 +1,26 @@
 # extractors/markdown_extractor.py
+from typing import Iterator
+
 from .base_extractor import BaseExtractor
 import markdown
 import re
 
 
 class MarkdownExtractor(BaseExtractor):
-    def extract_text(self) -> str:
+    # v1 converted blank-line separated blocks on their own, which lost
+    # reference-style links and broke indented code and loose lists
+    version = 2
+
+    def iter_text(self) -> Iterator[str]:
+        # Markdown can't be converted piecewise without changing its meaning
+        # (link definitions may come last, lists and code span blank lines),
+        # so the document is converted in one pass
         with open(self.file_path, 'r', encoding='utf-8') as f:
             md = f.read()
         # Convert markdown to HTML then strip tags to get plain text
         html = markdown.markdown(md)
         # Simple HTML tag stripper
-        text = re.sub(r'<[^>]+>', '', html)
-        return text.strip()
+        yield re.sub(r'<[^>]+>', '', html)
+
+    def extract_text(self) -> str:
+        return "".join(self._iter_stripped())
@@ -1,8 +1,14 @@
 # extractors/txt_extractor.py
-from .base_extractor import BaseExtractor
+from typing import Iterator
+
+from .base_extractor import BaseExtractor, READ_CHARS
 
 
 class TXTExtractor(BaseExtractor):
-    def extract_text(self) -> str:
+    def iter_text(self) -> Iterator[str]:
+        """Yield the file line by line (very long lines in READ_CHARS pieces)."""
         with open(self.file_path, 'r', encoding='utf-8') as f:
-            return f.read().strip()
+            yield from iter(lambda: f.readline(READ_CHARS), "")
+
+    def extract_text(self) -> str:
+        return "".join(self._iter_stripped())
@@ -1,24 +1,101 @@
 """
 GitHubUserActivity
 ------------------
-Fetches and saves a complete summary of a user's GitHub activity for a given time window.
-Each activity type is stored in its own structured JSON file inside an output folder.
+Fetches a complete summary of a user's GitHub activity for a given time window.
+Activity is kept in an incremental SQLite store: each run fetches only the part of
+the window (or the events/gists newer than the high-water mark) not already stored,
+and summaries are computed locally. JSON files are written only on request.
 
 Features:
 - Commits, Pull Requests, Issues, Gists, Events, Repositories Worked On
 - Supports optional filtering by specific repositories
+- Incremental, deduplicated storage with per-kind sync state
+- Conditional requests (ETag / Last-Modified) served from a persistent local cache
+- GraphQL collector mode: commits, PRs, issues and contributions in batched,
+  cursor-paginated queries instead of one REST detail call per commit
 - PEP8 compliant, modular, and production-ready
 """
 
 import os
 import json
 import requests
-from typing import Dict, List, Optional
-from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from .github_cache import GitHubHTTPCache
+from .github_store import ALL_REPOS, GitHubActivityStore, utc_now_iso
+
+
+CONTRIBUTIONS_QUERY = """
+query($login: String!, $from: DateTime!, $to: DateTime!) {
+  user(login: $login) {
+    id
+    contributionsCollection(from: $from, to: $to) {
+      totalCommitContributions
+      totalPullRequestContributions
+      totalIssueContributions
+      commitContributionsByRepository(maxRepositories: 100) {
+        repository { name nameWithOwner owner { login } }
+        contributions(first: 100) { nodes { occurredAt commitCount } }
+      }
+    }
+  }
+}
+"""
+
+USER_ID_QUERY = """
+query($login: String!) { user(login: $login) { id } }
+"""
+
+SEARCH_QUERY = """
+query($prQuery: String!, $issueQuery: String!, $prCursor: String, $issueCursor: String,
+      $withPrs: Boolean!, $withIssues: Boolean!) {
+  prs: search(query: $prQuery, type: ISSUE, first: 100, after: $prCursor) @include(if: $withPrs) {
+    pageInfo { hasNextPage endCursor }
+    nodes {
+      ... on PullRequest { title state createdAt closedAt url repository { nameWithOwner } }
+    }
+  }
+  issues: search(query: $issueQuery, type: ISSUE, first: 100, after: $issueCursor) @include(if: $withIssues) {
+    pageInfo { hasNextPage endCursor }
+    nodes {
+      ... on Issue { title state createdAt closedAt url repository { nameWithOwner } }
+    }
+  }
+}
+"""
+
+# One aliased block per repository; filled in by _get_commits_graphql.
+COMMIT_HISTORY_BLOCK = """
+  {alias}: repository(owner: {owner}, name: {name}) {{
+    nameWithOwner
+    defaultBranchRef {{
+      target {{
+        ... on Commit {{
+          history(first: 100, after: {cursor}, since: $since, until: $until, author: {{id: $authorId}}) {{
+            pageInfo {{ hasNextPage endCursor }}
+            nodes {{
+              oid
+              message
+              additions
+              deletions
+              changedFiles
+              author {{ name email date }}
+              committer {{ name email date }}
+              parents(first: 5) {{ nodes {{ oid }} }}
+            }}
+          }}
+        }}
+      }}
+    }}
+  }}
+"""
+
+# Repositories per batched history query; keeps GraphQL node cost well under the limit.
+REPOS_PER_QUERY = 10
 
 
 class GitHubUserActivity:
-    """Collects comprehensive GitHub user activity within a given date range and saves it neatly."""
+    """Collects comprehensive GitHub user activity within a given date range into a local store."""
 
     def __init__(
         self,
@@ -26,7 +103,12 @@ class GitHubUserActivity:
         start_date: str,
         end_date: str,
         token: Optional[str] = None,
-        repos: Optional[List[str]] = None
+        repos: Optional[List[str]] = None,
+        cache_path: Optional[str] = None,
+        use_cache: bool = True,
+        mode: Optional[str] = None,
+        store_path: Optional[str] = None,
+        export_dir: Optional[str] = None
     ):
         """
         Initialize GitHubUserActivity.
@@ -36,6 +118,12 @@ class GitHubUserActivity:
         :param end_date: End date in 'YYYY-MM-DD'
         :param token: GitHub API key (Personal Access Token)
         :param repos: Optional list of repository names to filter (e.g., ['repo1', 'repo2'])
+        :param cache_path: SQLite file for the HTTP cache (defaults to GITHUB_CACHE_PATH or output/github_http_cache.db)
+        :param use_cache: Set to False to bypass the conditional-request cache
+        :param mode: 'rest' (default) or 'graphql' collector; defaults to GITHUB_COLLECTOR_MODE.
+                     GraphQL requires a token, and its commits carry no per-file details
+        :param store_path: SQLite file for collected activity (defaults to GITHUB_STORE_PATH or output/github_activity.db)
+        :param export_dir: Optional folder to also write the range as JSON files (one per activity type)
         """
         self.username = username
         self.start_date = start_date
@@ -49,29 +137,70 @@ class GitHubUserActivity:
         if token:
             self.headers["Authorization"] = f"Bearer {token}"
 
-        # Prepare output directory
-        folder_name = f"github_activity_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        self.output_dir = os.path.join(os.getcwd(), "output", folder_name)
-        os.makedirs(self.output_dir, exist_ok=True)
+        self.mode = (mode or os.getenv("GITHUB_COLLECTOR_MODE") or "rest").lower()
+        if self.mode not in ("graphql", "rest"):
+            raise ValueError(f"Unknown GitHub collector mode: {self.mode}")
+        if self.mode == "graphql" and not token:
+            raise ValueError("The graphql collector mode requires a GitHub token")
+        self.request_count = 0
+
+        self.cache = None
+        if use_cache:
+            cache_path = cache_path or os.getenv("GITHUB_CACHE_PATH") or os.path.join(
+                os.getcwd(), "output", "github_http_cache.db"
+            )
+            self.cache = GitHubHTTPCache(cache_path)
+
+        store_path = store_path or os.getenv("GITHUB_STORE_PATH") or os.path.join(
+            os.getcwd(), "output", "github_activity.db"
+        )
+        self.store = GitHubActivityStore(store_path)
+        self._user_id = None
+
+        # JSON export is opt-in; the store is the source of truth.
+        self.output_dir = export_dir
+        if self.output_dir:
+            os.makedirs(self.output_dir, exist_ok=True)
 
     # ---------------------------------------------------------------
     # Utility Methods
     # ---------------------------------------------------------------
 
     def _get(self, url: str, params: Optional[Dict] = None) -> requests.Response:
-        response = requests.get(url, headers=self.headers, params=params)
+        headers = self.headers
+        cache_key, entry = None, None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(url, params, self.headers.get("Authorization"))
+            entry = self.cache.lookup(cache_key)
+            if entry:
+                headers = {**self.headers, **self.cache.conditional_headers(entry)}
+
+        response = requests.get(url, headers=headers, params=params)
+        self.request_count += 1
+        if response.status_code == 304 and entry:
+            return self.cache.revalidated(cache_key, entry, response)
         if response.status_code != 200:
             raise RuntimeError(
                 f"GitHub API error {response.status_code} for {url}: {response.text}"
             )
+        if self.cache is not None:
+            self.cache.store(cache_key, response)
         return response
 
-    def _paginate(self, url: str, params: Optional[Dict] = None) -> List[Dict]:
+    def _paginate(self, url: str, params: Optional[Dict] = None,
+                  stop_when: Optional[Callable[[Dict], bool]] = None) -> List[Dict]:
+        """Follow Link headers; with stop_when, stop at (and drop) the first matching item."""
         results = []
         while url:
             resp = self._get(url, params)
             data = resp.json()
-            results.extend(data if isinstance(data, list) else [data])
+            page = data if isinstance(data, list) else [data]
+            if stop_when:
+                for i, item in enumerate(page):
+                    if stop_when(item):
+                        results.extend(page[:i])
+                        return results
+            results.extend(page)
             link = resp.headers.get("Link", "")
             next_url = None
             if 'rel="next"' in link:
@@ -83,7 +212,25 @@ class GitHubUserActivity:
             params = None
         return results
 
+    def _graphql(self, query: str, variables: Optional[Dict] = None) -> Dict:
+        response = requests.post(
+            self.graphql_url,
+            json={"query": query, "variables": variables or {}},
+            headers=self.headers,
+        )
+        self.request_count += 1
+        if response.status_code != 200:
+            raise RuntimeError(
+                f"GitHub GraphQL error {response.status_code}: {response.text}"
+            )
+        payload = response.json()
+        if payload.get("errors") and not payload.get("data"):
+            raise RuntimeError(f"GitHub GraphQL error: {payload['errors']}")
+        return payload.get("data") or {}
+
     def _save_json(self, data: Dict | List, filename: str):
+        if not self.output_dir:
+            return
         filepath = os.path.join(self.output_dir, filename)
         with open(filepath, "w", encoding="utf-8") as f:
             json.dump(data, f, indent=4)
@@ -92,15 +239,15 @@ class GitHubUserActivity:
     # ---------------------------------------------------------------
     # Feature Modules
     # ---------------------------------------------------------------
+    # Windowed fetchers take ISO 'since'/'until' timestamps and return
+    # normalized records; the orchestrator decides which windows to ask for.
 
     def _get_user_repos(self) -> List[Dict]:
         url = f"{self.api_base}/users/{self.username}/repos"
         params = {"per_page": 100, "type": "owner", "sort": "updated"}
         return self._paginate(url, params)
 
-    def _get_commits(self) -> List[Dict]:
-        since = f"{self.start_date}T00:00:00Z"
-        until = f"{self.end_date}T23:59:59Z"
+    def _get_commits(self, since: str, until: str) -> List[Dict]:
         repos = self._get_user_repos()
         commits_all = []
 
@@ -113,18 +260,13 @@ class GitHubUserActivity:
 
             url = f"{self.api_base}/repos/{owner}/{repo_name}/commits"
             params = {"author": self.username, "since": since, "until": until}
-            try:
-                commits = self._paginate(url, params)
-            except Exception:
-                continue
+            # A failed fetch propagates, so the window is not marked as synced.
+            commits = self._paginate(url, params)
 
             for c in commits:
                 sha = c["sha"]
                 detail_url = f"{self.api_base}/repos/{owner}/{repo_name}/commits/{sha}"
-                try:
-                    detail = self._get(detail_url).json()
-                except Exception:
-                    continue
+                detail = self._get(detail_url).json()
 
                 commits_all.append({
                     "repository": f"{owner}/{repo_name}",
@@ -137,16 +279,15 @@ class GitHubUserActivity:
                     "parents": [p["sha"] for p in detail.get("parents", [])],
                 })
 
-        self._save_json(commits_all, "commits.json")
         return commits_all
 
-    def _get_pull_requests(self) -> List[Dict]:
-        query = f"type:pr author:{self.username} created:{self.start_date}..{self.end_date}"
+    def _search_issues(self, item_type: str, since: str, until: str, field: str = "created") -> List[Dict]:
+        query = f"type:{item_type} author:{self.username} {field}:{since}..{until}"
         url = f"{self.api_base}/search/issues"
         params = {"q": query, "per_page": 50}
         response = self._get(url, params).json()
 
-        prs = [
+        return [
             {
                 "title": item["title"],
                 "state": item["state"],
@@ -158,34 +299,17 @@ class GitHubUserActivity:
             for item in response.get("items", [])
         ]
 
-        self._save_json(prs, "pull_requests.json")
-        return prs
-
-    def _get_issues(self) -> List[Dict]:
-        query = f"type:issue author:{self.username} created:{self.start_date}..{self.end_date}"
-        url = f"{self.api_base}/search/issues"
-        params = {"q": query, "per_page": 50}
-        response = self._get(url, params).json()
-
-        issues = [
-            {
-                "title": item["title"],
-                "state": item["state"],
-                "created_at": item["created_at"],
-                "closed_at": item.get("closed_at"),
-                "html_url": item["html_url"],
-                "repository_url": item["repository_url"],
-            }
-            for item in response.get("items", [])
-        ]
+    def _get_pull_requests(self, since: str, until: str) -> List[Dict]:
+        return self._search_issues("pr", since, until)
 
-        self._save_json(issues, "issues.json")
-        return issues
+    def _get_issues(self, since: str, until: str) -> List[Dict]:
+        return self._search_issues("issue", since, until)
 
-    def _get_gists(self) -> List[Dict]:
+    def _get_gists(self, since: Optional[str] = None) -> List[Dict]:
+        """Gists updated after 'since' (all gists when None)."""
         url = f"{self.api_base}/users/{self.username}/gists"
-        gists = self._paginate(url)
-        filtered = [
+        gists = self._paginate(url, {"since": since} if since else None)
+        return [
             {
                 "id": g["id"],
                 "description": g["description"],
@@ -195,82 +319,289 @@ class GitHubUserActivity:
                 "url": g["html_url"],
             }
             for g in gists
-            if self.start_date <= g["created_at"][:10] <= self.end_date
-            or self.start_date <= g["updated_at"][:10] <= self.end_date
         ]
 
-        self._save_json(filtered, "gists.json")
-        return filtered
-
-    def _get_events(self) -> List[Dict]:
+    def _get_events(self, after_id: Optional[str] = None) -> List[Dict]:
+        """Events newer than 'after_id'; the feed is newest-first, so paging stops there."""
         url = f"{self.api_base}/users/{self.username}/events"
-        events = self._paginate(url)
-        filtered = [
+        stop_when = (lambda e: int(e["id"]) <= int(after_id)) if after_id else None
+        events = self._paginate(url, stop_when=stop_when)
+        return [
             {
+                "id": e["id"],
                 "type": e["type"],
                 "repo": e["repo"]["name"],
                 "created_at": e["created_at"],
                 "payload": e["payload"],
             }
             for e in events
-            if self.start_date <= e["created_at"][:10] <= self.end_date
         ]
 
-        self._save_json(filtered, "events.json")
-        return filtered
-
-    def _get_repositories_worked_on(self) -> List[str]:
-        query = {
-            "query": f"""
-            {{
-              user(login: "{self.username}") {{
-                contributionsCollection(from: "{self.start_date}T00:00:00Z", to: "{self.end_date}T23:59:59Z") {{
-                  commitContributionsByRepository {{
-                    repository {{ nameWithOwner }}
-                  }}
-                }}
-              }}
-            }}
-            """
-        }
-        response = requests.post(self.graphql_url, json=query, headers=self.headers)
-        if response.status_code != 200:
+    def _get_contributions(self, since: str, until: str) -> List[Dict]:
+        """Per-day commit contribution counts by repository."""
+        # Counts are stored per day, so always ask for whole days.
+        data = self._graphql(CONTRIBUTIONS_QUERY, {
+            "login": self.username,
+            "from": f"{since[:10]}T00:00:00Z",
+            "to": f"{until[:10]}T23:59:59Z",
+        })
+        user = data.get("user") or {}
+        self._user_id = self._user_id or user.get("id")
+        collection = user.get("contributionsCollection") or {}
+
+        daily = []
+        for entry in collection.get("commitContributionsByRepository", []):
+            for node in (entry.get("contributions") or {}).get("nodes", []):
+                daily.append({
+                    "repository": entry["repository"]["nameWithOwner"],
+                    "day": node["occurredAt"][:10],
+                    "commit_count": node["commitCount"],
+                })
+        return daily
+
+    # ---------------------------------------------------------------
+    # GraphQL Collector
+    # ---------------------------------------------------------------
+
+    def _get_user_id(self) -> Optional[str]:
+        if not self._user_id:
+            data = self._graphql(USER_ID_QUERY, {"login": self.username})
+            self._user_id = (data.get("user") or {}).get("id")
+        return self._user_id
+
+    def _get_commits_graphql(self, since: str, until: str) -> List[Dict]:
+        user_id = self._get_user_id()
+        if not user_id:
             return []
-        data = response.json()
-        repos = (
-            data.get("data", {})
-            .get("user", {})
-            .get("contributionsCollection", {})
-            .get("commitContributionsByRepository", [])
-        )
-        repo_names = [r["repository"]["nameWithOwner"] for r in repos]
 
-        self._save_json(repo_names, "repositories_worked_on.json")
-        return repo_names
+        # Only repositories with contributions in the window can hold matching commits.
+        repositories = []
+        for name_with_owner in self.store.repositories_worked_on(self.username, since[:10], until[:10]):
+            owner, name = name_with_owner.split("/", 1)
+            if not self.repos or name.lower() in self.repos:
+                repositories.append({"name": name, "nameWithOwner": name_with_owner, "owner": {"login": owner}})
+
+        # Each pending entry is (repository, cursor); a repository stays pending while
+        # its history has more pages, and all pending ones are fetched in one query.
+        pending = [(repo, None) for repo in repositories]
+        commits_all = []
+
+        while pending:
+            batch, pending = pending[:REPOS_PER_QUERY], pending[REPOS_PER_QUERY:]
+            blocks = [
+                COMMIT_HISTORY_BLOCK.format(
+                    alias=f"r{i}",
+                    owner=json.dumps(repo["owner"]["login"]),
+                    name=json.dumps(repo["name"]),
+                    cursor=json.dumps(cursor),
+                )
+                for i, (repo, cursor) in enumerate(batch)
+            ]
+            query = (
+                "query($since: GitTimestamp!, $until: GitTimestamp!, $authorId: ID!) {"
+                + "".join(blocks) + "}"
+            )
+            data = self._graphql(query, {"since": since, "until": until, "authorId": user_id})
+
+            for i, (repo, _) in enumerate(batch):
+                node = data.get(f"r{i}") or {}
+                target = (node.get("defaultBranchRef") or {}).get("target") or {}
+                history = target.get("history")
+                if not history:
+                    continue
+
+                for c in history.get("nodes", []):
+                    commits_all.append({
+                        "repository": node.get("nameWithOwner", repo["nameWithOwner"]),
+                        "sha": c["oid"],
+                        "message": c["message"],
+                        "author": c["author"],
+                        "committer": c["committer"],
+                        "stats": {
+                            "additions": c["additions"],
+                            "deletions": c["deletions"],
+                            "total": c["additions"] + c["deletions"],
+                        },
+                        # GraphQL exposes a changed-file count, not per-file patches.
+                        "files": [],
+                        "changed_files": c["changedFiles"],
+                        "parents": [p["oid"] for p in c["parents"]["nodes"]],
+                    })
+
+                page_info = history["pageInfo"]
+                if page_info["hasNextPage"]:
+                    pending.append((repo, page_info["endCursor"]))
+
+        return commits_all
+
+    def _get_pull_requests_and_issues_graphql(self, since: str, until: str,
+                                              with_prs: bool = True,
+                                              with_issues: bool = True,
+                                              field: str = "created") -> Dict[str, List[Dict]]:
+        date_range = f"{field}:{since}..{until}"
+        variables = {
+            "prQuery": f"type:pr author:{self.username} {date_range}",
+            "issueQuery": f"type:issue author:{self.username} {date_range}",
+            "prCursor": None,
+            "issueCursor": None,
+            "withPrs": with_prs,
+            "withIssues": with_issues,
+        }
+        collected = {"prs": [], "issues": []}
+
+        while variables["withPrs"] or variables["withIssues"]:
+            data = self._graphql(SEARCH_QUERY, variables)
+            for alias, flag, cursor in (("prs", "withPrs", "prCursor"), ("issues", "withIssues", "issueCursor")):
+                if not variables[flag]:
+                    continue
+                result = data.get(alias) or {"nodes": [], "pageInfo": {"hasNextPage": False}}
+                for item in result["nodes"]:
+                    if not item:
+                        continue
+                    collected[alias].append({
+                        "title": item["title"],
+                        # REST reports merged pull requests as closed.
+                        "state": "closed" if item["state"] == "MERGED" else item["state"].lower(),
+                        "created_at": item["createdAt"],
+                        "closed_at": item.get("closedAt"),
+                        "html_url": item["url"],
+                        "repository_url": f"{self.api_base}/repos/{item['repository']['nameWithOwner']}",
+                    })
+                variables[flag] = result["pageInfo"]["hasNextPage"]
+                variables[cursor] = result["pageInfo"].get("endCursor")
+
+        return {"pull_requests": collected["prs"], "issues": collected["issues"]}
+
+    # ---------------------------------------------------------------
+    # Incremental sync
+    # ---------------------------------------------------------------
+
+    def _window(self) -> tuple:
+        return f"{self.start_date}T00:00:00Z", f"{self.end_date}T23:59:59Z"
+
+    def _missing(self, kind: str, scope: str = ALL_REPOS) -> List[tuple]:
+        return self.store.missing_ranges(self.username, kind, scope, *self._window())
+
+    def _sync_window(self, kind: str, fetch: Callable, save: Callable, scope: str = ALL_REPOS):
+        """Fetch, store and mark covered every part of the window not yet synced for a kind."""
+        for since, until in self._missing(kind, scope):
+            save(fetch(since, until))
+            self.store.mark_synced(self.username, kind, scope, since, until)
+
+    def _sync_search_graphql(self):
+        # One search query serves both kinds; only ask for the kinds each window lacks.
+        pr_ranges, issue_ranges = self._missing("pull_requests"), self._missing("issues")
+        for since, until in dict.fromkeys(pr_ranges + issue_ranges):
+            with_prs, with_issues = (since, until) in pr_ranges, (since, until) in issue_ranges
+            found = self._get_pull_requests_and_issues_graphql(since, until, with_prs, with_issues)
+            for kind, wanted in (("pull_requests", with_prs), ("issues", with_issues)):
+                if wanted:
+                    self.store.upsert_search_items(self.username, kind, found[kind])
+                    self.store.mark_synced(self.username, kind, ALL_REPOS, since, until)
+
+    def _sync_search_updates(self, started: str):
+        """Refresh pull requests and issues updated since the previous sync (e.g. merged, closed)."""
+        mark = self.store.get_high_water_mark(self.username, "search_updates")
+        # On the first sync the window fetches just returned the current state.
+        if mark:
+            if self.mode == "graphql":
+                found = self._get_pull_requests_and_issues_graphql(mark, started, field="updated")
+            else:
+                found = {
+                    "pull_requests": self._search_issues("pr", mark, started, field="updated"),
+                    "issues": self._search_issues("issue", mark, started, field="updated"),
+                }
+            for kind, items in found.items():
+                self.store.upsert_search_items(self.username, kind, items)
+        self.store.set_high_water_mark(self.username, "search_updates", started)
+
+    def _sync_gists(self):
+        mark = self.store.get_high_water_mark(self.username, "gists")
+        gists = self._get_gists(since=mark)
+        self.store.upsert_gists(self.username, gists)
+        if gists:
+            self.store.set_high_water_mark(self.username, "gists", max(g["updated_at"] for g in gists))
+
+    def _sync_events(self):
+        mark = self.store.get_high_water_mark(self.username, "events")
+        events = self._get_events(after_id=mark)
+        self.store.upsert_events(self.username, events)
+        if events:
+            self.store.set_high_water_mark(self.username, "events", max(events, key=lambda e: int(e["id"]))["id"])
+
+    def _sync(self):
+        username = self.username
+        # Commit coverage depends on the repository filter, so it is tracked per filter.
+        commit_scope = ",".join(sorted(self.repos)) if self.repos else ALL_REPOS
+
+        started = utc_now_iso()
+
+        try:
+            self._sync_window(
+                "contributions", self._get_contributions,
+                lambda rows: self.store.upsert_contributions(username, rows),
+            )
+        except RuntimeError as e:
+            # GraphQL needs a token with access to it; the REST collector still works without.
+            if self.mode == "graphql":
+                raise
+            print(f"⚠️ Contributions unavailable, listing repositories from commits instead: {e}")
+
+        if self.mode == "graphql":
+            self._sync_window(
+                "commits", self._get_commits_graphql,
+                lambda rows: self.store.upsert_commits(username, rows), scope=commit_scope,
+            )
+            self._sync_search_graphql()
+        else:
+            self._sync_window(
+                "commits", self._get_commits,
+                lambda rows: self.store.upsert_commits(username, rows), scope=commit_scope,
+            )
+            self._sync_window(
+                "pull_requests", self._get_pull_requests,
+                lambda rows: self.store.upsert_search_items(username, "pull_requests", rows),
+            )
+            self._sync_window(
+                "issues", self._get_issues,
+                lambda rows: self.store.upsert_search_items(username, "issues", rows),
+            )
+
+        self._sync_search_updates(started)
+        self._sync_gists()
+        self._sync_events()
 
     # ---------------------------------------------------------------
     # Orchestrator
     # ---------------------------------------------------------------
 
     def get_user_activity(self) -> Dict:
-        """Collect all data and save in separate files. Returns a summary."""
+        """Sync the store for the date range and return a summary computed from it."""
         print(f"\n Collecting GitHub activity for @{self.username} ({self.start_date} → {self.end_date})")
 
+        self._sync()
+        activity = self.store.query_activity(self.username, self.start_date, self.end_date, self.repos)
+
         summary = {
             "username": self.username,
             "date_range": {"start": self.start_date, "end": self.end_date},
             "repositories_filter": self.repos if self.repos else "All repositories",
-            "repositories_worked_on": self._get_repositories_worked_on(),
-            "commits": len(self._get_commits()),
-            "pull_requests": len(self._get_pull_requests()),
-            "issues": len(self._get_issues()),
-            "gists": len(self._get_gists()),
-            "events": len(self._get_events()),
-            "output_folder": self.output_dir
+            "repositories_worked_on": activity["repositories_worked_on"],
+            "commits": len(activity["commits"]),
+            "pull_requests": len(activity["pull_requests"]),
+            "issues": len(activity["issues"]),
+            "gists": len(activity["gists"]),
+            "events": len(activity["events"]),
+            "collector": self.mode,
+            "store_path": self.store.db_path,
+            "output_folder": self.output_dir,
         }
 
-        self._save_json(summary, "summary.json")
-        print("\n All data successfully saved in:", self.output_dir)
+        if self.output_dir:
+            for kind, data in activity.items():
+                self._save_json(data, f"{kind}.json")
+            self._save_json(summary, "summary.json")
+            print("\n All data successfully saved in:", self.output_dir)
         return summary
 
 
@@ -0,0 +1,165 @@
+"""
+GitHubHTTPCache
+---------------
+Persistent conditional-request cache for GitHub REST calls.
+
+Responses carrying an ETag or Last-Modified header are stored in a small SQLite
+database together with their body and the headers we rely on (pagination links).
+Later requests for the same URL send If-None-Match / If-Modified-Since, and a
+304 Not Modified is answered from the stored body. GitHub does not count 304s
+against the rate limit, so unchanged data costs neither bandwidth nor budget.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+# Only these response headers are persisted; everything else is transport noise.
+CACHED_HEADERS = ("ETag", "Last-Modified", "Link", "Content-Type")
+
+
+class GitHubHTTPCache:
+    """SQLite-backed store of validators and bodies for conditional GitHub requests."""
+
+    def __init__(self, db_path: str):
+        """
+        Initialize the cache.
+
+        :param db_path: Path to the SQLite file holding cached responses
+        """
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        conn = self._connect()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS http_cache (
+                cache_key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                stored_at REAL NOT NULL,
+                validated_at REAL NOT NULL
+            )
+        """)
+        conn.commit()
+        conn.close()
+
+    # ---------------------------------------------------------------
+    # Keys and lookups
+    # ---------------------------------------------------------------
+
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict] = None, authorization: Optional[str] = None) -> str:
+        """
+        Build the cache key for a request.
+
+        The token is folded in as a fingerprint so that callers with different
+        credentials (and therefore different visibility) never share entries.
+        """
+        token_fp = hashlib.sha256((authorization or "").encode()).hexdigest()[:16]
+        canonical_params = json.dumps(params or {}, sort_keys=True, default=str)
+        raw = f"{url}|{canonical_params}|{token_fp}"
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def lookup(self, cache_key: str) -> Optional[Dict]:
+        """Return the stored entry for a key, or None."""
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT * FROM http_cache WHERE cache_key = ?", (cache_key,)
+        ).fetchone()
+        conn.close()
+        return dict(row) if row else None
+
+    @staticmethod
+    def conditional_headers(entry: Dict) -> Dict[str, str]:
+        """Validators to send with a revalidation request."""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    # ---------------------------------------------------------------
+    # Writes
+    # ---------------------------------------------------------------
+
+    def store(self, cache_key: str, response: requests.Response):
+        """Persist a 200 response if it carries a validator."""
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+
+        headers = {
+            name: response.headers[name]
+            for name in CACHED_HEADERS
+            if name in response.headers
+        }
+        now = time.time()
+        conn = self._connect()
+        conn.execute("""
+            INSERT OR REPLACE INTO http_cache
+            (cache_key, url, etag, last_modified, headers, body, stored_at, validated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (cache_key, response.url, etag, last_modified, json.dumps(headers),
+              response.content, now, now))
+        conn.commit()
+        conn.close()
+
+    def revalidated(self, cache_key: str, entry: Dict, not_modified: requests.Response) -> requests.Response:
+        """
+        Record a 304 for an entry and return the cached response it stands for.
+
+        A 304 may carry a fresh ETag; it replaces the stored one.
+        """
+        etag = not_modified.headers.get("ETag") or entry.get("etag")
+        last_modified = not_modified.headers.get("Last-Modified") or entry.get("last_modified")
+        headers = json.loads(entry["headers"])
+        if etag:
+            headers["ETag"] = etag
+        if last_modified:
+            headers["Last-Modified"] = last_modified
+
+        conn = self._connect()
+        conn.execute("""
+            UPDATE http_cache
+            SET etag = ?, last_modified = ?, headers = ?, validated_at = ?
+            WHERE cache_key = ?
+        """, (etag, last_modified, json.dumps(headers), time.time(), cache_key))
+        conn.commit()
+        conn.close()
+
+        cached = requests.Response()
+        cached.status_code = 200
+        cached._content = entry["body"]
+        cached.headers = CaseInsensitiveDict(headers)
+        cached.url = entry["url"]
+        cached.encoding = "utf-8"
+        cached.request = not_modified.request
+        return cached
+
+    def clear(self):
+        """Drop every cached entry."""
+        conn = self._connect()
+        conn.execute("DELETE FROM http_cache")
+        conn.commit()
+        conn.close()
@@ -0,0 +1,448 @@
+"""
+GitHubActivityStore
+-------------------
+Persistent SQLite store for collected GitHub activity.
+
+Commits, pull requests, issues, gists, events and per-day repository
+contributions are upserted by their natural keys (sha, URL, id), so repeated
+collections never duplicate rows. A per-user sync state records which time
+window has already been fetched for each activity kind (the high-water mark),
+which lets the collector request only what is new and compute range summaries
+locally with SQL.
+"""
+
+import json
+import os
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+
+# Scope used for kinds that are not affected by a repository filter.
+ALL_REPOS = "*"
+
+# Windows closer than this to the covered window are fetched up to it, so
+# coverage stays one contiguous window across consecutive daily requests.
+ADJACENCY = timedelta(days=1)
+
+# Activity can still change after it was fetched: commits are pushed days
+# after their committer date, contribution counts grow. The last part of the
+# coverage before each sync is therefore fetched again on the next one.
+RESYNC_OVERLAP = timedelta(days=int(os.getenv("GITHUB_RESYNC_DAYS", "3")))
+
+ISO_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def utc_now_iso() -> str:
+    """Current UTC time in the ISO-8601 form GitHub uses ('YYYY-MM-DDTHH:MM:SSZ')."""
+    return datetime.now(timezone.utc).strftime(ISO_FORMAT)
+
+
+def to_utc_iso(timestamp: Optional[str]) -> Optional[str]:
+    """Normalize an ISO-8601 timestamp with any offset to UTC 'Z' form so rows compare as text."""
+    if not timestamp:
+        return timestamp
+    parsed = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).strftime(ISO_FORMAT)
+
+
+def _touches(since: str, until: str, covered_from: str, covered_to: str) -> bool:
+    """Whether [since, until] overlaps or lies within ADJACENCY of the covered window."""
+    gap_after = datetime.strptime(since, ISO_FORMAT) - datetime.strptime(covered_to, ISO_FORMAT)
+    gap_before = datetime.strptime(covered_from, ISO_FORMAT) - datetime.strptime(until, ISO_FORMAT)
+    return gap_after <= ADJACENCY and gap_before <= ADJACENCY
+
+
+class GitHubActivityStore:
+    """Incremental, deduplicated storage of GitHub activity keyed by user."""
+
+    def __init__(self, db_path: str):
+        """
+        Initialize the store.
+
+        :param db_path: Path to the SQLite database file
+        """
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        conn = self._connect()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS gh_commits (
+                username TEXT NOT NULL,
+                sha TEXT NOT NULL,
+                repository TEXT NOT NULL,
+                repo_name TEXT NOT NULL,
+                committed_at TEXT,
+                message TEXT,
+                author TEXT,
+                committer TEXT,
+                stats TEXT,
+                files TEXT,
+                changed_files INTEGER,
+                parents TEXT,
+                PRIMARY KEY (username, sha)
+            );
+            CREATE INDEX IF NOT EXISTS idx_gh_commits_time ON gh_commits(username, committed_at);
+
+            CREATE TABLE IF NOT EXISTS gh_pull_requests (
+                username TEXT NOT NULL,
+                html_url TEXT NOT NULL,
+                title TEXT,
+                state TEXT,
+                created_at TEXT,
+                closed_at TEXT,
+                repository_url TEXT,
+                PRIMARY KEY (username, html_url)
+            );
+            CREATE INDEX IF NOT EXISTS idx_gh_prs_time ON gh_pull_requests(username, created_at);
+
+            CREATE TABLE IF NOT EXISTS gh_issues (
+                username TEXT NOT NULL,
+                html_url TEXT NOT NULL,
+                title TEXT,
+                state TEXT,
+                created_at TEXT,
+                closed_at TEXT,
+                repository_url TEXT,
+                PRIMARY KEY (username, html_url)
+            );
+            CREATE INDEX IF NOT EXISTS idx_gh_issues_time ON gh_issues(username, created_at);
+
+            CREATE TABLE IF NOT EXISTS gh_gists (
+                username TEXT NOT NULL,
+                id TEXT NOT NULL,
+                description TEXT,
+                created_at TEXT,
+                updated_at TEXT,
+                public INTEGER,
+                url TEXT,
+                PRIMARY KEY (username, id)
+            );
+
+            CREATE TABLE IF NOT EXISTS gh_events (
+                username TEXT NOT NULL,
+                id TEXT NOT NULL,
+                type TEXT,
+                repo TEXT,
+                created_at TEXT,
+                payload TEXT,
+                PRIMARY KEY (username, id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_gh_events_time ON gh_events(username, created_at);
+
+            CREATE TABLE IF NOT EXISTS gh_contributions (
+                username TEXT NOT NULL,
+                repository TEXT NOT NULL,
+                day TEXT NOT NULL,
+                commit_count INTEGER NOT NULL,
+                PRIMARY KEY (username, repository, day)
+            );
+
+            CREATE TABLE IF NOT EXISTS gh_sync_state (
+                username TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                scope TEXT NOT NULL,
+                synced_from TEXT,
+                synced_to TEXT,
+                high_water_mark TEXT,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (username, kind, scope)
+            );
+        """)
+        conn.commit()
+        conn.close()
+
+    # ---------------------------------------------------------------
+    # Sync state
+    # ---------------------------------------------------------------
+
+    def _get_state(self, username: str, kind: str, scope: str) -> Optional[sqlite3.Row]:
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT * FROM gh_sync_state WHERE username = ? AND kind = ? AND scope = ?",
+            (username, kind, scope),
+        ).fetchone()
+        conn.close()
+        return row
+
+    def missing_ranges(self, username: str, kind: str, scope: str,
+                       since: str, until: str) -> List[Tuple[str, str]]:
+        """
+        Return the (since, until) windows that still have to be fetched.
+
+        Coverage is tracked as one contiguous window per user, kind and scope.
+        Windows overlapping or adjacent to the coverage only fetch the
+        uncovered edges (bridging any small gap); a distant window is fetched
+        whole. Nothing later than now is ever considered covered, so the
+        current day keeps refreshing, and the last RESYNC_OVERLAP before the
+        previous sync is fetched again.
+        """
+        until = min(until, utc_now_iso())
+        if since > until:
+            return []
+
+        state = self._get_state(username, kind, scope)
+        if not state or not state["synced_from"]:
+            return [(since, until)]
+
+        covered_from = state["synced_from"]
+        settled = datetime.strptime(state["updated_at"], ISO_FORMAT) - RESYNC_OVERLAP
+        covered_to = min(state["synced_to"], settled.strftime(ISO_FORMAT))
+        if covered_to <= covered_from or not _touches(since, until, covered_from, covered_to):
+            return [(since, until)]
+
+        ranges = []
+        if since < covered_from:
+            ranges.append((since, covered_from))
+        if until > covered_to:
+            ranges.append((covered_to, until))
+        return ranges
+
+    def mark_synced(self, username: str, kind: str, scope: str, since: str, until: str):
+        """Record that [since, until] has been fully fetched, merging with existing coverage."""
+        until = min(until, utc_now_iso())
+        if since > until:
+            return
+        state = self._get_state(username, kind, scope)
+        if state and state["synced_from"] and _touches(since, until, state["synced_from"], state["synced_to"]):
+            since = min(since, state["synced_from"])
+            until = max(until, state["synced_to"])
+
+        conn = self._connect()
+        conn.execute("""
+            INSERT INTO gh_sync_state (username, kind, scope, synced_from, synced_to, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(username, kind, scope)
+            DO UPDATE SET synced_from = excluded.synced_from,
+                          synced_to = excluded.synced_to,
+                          updated_at = excluded.updated_at
+        """, (username, kind, scope, since, until, utc_now_iso()))
+        conn.commit()
+        conn.close()
+
+    def get_high_water_mark(self, username: str, kind: str) -> Optional[str]:
+        """Return the id/timestamp high-water mark for id-ordered kinds (events, gists)."""
+        state = self._get_state(username, kind, ALL_REPOS)
+        return state["high_water_mark"] if state else None
+
+    def set_high_water_mark(self, username: str, kind: str, mark: str):
+        conn = self._connect()
+        conn.execute("""
+            INSERT INTO gh_sync_state (username, kind, scope, high_water_mark, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(username, kind, scope)
+            DO UPDATE SET high_water_mark = excluded.high_water_mark,
+                          updated_at = excluded.updated_at
+        """, (username, kind, ALL_REPOS, mark, utc_now_iso()))
+        conn.commit()
+        conn.close()
+
+    # ---------------------------------------------------------------
+    # Upserts
+    # ---------------------------------------------------------------
+
+    def upsert_commits(self, username: str, commits: List[Dict]):
+        rows = [
+            (
+                username,
+                c["sha"],
+                c["repository"],
+                c["repository"].split("/")[-1].lower(),
+                to_utc_iso((c.get("committer") or {}).get("date")),
+                c.get("message"),
+                json.dumps(c.get("author")),
+                json.dumps(c.get("committer")),
+                json.dumps(c.get("stats", {})),
+                json.dumps(c.get("files", [])),
+                c.get("changed_files", len(c.get("files", []))),
+                json.dumps(c.get("parents", [])),
+            )
+            for c in commits
+        ]
+        self._executemany("""
+            INSERT OR REPLACE INTO gh_commits
+            (username, sha, repository, repo_name, committed_at, message, author, committer,
+             stats, files, changed_files, parents)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+
+    def upsert_search_items(self, username: str, kind: str, items: List[Dict]):
+        """Upsert pull requests (kind='pull_requests') or issues (kind='issues')."""
+        table = {"pull_requests": "gh_pull_requests", "issues": "gh_issues"}[kind]
+        rows = [
+            (username, i["html_url"], i["title"], i["state"], i["created_at"],
+             i.get("closed_at"), i["repository_url"])
+            for i in items
+        ]
+        self._executemany(f"""
+            INSERT OR REPLACE INTO {table}
+            (username, html_url, title, state, created_at, closed_at, repository_url)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+
+    def upsert_gists(self, username: str, gists: List[Dict]):
+        rows = [
+            (username, g["id"], g["description"], g["created_at"], g["updated_at"],
+             int(bool(g["public"])), g["url"])
+            for g in gists
+        ]
+        self._executemany("""
+            INSERT OR REPLACE INTO gh_gists
+            (username, id, description, created_at, updated_at, public, url)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+
+    def upsert_events(self, username: str, events: List[Dict]):
+        rows = [
+            (username, str(e["id"]), e["type"], e["repo"], e["created_at"], json.dumps(e["payload"]))
+            for e in events
+        ]
+        self._executemany("""
+            INSERT OR REPLACE INTO gh_events (username, id, type, repo, created_at, payload)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, rows)
+
+    def upsert_contributions(self, username: str, contributions: List[Dict]):
+        """Upsert per-day commit counts: dicts with 'repository', 'day' and 'commit_count'."""
+        rows = [
+            (username, c["repository"], c["day"], c["commit_count"])
+            for c in contributions
+        ]
+        self._executemany("""
+            INSERT OR REPLACE INTO gh_contributions (username, repository, day, commit_count)
+            VALUES (?, ?, ?, ?)
+        """, rows)
+
+    def _executemany(self, sql: str, rows: List[Tuple]):
+        if not rows:
+            return
+        conn = self._connect()
+        conn.executemany(sql, rows)
+        conn.commit()
+        conn.close()
+
+    # ---------------------------------------------------------------
+    # Range queries
+    # ---------------------------------------------------------------
+
+    def repositories_worked_on(self, username: str, start_date: str, end_date: str) -> List[str]:
+        """Repositories ('owner/name') with commit contributions in a date range, busiest first."""
+        conn = self._connect()
+        rows = conn.execute("""
+            SELECT repository FROM gh_contributions
+            WHERE username = ? AND day BETWEEN ? AND ?
+            GROUP BY repository
+            ORDER BY SUM(commit_count) DESC, repository
+        """, (username, start_date, end_date)).fetchall()
+        conn.close()
+        return [r["repository"] for r in rows]
+
+    def query_activity(self, username: str, start_date: str, end_date: str,
+                       repos: Optional[List[str]] = None) -> Dict[str, List]:
+        """
+        Return stored activity for a date range in the collector's output shape.
+
+        :param start_date: Inclusive start date 'YYYY-MM-DD'
+        :param end_date: Inclusive end date 'YYYY-MM-DD'
+        :param repos: Optional lower-cased repository names filtering commits
+        """
+        since, until = f"{start_date}T00:00:00Z", f"{end_date}T23:59:59Z"
+        conn = self._connect()
+
+        repo_clause, repo_params = "", []
+        if repos:
+            repo_clause = f" AND repo_name IN ({', '.join('?' for _ in repos)})"
+            repo_params = list(repos)
+
+        commits = [
+            {
+                "repository": r["repository"],
+                "sha": r["sha"],
+                "message": r["message"],
+                "author": json.loads(r["author"]),
+                "committer": json.loads(r["committer"]),
+                "stats": json.loads(r["stats"]),
+                "files": json.loads(r["files"]),
+                "parents": json.loads(r["parents"]),
+            }
+            for r in conn.execute(
+                "SELECT * FROM gh_commits WHERE username = ? AND committed_at BETWEEN ? AND ?"
+                + repo_clause + " ORDER BY committed_at",
+                [username, since, until] + repo_params,
+            )
+        ]
+
+        search = {}
+        for kind, table in (("pull_requests", "gh_pull_requests"), ("issues", "gh_issues")):
+            search[kind] = [
+                {
+                    "title": r["title"],
+                    "state": r["state"],
+                    "created_at": r["created_at"],
+                    "closed_at": r["closed_at"],
+                    "html_url": r["html_url"],
+                    "repository_url": r["repository_url"],
+                }
+                for r in conn.execute(
+                    f"SELECT * FROM {table} WHERE username = ? AND created_at BETWEEN ? AND ? "
+                    "ORDER BY created_at",
+                    (username, since, until),
+                )
+            ]
+
+        gists = [
+            {
+                "id": r["id"],
+                "description": r["description"],
+                "created_at": r["created_at"],
+                "updated_at": r["updated_at"],
+                "public": bool(r["public"]),
+                "url": r["url"],
+            }
+            for r in conn.execute("""
+                SELECT * FROM gh_gists
+                WHERE username = ?
+                  AND (substr(created_at, 1, 10) BETWEEN ? AND ?
+                       OR substr(updated_at, 1, 10) BETWEEN ? AND ?)
+                ORDER BY created_at
+            """, (username, start_date, end_date, start_date, end_date))
+        ]
+
+        events = [
+            {
+                "type": r["type"],
+                "repo": r["repo"],
+                "created_at": r["created_at"],
+                "payload": json.loads(r["payload"]),
+            }
+            for r in conn.execute(
+                "SELECT * FROM gh_events WHERE username = ? AND created_at BETWEEN ? AND ? "
+                "ORDER BY created_at DESC",
+                (username, since, until),
+            )
+        ]
+
+        conn.close()
+        repositories = self.repositories_worked_on(username, start_date, end_date)
+        if not repositories:
+            # No contribution data (e.g. a token without GraphQL access)
+            repositories = list(dict.fromkeys(c["repository"] for c in commits))
+        return {
+            "repositories_worked_on": repositories,
+            "commits": commits,
+            "pull_requests": search["pull_requests"],
+            "issues": search["issues"],
+            "gists": gists,
+            "events": events,
+        }
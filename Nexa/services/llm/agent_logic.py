@@ -34,18 +34,30 @@ def get_prompt(file):
     prompt = prompt.replace("{", "{{").replace("}", "}}")
     return prompt
 
-def get_llm(model_name: str, base_url: Optional[str] = None, api_key: Optional[str] = None):
-    """Dynamically loads and returns the appropriate LLM based on the model name."""
+def get_llm(model_name: str, base_url: Optional[str] = None, api_key: Optional[str] = None,
+            json_mode: bool = False):
+    """
+    Dynamically loads and returns the appropriate LLM based on the model name.
+
+    With json_mode the provider is told to emit a single JSON value (Gemini
+    response_mime_type, Ollama format="json") instead of free text.
+    """
     if model_name.startswith("gemini"):
         from langchain_google_genai import ChatGoogleGenerativeAI
         if api_key is None:
             raise ValueError("API key is required for Gemini models.")
+        if json_mode:
+            return ChatGoogleGenerativeAI(
+                model=model_name, google_api_key=api_key, response_mime_type="application/json"
+            )
         return ChatGoogleGenerativeAI(model=model_name, google_api_key=api_key)
     else:
         # Assume local model via Ollama
         from langchain_ollama import OllamaLLM as Ollama
         if base_url is None:
             base_url = "http://host.docker.internal:11434"  # Default base URL
+        if json_mode:
+            return Ollama(model=model_name, base_url=base_url, format="json")
         return Ollama(model=model_name, base_url=base_url)
 
 def get_query_generator_chain(model_name: str, base_url: Optional[str] = None, api_key: Optional[str] = None):
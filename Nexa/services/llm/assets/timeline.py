@@ -20,6 +20,6 @@ class EmployeeSummary(BaseModel):
 
 class ProjectTimelineOutput(BaseModel):
     project_name: str = Field(..., description="Name of the project")
-    timeline_image_path: str = Field(..., description="Path to the saved timeline chart image")
+    timeline_image_path: Optional[str] = Field(None, description="Path of the rendered timeline chart (set by the server)")
     milestones: List[Milestone] = Field(..., description="List of project milestones")
     employee_summaries: List[EmployeeSummary] = Field(..., description="List of employee summaries")
\ No newline at end of file
@@ -0,0 +1,149 @@
+"""
+MapReduceSummarizer
+-------------------
+Shrinks contexts that are too large for one model call.
+
+Text that fits within max_context_chars is passed through unchanged. Longer
+text is split on line boundaries into chunks. Each chunk is summarized
+(map) concurrently, with at most max_parallel calls in flight. The partial
+summaries are then merged by summarizing consecutive groups of them (reduce)
+until the result fits, for at most MAX_REDUCE_ROUNDS rounds.
+
+Every summary is cached in the summary_cache table of the Nexy-Rep
+database. The key is the SHA-256 of the prompt version, model, focus and
+chunk text. Re-processing a session or re-generating a timeline from mostly
+the same documents therefore only pays for the chunks that changed.
+"""
+
+import hashlib
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional
+
+from ..nexy_rep.storage import ensure_summary_cache_table, get_cached_summary, store_cached_summary
+
+
+logger = logging.getLogger(__name__)
+
+# Roughly 4 characters per token
+MAX_CONTEXT_CHARS = int(os.getenv("LLM_MAX_CONTEXT_CHARS", "120000"))
+SUMMARY_CHUNK_CHARS = int(os.getenv("LLM_SUMMARY_CHUNK_CHARS", "24000"))
+SUMMARY_MAX_PARALLEL = int(os.getenv("LLM_SUMMARY_MAX_PARALLEL", "4"))
+MAX_REDUCE_ROUNDS = 3
+
+# Bump when the prompts change, so cached summaries are not reused
+PROMPT_VERSION = "1"
+
+MAP_PROMPT = """Summarize the following part of a larger body of work data. {focus}
+Keep every concrete fact that could matter later: names, dates, deadlines, tasks, decisions,
+statuses, blockers and numbers. Drop repetition and boilerplate. Reply with the summary only.
+
+{text}"""
+
+REDUCE_PROMPT = """The following are summaries of consecutive parts of a larger body of work data. {focus}
+Merge them into one summary without losing names, dates, deadlines, tasks, decisions,
+statuses, blockers or numbers. Reply with the merged summary only.
+
+{text}"""
+
+
+def split_text(text: str, chunk_chars: int) -> Iterator[str]:
+    """Cut text into pieces of at most chunk_chars, preferring line boundaries."""
+    current = []
+    size = 0
+    for line in text.splitlines(keepends=True):
+        while len(line) > chunk_chars:
+            if current:
+                yield "".join(current)
+                current, size = [], 0
+            yield line[:chunk_chars]
+            line = line[chunk_chars:]
+        if size + len(line) > chunk_chars and current:
+            yield "".join(current)
+            current, size = [], 0
+        current.append(line)
+        size += len(line)
+    if current:
+        yield "".join(current)
+
+
+class MapReduceSummarizer:
+    """Fits long contexts into the model window by cached, concurrent summarization."""
+
+    def __init__(
+        self,
+        llm,
+        db_path: Optional[str] = None,
+        model_key: str = "",
+        max_context_chars: int = MAX_CONTEXT_CHARS,
+        chunk_chars: int = SUMMARY_CHUNK_CHARS,
+        max_parallel: int = SUMMARY_MAX_PARALLEL,
+    ):
+        """
+        Initialize the summarizer.
+
+        :param llm: LangChain chat model or LLM used for the summaries
+        :param db_path: Nexy-Rep database holding the summary cache (None: no caching)
+        :param model_key: Model identifier, part of the cache key
+        :param max_context_chars: Longest context passed through unchanged
+        :param chunk_chars: Size of the pieces summarized in one call
+        :param max_parallel: Summary calls in flight at once
+        """
+        self.llm = llm
+        self.db_path = db_path
+        self.model_key = model_key
+        self.max_context_chars = max_context_chars
+        self.chunk_chars = chunk_chars
+        self.max_parallel = max(1, max_parallel)
+        if db_path:
+            ensure_summary_cache_table(db_path)
+
+    def fit(self, text: str, focus: str = "") -> str:
+        """
+        Return text unchanged if it fits, else its map-reduced summary.
+
+        :param text: Full context
+        :param focus: What the summary will be used for (added to the prompts)
+        """
+        if len(text) <= self.max_context_chars:
+            return text
+
+        pieces = list(split_text(text, self.chunk_chars))
+        logger.info(f"Context of {len(text)} chars exceeds {self.max_context_chars}; summarizing {len(pieces)} chunks")
+        prompt = MAP_PROMPT
+        for _ in range(MAX_REDUCE_ROUNDS):
+            summaries = self._summarize_all(pieces, prompt, focus)
+            text = "\n\n".join(summaries)
+            if len(text) <= self.max_context_chars:
+                return text
+            pieces = list(split_text(text, self.chunk_chars))
+            prompt = REDUCE_PROMPT
+        logger.warning(f"Summaries still {len(text)} chars after {MAX_REDUCE_ROUNDS} rounds; truncating")
+        return text[:self.max_context_chars]
+
+    def _summarize_all(self, pieces: List[str], prompt: str, focus: str) -> List[str]:
+        """Summaries of pieces, in order (map step or one reduce round)."""
+        if len(pieces) == 1:
+            return [self._summarize(pieces[0], prompt, focus)]
+        with ThreadPoolExecutor(max_workers=min(self.max_parallel, len(pieces))) as pool:
+            return list(pool.map(lambda piece: self._summarize(piece, prompt, focus), pieces))
+
+    def _cache_key(self, text: str, prompt: str, focus: str) -> str:
+        digest = hashlib.sha256()
+        for part in (PROMPT_VERSION, self.model_key, prompt, focus, text):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _summarize(self, text: str, prompt: str, focus: str) -> str:
+        key = self._cache_key(text, prompt, focus)
+        if self.db_path:
+            cached = get_cached_summary(self.db_path, key)
+            if cached is not None:
+                return cached
+        response = self.llm.invoke(prompt.format(focus=focus, text=text))
+        summary = response.content if hasattr(response, "content") else str(response)
+        if self.db_path:
+            store_cached_summary(self.db_path, key, summary)
+        return summary
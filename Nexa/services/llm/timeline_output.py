@@ -0,0 +1,155 @@
+"""
+Structured output for timeline generation.
+
+The timeline prompt asks for one JSON object matching ProjectTimelineOutput.
+The model runs in JSON mode (see get_llm(json_mode=True)), so the reply has
+no prose or code around it. It is streamed, and whatever arrived is kept if
+the stream breaks off. The text is then parsed leniently:
+
+- markdown fences are stripped and truncated JSON is closed off
+- milestones and employee summaries are validated one by one, and invalid
+  ones are dropped instead of failing the whole reply
+
+If the reply was truncated, unparseable or had invalid entries, the model is
+asked once to repair its own output against the schema. That prompt only
+carries the previous reply and the errors, not the documents. The better of
+the two results is returned; a partial result is never thrown away for a
+full regeneration.
+"""
+
+import json
+import logging
+from typing import List, Tuple
+
+from langchain_core.utils.json import parse_json_markdown
+from pydantic import ValidationError
+
+from .assets.timeline import EmployeeSummary, Milestone, ProjectTimelineOutput
+
+
+logger = logging.getLogger(__name__)
+
+# Longest previous reply sent back in the repair prompt
+MAX_REPAIR_INPUT_CHARS = 30000
+
+REPAIR_PROMPT = """Your previous reply was not valid for the required JSON schema.
+
+Problems:
+{errors}
+
+JSON schema:
+{schema}
+
+Previous reply:
+{reply}
+
+Return the corrected JSON object only. Keep every milestone and employee summary that can be fixed; \
+complete anything that was cut off."""
+
+
+def _message_text(message) -> str:
+    """Text of a chat message chunk or plain LLM string."""
+    content = getattr(message, "content", message)
+    return content if isinstance(content, str) else str(content)
+
+
+def stream_text(llm, prompt: str) -> Tuple[str, bool]:
+    """
+    Stream a completion and return (text, complete).
+
+    If the stream fails after some text arrived, that text is returned with
+    complete=False so it can still be parsed and repaired.
+    """
+    parts = []
+    try:
+        for chunk in llm.stream(prompt):
+            parts.append(_message_text(chunk))
+    except Exception as e:
+        if not parts:
+            raise
+        logger.warning(f"Timeline stream interrupted after {sum(map(len, parts))} chars: {e}")
+        return "".join(parts), False
+    return "".join(parts), True
+
+
+def parse_timeline_output(text: str, project_name: str) -> Tuple[ProjectTimelineOutput, List[str]]:
+    """
+    Parse a (possibly truncated or partly invalid) timeline reply.
+
+    :param text: Model reply
+    :param project_name: Used when the reply has none
+    :return: The valid part of the reply, and a description of each problem
+    """
+    errors = []
+    try:
+        data = parse_json_markdown(text, parser=json.loads)
+    except ValueError:
+        errors.append("The reply is not complete, valid JSON.")
+        try:
+            data = parse_json_markdown(text)  # closes truncated JSON
+        except ValueError:
+            data = None
+    if not isinstance(data, dict):
+        errors.append("No JSON object could be read from the reply.")
+        data = {}
+
+    milestones = []
+    for index, item in enumerate(data.get("milestones") or []):
+        try:
+            milestones.append(Milestone.model_validate(item))
+        except ValidationError as e:
+            errors.append(f"milestones[{index}]: {_describe(e)}")
+    summaries = []
+    for index, item in enumerate(data.get("employee_summaries") or []):
+        try:
+            summaries.append(EmployeeSummary.model_validate(item))
+        except ValidationError as e:
+            errors.append(f"employee_summaries[{index}]: {_describe(e)}")
+
+    output = ProjectTimelineOutput(
+        project_name=data.get("project_name") or project_name,
+        milestones=milestones,
+        employee_summaries=summaries,
+    )
+    return output, errors
+
+
+def _describe(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc']) or 'value'}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+
+def _size(output: ProjectTimelineOutput) -> int:
+    return len(output.milestones) + len(output.employee_summaries)
+
+
+def generate_timeline(llm, prompt: str, project_name: str) -> Tuple[ProjectTimelineOutput, str]:
+    """
+    Run the timeline prompt and return the parsed output and the raw reply.
+
+    :param llm: Model from get_llm(..., json_mode=True)
+    :param prompt: Timeline prompt (documents, members and the output schema)
+    :param project_name: Fallback project name
+    """
+    text, complete = stream_text(llm, prompt)
+    output, errors = parse_timeline_output(text, project_name)
+    if complete and not errors:
+        return output, text
+
+    logger.info(f"Repairing timeline output ({len(errors)} problems)")
+    repair_prompt = REPAIR_PROMPT.format(
+        errors="\n".join(f"- {error}" for error in errors) or "- The reply was cut off.",
+        schema=json.dumps(ProjectTimelineOutput.model_json_schema(), indent=1),
+        reply=text[:MAX_REPAIR_INPUT_CHARS],
+    )
+    try:
+        repaired_text, _ = stream_text(llm, repair_prompt)
+    except Exception as e:
+        logger.warning(f"Timeline repair failed: {e}")
+        return output, text
+    repaired, repair_errors = parse_timeline_output(repaired_text, project_name)
+    if (_size(repaired), -len(repair_errors)) > (_size(output), -len(errors)):
+        return repaired, repaired_text
+    return output, text
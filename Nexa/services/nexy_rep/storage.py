@@ -1,4 +1,5 @@
 # storage.py
+import json
 import sqlite3
 from datetime import datetime
 from typing import Optional
@@ -24,6 +25,77 @@ def init_db(db_path: str) -> None:
     conn.close()
 
 
+def ensure_state_table(db_path: str) -> None:
+    """Create the capture_state key/value table if it doesn't exist."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS capture_state (
+            key TEXT PRIMARY KEY,
+            value TEXT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.commit()
+    conn.close()
+
+
+def get_state(db_path: str, key: str):
+    """
+    Read a JSON value shared by every process using this database.
+
+    Returns None when the key has never been set.
+    """
+    ensure_state_table(db_path)
+    conn = sqlite3.connect(db_path)
+    row = conn.execute("SELECT value FROM capture_state WHERE key = ?", (key,)).fetchone()
+    conn.close()
+    return json.loads(row[0]) if row and row[0] is not None else None
+
+
+def set_state(db_path: str, key: str, value) -> None:
+    """Store a JSON-serializable value under key, replacing the previous one."""
+    ensure_state_table(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        INSERT INTO capture_state (key, value, updated_at) VALUES (?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at
+    """, (key, json.dumps(value)))
+    conn.commit()
+    conn.close()
+
+
+def ensure_summary_cache_table(db_path: str) -> None:
+    """Create the summary_cache table (chunk summaries keyed by hash) if it doesn't exist."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS summary_cache (
+            key TEXT PRIMARY KEY,
+            summary TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.commit()
+    conn.close()
+
+
+def get_cached_summary(db_path: str, key: str) -> Optional[str]:
+    """Summary stored under key, or None."""
+    conn = sqlite3.connect(db_path)
+    row = conn.execute("SELECT summary FROM summary_cache WHERE key = ?", (key,)).fetchone()
+    conn.close()
+    return row[0] if row else None
+
+
+def store_cached_summary(db_path: str, key: str, summary: str) -> None:
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "INSERT OR REPLACE INTO summary_cache (key, summary, created_at) VALUES (?, ?, CURRENT_TIMESTAMP)",
+        (key, summary),
+    )
+    conn.commit()
+    conn.close()
+
+
 def ensure_conversation_table(db_path: str) -> None:
     """
     Ensure the conversations table exists.
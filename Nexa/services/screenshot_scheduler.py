@@ -1,11 +1,21 @@
 """
 Scheduled screenshot capture module.
+
+All sessions share one scheduler thread, which sleeps on a condition variable
+until the earliest due capture in a heap. Starting or stopping a session wakes
+it, so stop_session takes effect immediately instead of after the current
+interval. Due captures are handed to a small pool of capture/OCR worker
+threads through a bounded queue. When OCR falls behind, the oldest queued
+capture is dropped, so the backlog never grows and the freshest screens are
+kept.
 """
+import heapq
 import os
-import time
 import threading
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, Callable
+import time
+from collections import deque
+from datetime import datetime
+from typing import Optional, Dict, Any, Callable, List, Tuple
 import logging
 
 
@@ -13,79 +23,119 @@ class ScheduledScreenshotCapture:
     """
     Manages scheduled screenshot capture with configurable intervals.
     """
-    
-    def __init__(self, screenshot_callback: Callable, storage_callback: Optional[Callable] = None):
+
+    def __init__(
+        self,
+        screenshot_callback: Callable,
+        storage_callback: Optional[Callable] = None,
+        completion_callback: Optional[Callable] = None,
+        max_workers: int = 2,
+        max_pending: int = 8,
+        clock: Callable[[], float] = time.monotonic,
+        start: bool = True,
+    ):
         """
         Initialize the scheduled screenshot capture.
-        
+
         Args:
             screenshot_callback: Function to call for taking screenshots.
                 Should accept (output_path: str) and return extracted text.
             storage_callback: Optional function to call after each screenshot.
                 Should accept (screenshot_session_id, image_path, extracted_text).
+            completion_callback: Optional function called with
+                (screenshot_session_id) when a session's duration has passed.
+            max_workers: Capture/OCR worker threads.
+            max_pending: Captures that may wait for a worker; beyond that the
+                oldest waiting capture is dropped.
+            clock: Monotonic time source in seconds.
+            start: Run the scheduler thread. With False, due captures are only
+                dispatched by calling run_due() (e.g. with a virtual clock).
         """
         self.screenshot_callback = screenshot_callback
         self.storage_callback = storage_callback
+        self.completion_callback = completion_callback
         self.active_sessions: Dict[int, Dict[str, Any]] = {}
+        self.clock = clock
+        self.max_pending = max_pending
+        self.dropped = 0
         self._lock = threading.Lock()
-    
+        self._schedule_changed = threading.Condition(self._lock)
+        self._work_available = threading.Condition(self._lock)
+        self._idle = threading.Condition(self._lock)
+        self._heap = []  # (due, sequence, screenshot_session_id)
+        self._sequence = 0
+        self._pending = deque()
+        self._in_flight = 0
+        self._closed = False
+
+        self._workers = [
+            threading.Thread(target=self._worker_loop, name=f"screenshot-worker-{i}", daemon=True)
+            for i in range(max_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+        self._scheduler = None
+        if start:
+            self._scheduler = threading.Thread(target=self._scheduler_loop, name="screenshot-scheduler", daemon=True)
+            self._scheduler.start()
+
     def start_session(
         self,
         screenshot_session_id: int,
         output_dir: str,
         interval_minutes: int,
-        duration_minutes: Optional[int] = None
+        duration_minutes: Optional[int] = None,
+        first_capture_at: Optional[float] = None,
+        ends_at: Optional[float] = None,
     ):
         """
         Start a scheduled screenshot capture session.
-        
+
         Args:
             screenshot_session_id: Unique ID for this screenshot session
             output_dir: Directory to save screenshots
             interval_minutes: Interval between screenshots in minutes
             duration_minutes: Total duration in minutes (None = infinite)
+            first_capture_at: Clock time of the first capture (default: now);
+                used to resume a session
+            ends_at: Clock time the session ends, instead of duration_minutes
         """
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
-        
+
         with self._lock:
             if screenshot_session_id in self.active_sessions:
                 logging.warning(f"Screenshot session {screenshot_session_id} already active")
                 return
-            
+
+            now = self.clock()
             # Calculate end time if duration is specified
-            end_time = None
-            if duration_minutes:
-                end_time = datetime.now() + timedelta(minutes=duration_minutes)
-            
-            # Create session info
+            end_time = ends_at
+            if end_time is None and duration_minutes:
+                end_time = now + duration_minutes * 60
+
             session_info = {
                 "screenshot_session_id": screenshot_session_id,
                 "output_dir": output_dir,
                 "interval_minutes": interval_minutes,
                 "duration_minutes": duration_minutes,
                 "end_time": end_time,
-                "stop_flag": False,
-                "thread": None
+                "screenshot_count": 0,
             }
-            
-            # Start capture thread
-            thread = threading.Thread(
-                target=self._capture_loop,
-                args=(session_info,),
-                daemon=True
-            )
-            session_info["thread"] = thread
             self.active_sessions[screenshot_session_id] = session_info
-            thread.start()
-            
+            # First capture right away (as before) unless resuming
+            self._push(now if first_capture_at is None else first_capture_at, session_info)
+
             logging.info(f"Started screenshot session {screenshot_session_id} "
                         f"with interval={interval_minutes}min, duration={duration_minutes}min")
-    
+
     def stop_session(self, screenshot_session_id: int):
         """
         Stop a scheduled screenshot capture session.
-        
+
+        No capture of the session starts after this returns; captures of it
+        still waiting for a worker are discarded.
+
         Args:
             screenshot_session_id: ID of the session to stop
         """
@@ -93,66 +143,148 @@ class ScheduledScreenshotCapture:
             if screenshot_session_id not in self.active_sessions:
                 logging.warning(f"Screenshot session {screenshot_session_id} not found")
                 return
-            
-            session_info = self.active_sessions[screenshot_session_id]
-            session_info["stop_flag"] = True
-            
-            logging.info(f"Stopping screenshot session {screenshot_session_id}")
-    
-    def _capture_loop(self, session_info: Dict[str, Any]):
-        """
-        Main loop for capturing screenshots at intervals.
-        
-        Args:
-            session_info: Dictionary containing session configuration
-        """
-        screenshot_session_id = session_info["screenshot_session_id"]
-        output_dir = session_info["output_dir"]
-        interval_seconds = session_info["interval_minutes"] * 60
-        end_time = session_info["end_time"]
-        
-        screenshot_count = 0
-        
-        while not session_info["stop_flag"]:
-            # Check if duration expired
-            if end_time and datetime.now() >= end_time:
-                logging.info(f"Screenshot session {screenshot_session_id} duration expired")
-                break
-            
+
+            self._finish(screenshot_session_id, "stopped")
+            self._pending = deque(job for job in self._pending if job[0] != screenshot_session_id)
+            if not self._pending and not self._in_flight:
+                self._idle.notify_all()
+            # Its heap entry is skipped when it comes due; wake the scheduler
+            # so it recomputes its sleep.
+            self._schedule_changed.notify()
+
+    def run_due(self) -> int:
+        """Queue every capture that is due at clock(); returns how many."""
+        with self._lock:
+            dispatched, completed = self._dispatch_due(self.clock())
+        self._notify_completed(completed)
+        return dispatched
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until no capture is queued or running; False on timeout."""
+        with self._lock:
+            return self._idle.wait_for(lambda: not self._pending and not self._in_flight, timeout)
+
+    def shutdown(self, wait: bool = True):
+        """Stop all sessions and threads."""
+        with self._lock:
+            self._closed = True
+            self._pending.clear()
+            self.active_sessions.clear()
+            self._schedule_changed.notify_all()
+            self._work_available.notify_all()
+        if wait:
+            for thread in [self._scheduler, *self._workers]:
+                if thread is not None and thread is not threading.current_thread():
+                    thread.join()
+
+    # ----- scheduling (called with self._lock held) -----
+
+    def _push(self, due: float, session_info: Dict[str, Any]):
+        # A session has one live heap entry; older ones (e.g. from before a
+        # stop and restart under the same id) are recognised by sequence.
+        self._sequence += 1
+        session_info["sequence"] = self._sequence
+        heapq.heappush(self._heap, (due, self._sequence, session_info["screenshot_session_id"]))
+        self._schedule_changed.notify()
+
+    def _finish(self, screenshot_session_id: int, reason: str):
+        session_info = self.active_sessions.pop(screenshot_session_id)
+        logging.info(f"Screenshot session {screenshot_session_id} {reason} after "
+                     f"{session_info['screenshot_count']} screenshots")
+
+    def _dispatch_due(self, now: float) -> Tuple[int, List[int]]:
+        """Queue due captures; returns their number and the sessions that ended."""
+        dispatched = 0
+        completed = []
+        while self._heap and self._heap[0][0] <= now:
+            due, sequence, screenshot_session_id = heapq.heappop(self._heap)
+            session_info = self.active_sessions.get(screenshot_session_id)
+            if session_info is None or session_info["sequence"] != sequence:
+                continue  # stopped
+            if session_info["end_time"] is not None and now >= session_info["end_time"]:
+                self._finish(screenshot_session_id, "duration expired")
+                completed.append(screenshot_session_id)
+                continue
+
+            self._enqueue(session_info)
+            dispatched += 1
+            # Fixed rate; after a stall, resume from now instead of catching up.
+            # Wake up at the end time too, so the session ends on time.
+            next_due = max(due + session_info["interval_minutes"] * 60, now)
+            if session_info["end_time"] is not None:
+                next_due = min(next_due, session_info["end_time"])
+            self._push(next_due, session_info)
+        return dispatched, completed
+
+    def _notify_completed(self, completed: List[int]):
+        """Run the completion callback (without holding the lock)."""
+        for screenshot_session_id in completed:
+            if self.completion_callback:
+                try:
+                    self.completion_callback(screenshot_session_id)
+                except Exception as e:
+                    logging.exception(f"Error in completion callback: {e}")
+
+    def _enqueue(self, session_info: Dict[str, Any]):
+        index = session_info["screenshot_count"]
+        session_info["screenshot_count"] += 1
+        timestamp_str = datetime.now().strftime("%Y%m%d_%H%M%S")
+        screenshot_path = os.path.join(
+            session_info["output_dir"], f"screenshot_{index:04d}_{timestamp_str}.png"
+        )
+        if len(self._pending) >= self.max_pending:
+            dropped = self._pending.popleft()
+            self.dropped += 1
+            logging.warning(f"Screenshot workers behind; dropped capture {dropped[1]} "
+                            f"of session {dropped[0]}")
+        self._pending.append((session_info["screenshot_session_id"], screenshot_path))
+        self._work_available.notify()
+
+    # ----- threads -----
+
+    def _scheduler_loop(self):
+        while True:
+            with self._lock:
+                if self._closed:
+                    return
+                _, completed = self._dispatch_due(self.clock())
+                if not completed:
+                    timeout = None
+                    if self._heap:
+                        timeout = max(0.0, self._heap[0][0] - self.clock())
+                    self._schedule_changed.wait(timeout)
+            self._notify_completed(completed)
+
+    def _worker_loop(self):
+        while True:
+            with self._lock:
+                self._work_available.wait_for(lambda: self._pending or self._closed)
+                if self._closed:
+                    return
+                screenshot_session_id, screenshot_path = self._pending.popleft()
+                self._in_flight += 1
             try:
-                # Take screenshot
-                timestamp_str = datetime.now().strftime("%Y%m%d_%H%M%S")
-                screenshot_filename = f"screenshot_{screenshot_count:04d}_{timestamp_str}.png"
-                screenshot_path = os.path.join(output_dir, screenshot_filename)
-                
                 # Call screenshot callback
                 extracted_text = self.screenshot_callback(screenshot_path)
-                
+
                 # Call storage callback if provided
                 if self.storage_callback:
                     self.storage_callback(screenshot_session_id, screenshot_path, extracted_text)
-                
-                screenshot_count += 1
-                logging.info(f"Captured screenshot {screenshot_count} for session {screenshot_session_id}")
-                
+
+                logging.info(f"Captured {os.path.basename(screenshot_path)} for session {screenshot_session_id}")
             except Exception as e:
                 logging.exception(f"Error capturing screenshot: {e}")
-            
-            # Wait for next interval
-            time.sleep(interval_seconds)
-        
-        # Clean up session
-        with self._lock:
-            if screenshot_session_id in self.active_sessions:
-                del self.active_sessions[screenshot_session_id]
-        
-        logging.info(f"Screenshot session {screenshot_session_id} completed with {screenshot_count} screenshots")
-    
+            finally:
+                with self._lock:
+                    self._in_flight -= 1
+                    if not self._pending and not self._in_flight:
+                        self._idle.notify_all()
+
     def is_session_active(self, screenshot_session_id: int) -> bool:
         """Check if a screenshot session is currently active."""
         with self._lock:
             return screenshot_session_id in self.active_sessions
-    
+
     def get_active_sessions(self) -> list:
         """Get list of active screenshot session IDs."""
         with self._lock:
@@ -3,10 +3,12 @@ Unified service class that integrates Universal Extractor and Nexy-Rep functiona
 """
 import os
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator
 import logging
 
 # Import Universal Extractor classes
+from .extractors.base_extractor import BaseExtractor, TextChunk, DEFAULT_CHUNK_CHARS, chunk_text
+from .extraction_cache import ExtractionCache, file_digest
 from .extractors.pdf_extractor import PDFExtractor
 from .extractors.docx_extractor import DocxExtractor
 from .extractors.csv_extractor import CSVExtractor
@@ -19,6 +21,7 @@ from .extractors.markdown_extractor import MarkdownExtractor
 # Import Nexy-Rep configuration (lazy-import other heavy modules at runtime)
 from .nexy_rep.config import Config
 from .llm.agent_logic import get_query_generator_chain, get_llm, get_prompt
+from .llm.map_reduce import MAX_CONTEXT_CHARS, MapReduceSummarizer
 from .github_activity import GitHubUserActivity
 
 
@@ -28,13 +31,21 @@ class UnifiedService:
     and image processing/OCR capabilities.
     """
     
-    def __init__(self, config_path: Optional[str] = None):
+    def __init__(
+        self,
+        config_path: Optional[str] = None,
+        extraction_cache_dir: Optional[str] = None,
+        use_extraction_cache: bool = True,
+    ):
         """
         Initialize the unified service.
         
         Args:
             config_path (str, optional): Path to the Nexy-Rep configuration file.
                 If not provided, default configuration will be used.
+            extraction_cache_dir (str, optional): Directory of the extraction cache
+                (defaults to EXTRACTION_CACHE_DIR, else extraction_cache/ next to the Nexy-Rep DB).
+            use_extraction_cache (bool): Set to False to always re-extract documents.
         """
         # Initialize Nexy-Rep configuration
         # Config currently does not accept a path; always instantiate and attach provided path for downstream use.
@@ -63,30 +74,135 @@ class UnifiedService:
             '.md': MarkdownExtractor
         }
         
-        # Keep track of last processed image for similarity comparison
-        self._last_embedding = None
+        # Extracted text keyed by file content hash, shared by every upload path
+        self.extraction_cache = None
+        if use_extraction_cache:
+            self.extraction_cache = ExtractionCache(
+                extraction_cache_dir
+                or os.getenv("EXTRACTION_CACHE_DIR")
+                or os.path.join(self.config.base_dir, "extraction_cache")
+            )
+
+    def _get_last_embedding(self) -> Optional[list]:
+        """Embedding of the last stored capture, kept in the Nexy-Rep DB so every process sees it."""
+        try:
+            from .nexy_rep.storage import get_state
+            return get_state(self.config.db_path, "last_embedding")
+        except Exception:
+            logging.exception("Could not read last capture embedding")
+            return None
+
+    def _set_last_embedding(self, embedding: Optional[list]):
+        try:
+            from .nexy_rep.storage import set_state
+            set_state(self.config.db_path, "last_embedding", embedding)
+        except Exception:
+            logging.exception("Could not save last capture embedding")
     
-    def extract_from_file(self, file_path: str) -> str:
+    def _get_extractor(self, file_path: str, file_type: Optional[str] = None) -> BaseExtractor:
+        file_ext = (file_type or os.path.splitext(file_path)[1]).lower()
+
+        if file_ext not in self.extractors:
+            raise ValueError(f"Unsupported file type: {file_ext}")
+
+        return self.extractors[file_ext](file_path)
+
+    def extract_from_file(
+        self,
+        file_path: str,
+        max_chars: Optional[int] = None,
+        spill_path: Optional[str] = None,
+        file_type: Optional[str] = None,
+    ) -> str:
         """
         Extract text from a document file.
-        
+
+        The text is streamed from the extractor (or the extraction cache), so
+        neither a cap nor a spill needs the full text in memory. Extractions cut
+        short by max_chars are not cached; complete ones are.
+
         Args:
             file_path (str): Path to the document file.
-        
+            max_chars (int, optional): Return at most this many characters.
+                Without spill_path, extraction stops once the cap is reached.
+            spill_path (str, optional): Also write the full text to this file.
+            file_type (str, optional): Extension such as '.pdf' to use instead of
+                the path's own (for content-addressed files without one).
+
         Returns:
-            str: Extracted text from the document.
-            
+            str: Extracted text from the document (capped to max_chars if given).
+
         Raises:
             ValueError: If file type is not supported.
         """
-        file_ext = os.path.splitext(file_path)[1].lower()
-        
-        if file_ext not in self.extractors:
-            raise ValueError(f"Unsupported file type: {file_ext}")
-        
-        extractor = self.extractors[file_ext](file_path)
-        return extractor.extract_text()
-    
+        if max_chars is None and spill_path is None:
+            return "".join(chunk.text for chunk in self.iter_file_chunks(file_path, file_type=file_type))
+
+        kept = []
+        kept_chars = 0
+        spill = open(spill_path, "w", encoding="utf-8") if spill_path else None
+        try:
+            for chunk in self.iter_file_chunks(file_path, file_type=file_type):
+                if spill:
+                    spill.write(chunk.text)
+                if max_chars is None or kept_chars < max_chars:
+                    room = len(chunk.text) if max_chars is None else max_chars - kept_chars
+                    kept.append(chunk.text[:room])
+                    kept_chars += len(kept[-1])
+                elif not spill:
+                    break
+        finally:
+            if spill:
+                spill.close()
+        return "".join(kept)
+
+    def iter_file_chunks(
+        self,
+        file_path: str,
+        chunk_chars: int = DEFAULT_CHUNK_CHARS,
+        file_type: Optional[str] = None,
+    ) -> Iterator[TextChunk]:
+        """
+        Stream the extracted text of a document as bounded chunks.
+
+        Files already extracted (same bytes, same extractor version) are served
+        from the extraction cache; otherwise the chunks are cached as they are
+        produced, provided the iteration runs to completion.
+
+        Args:
+            file_path (str): Path to the document file.
+            chunk_chars (int): Maximum characters per chunk.
+            file_type (str, optional): Extension overriding the path's own.
+
+        Returns:
+            Iterator[TextChunk]: Chunks with their character offset in the full text.
+
+        Raises:
+            ValueError: If file type is not supported.
+        """
+        extractor = self._get_extractor(file_path, file_type)
+        if self.extraction_cache is None:
+            return extractor.iter_chunks(chunk_chars)
+        return self._iter_cached_chunks(file_path, extractor, chunk_chars)
+
+    def _iter_cached_chunks(self, file_path: str, extractor: BaseExtractor, chunk_chars: int) -> Iterator[TextChunk]:
+        # Limits apply to cache hits too
+        extractor.check_limits()
+        file_hash = file_digest(file_path)
+        text_hash = self.extraction_cache.lookup(file_hash, extractor.cache_key())
+        if text_hash:
+            yield from chunk_text(self.extraction_cache.iter_text(text_hash), chunk_chars)
+            return
+
+        writer = self.extraction_cache.writer(file_hash, extractor.cache_key())
+        try:
+            for chunk in extractor.iter_chunks(chunk_chars):
+                writer.write(chunk.text)
+                yield chunk
+            writer.commit()
+        finally:
+            writer.close()
+
     def capture_and_process_screen(self, store: bool = True) -> Dict[str, Any]:
         """
         Capture a screenshot, process it with OCR, and optionally store it.
@@ -146,14 +262,15 @@ class UnifiedService:
             from .nexy_rep.embed import get_embedding
             from .nexy_rep.compare import compute_similarity
             embedding = get_embedding(text)
-            if self._last_embedding is not None:
-                result['similarity'] = compute_similarity(embedding, self._last_embedding)
+            last_embedding = self._get_last_embedding()
+            if last_embedding is not None:
+                result['similarity'] = compute_similarity(embedding, last_embedding)
         except Exception:
             logging.exception("Embedding/compare not available")
             # If embeddings aren't available, return with zero similarity
-            embedding = None
+            embedding = last_embedding = None
         
-        if store and (self._last_embedding is None or 
+        if store and (last_embedding is None or 
                      result['similarity'] < self.config.similarity_threshold):
             # Store the image and data
             permanent_image_path = os.path.join(
@@ -174,7 +291,7 @@ class UnifiedService:
                 logging.exception("Failed to store data to nexy_rep.storage")
             
             result['image_path'] = permanent_image_path
-            self._last_embedding = embedding
+            self._set_last_embedding(embedding)
         else:
             os.remove(temp_image_path)
         
@@ -222,13 +339,14 @@ class UnifiedService:
             from .nexy_rep.embed import get_embedding
             from .nexy_rep.compare import compute_similarity
             embedding = get_embedding(text)
-            if self._last_embedding is not None:
-                result['similarity'] = compute_similarity(embedding, self._last_embedding)
+            last_embedding = self._get_last_embedding()
+            if last_embedding is not None:
+                result['similarity'] = compute_similarity(embedding, last_embedding)
         except Exception:
             logging.exception("Embedding/compare not available for process_image")
-            embedding = None
+            embedding = last_embedding = None
         
-        if store and (self._last_embedding is None or 
+        if store and (last_embedding is None or 
                      result['similarity'] < self.config.similarity_threshold):
             # Store the data
             timestamp_str = timestamp.strftime("%Y%m%d_%H%M%S")
@@ -253,7 +371,7 @@ class UnifiedService:
                 logging.exception("Failed to store data to nexy_rep.storage in process_image")
             
             result['image_path'] = permanent_image_path
-            self._last_embedding = embedding
+            self._set_last_embedding(embedding)
         
         return result
 
@@ -296,6 +414,36 @@ class UnifiedService:
             logging.exception("Agentic query failed")
             return {"error": str(exc)}
 
+    def fit_context(
+        self,
+        context: str,
+        focus: str = "",
+        model_name: Optional[str] = None,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+    ) -> str:
+        """
+        Make a context fit the model window (see MapReduceSummarizer).
+
+        Contexts within the limit are returned unchanged; longer ones are
+        summarized chunk by chunk with the same model run_agentic_query uses,
+        caching each chunk summary in the Nexy-Rep database.
+
+        Args:
+            context: Full context text.
+            focus: What the context will be used for (guides the summaries).
+            model_name, base_url, api_key: As for run_agentic_query.
+        """
+        if len(context) <= MAX_CONTEXT_CHARS:
+            return context
+        model_to_use = model_name or os.environ.get("NEXA_DEFAULT_MODEL") or "ollama"
+        summarizer = MapReduceSummarizer(
+            get_llm(model_to_use, base_url=base_url, api_key=api_key),
+            db_path=self.config.db_path,
+            model_key=model_to_use,
+        )
+        return summarizer.fit(context, focus)
+
     def list_prompts(self) -> list:
         """Return available prompt files in `services/llm/assets`.
 
@@ -425,6 +573,8 @@ class UnifiedService:
         end_date: str,
         token: Optional[str] = None,
         repos: Optional[list] = None,
+        mode: Optional[str] = None,
+        export_dir: Optional[str] = None,
     ) -> Dict[str, Any]:
         """
         Fetch GitHub activity for a user in the given date range.
@@ -435,6 +585,8 @@ class UnifiedService:
             end_date: End date in 'YYYY-MM-DD'
             token: Optional GitHub token (falls back to GITHUB_TOKEN env var)
             repos: Optional list of repository names to filter
+            mode: Optional collector mode ('graphql' or 'rest'); see GitHubUserActivity
+            export_dir: Optional folder to also write the activity as JSON files
 
         Returns:
             dict: Summary returned by GitHubUserActivity.get_user_activity()
@@ -445,6 +597,8 @@ class UnifiedService:
             end_date=end_date,
             token=token,
             repos=repos,
+            mode=mode,
+            export_dir=export_dir,
         )
 
         return tracker.get_user_activity()
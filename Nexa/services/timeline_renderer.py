@@ -0,0 +1,180 @@
+"""
+TimelineRenderer
+----------------
+Deterministic Gantt chart of project milestones.
+
+The timeline endpoint used to ask the LLM for matplotlib code and exec() it.
+Now the LLM only returns the milestone JSON (see llm/assets/timeline.py) and
+this module draws the chart. It uses the object-oriented Agg API (Figure +
+FigureCanvasAgg), with no pyplot global state, so it is safe to call
+repeatedly from one long-lived worker process. The matplotlib import and font
+setup are paid once per process and each render costs the same. The same
+milestones always produce the same PNG bytes.
+"""
+
+import os
+import re
+from datetime import date, timedelta
+from typing import Iterable, List, Optional, Union
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.dates as mdates
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+from matplotlib.patches import Patch
+
+from .llm.assets.timeline import Milestone
+
+
+STATUS_COLORS = {
+    "completed": "#2e9d5b",
+    "in_progress": "#f2a93b",
+    "pending": "#8c9bab",
+    "at_risk": "#d64545",
+}
+STATUS_LABELS = {
+    "completed": "Completed",
+    "in_progress": "In progress",
+    "pending": "Pending",
+    "at_risk": "At risk",
+}
+CRITICAL_COLOR = "#b00020"
+
+# Bar length of the first milestone (nothing earlier to start from)
+FIRST_PHASE_DAYS = 7
+DPI = 110
+ROW_HEIGHT_INCHES = 0.45
+MAX_LABEL_CHARS = 42
+
+# Negated statuses ("not started", "incomplete", ...) that must not match the
+# positive keywords they contain
+NEGATED_STATUS = re.compile(
+    r"(?:\bnot|\bnever|n't)\s+(?:yet\s+)?\w+|\b(?:in|un)complete(?:d)?\b|\bunfinished\b|\bundone\b|\binactive\b"
+)
+
+
+def normalize_status(status: Optional[str]) -> str:
+    """Map free-form LLM status text onto one of STATUS_COLORS."""
+    text = (status or "").strip().lower().replace("-", " ").replace("_", " ")
+    text = NEGATED_STATUS.sub(" ", text)
+    if any(word in text for word in ("complete", "done", "finished")):
+        return "completed"
+    if any(word in text for word in ("progress", "ongoing", "active", "started")):
+        return "in_progress"
+    if any(word in text for word in ("risk", "blocked", "delay", "overdue", "late")):
+        return "at_risk"
+    return "pending"
+
+
+def parse_milestones(items: Iterable[Union[dict, Milestone]]) -> List[Milestone]:
+    """Validate milestone dicts from the LLM, dropping malformed ones."""
+    milestones = []
+    for item in items:
+        if isinstance(item, Milestone):
+            milestones.append(item)
+            continue
+        try:
+            milestones.append(Milestone.model_validate(item))
+        except Exception:
+            continue
+    return milestones
+
+
+def _shorten(text: str, limit: int = MAX_LABEL_CHARS) -> str:
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+def build_figure(milestones: List[Milestone], project_name: Optional[str] = None,
+                 today: Optional[date] = None) -> Figure:
+    """
+    Draw the Gantt chart of milestones on a new Agg figure.
+
+    Each milestone is a row, sorted by due date. Its bar runs from the previous
+    milestone's due date to its own, coloured by status. Milestones with a
+    critical comment get a red outline and the comment next to their marker.
+
+    :param milestones: Validated milestones (at least one)
+    :param project_name: Chart title
+    :param today: Draws a "today" line when given
+    """
+    rows = sorted(milestones, key=lambda m: (m.due_date, m.title))
+    figure = Figure(
+        figsize=(12, max(3.0, 1.6 + ROW_HEIGHT_INCHES * len(rows))),
+        dpi=DPI,
+        layout="constrained",
+    )
+    FigureCanvasAgg(figure)
+    ax = figure.add_subplot()
+
+    start = rows[0].due_date - timedelta(days=FIRST_PHASE_DAYS)
+    for index, milestone in enumerate(rows):
+        status = normalize_status(milestone.status)
+        color = STATUS_COLORS[status]
+        critical = bool(milestone.critical_comment)
+        end = milestone.due_date
+        begin = mdates.date2num(start)
+        ax.barh(
+            index, max(mdates.date2num(end) - begin, 0.5), left=begin, height=0.55,
+            color=color, edgecolor=CRITICAL_COLOR if critical else color, linewidth=2 if critical else 0,
+        )
+        ax.plot(mdates.date2num(end), index, marker="D", markersize=7, color="#263238", zorder=3)
+        if critical:
+            ax.annotate(
+                _shorten(milestone.critical_comment), (mdates.date2num(end), index),
+                xytext=(8, 0), textcoords="offset points", va="center",
+                fontsize=8, color=CRITICAL_COLOR,
+            )
+        start = end
+
+    ax.set_yticks(
+        range(len(rows)),
+        [f"{_shorten(m.title)}\n{_shorten(m.assigned_to)}" for m in rows],
+        fontsize=8,
+    )
+    ax.invert_yaxis()
+    # Room for the marker and comment of the last milestone
+    ax.margins(x=0.06)
+    ax.xaxis.set_major_locator(mdates.AutoDateLocator())
+    ax.xaxis.set_major_formatter(mdates.DateFormatter("%b %d, %Y"))
+    ax.grid(axis="x", color="#e0e0e0", linewidth=0.8)
+    ax.set_axisbelow(True)
+    for side in ("top", "right"):
+        ax.spines[side].set_visible(False)
+
+    handles = [Patch(color=STATUS_COLORS[key], label=label) for key, label in STATUS_LABELS.items()]
+    if today is not None:
+        ax.axvline(mdates.date2num(today), color="#1565c0", linestyle="--", linewidth=1.2)
+        handles.append(Line2D([0], [0], color="#1565c0", linestyle="--", label="Today"))
+    ax.legend(handles=handles, loc="upper center", bbox_to_anchor=(0.5, -0.08),
+              ncol=len(handles), frameon=False, fontsize=8)
+    if project_name:
+        ax.set_title(f"{project_name} – Timeline", fontsize=13, fontweight="bold", loc="left")
+    return figure
+
+
+def render_timeline(milestones: Iterable[Union[dict, Milestone]], output_path: str,
+                    project_name: Optional[str] = None, today: Optional[date] = None) -> Optional[str]:
+    """
+    Render the timeline PNG for milestones.
+
+    :param milestones: Milestone dicts (as parsed from the LLM JSON) or models
+    :param output_path: Where to write the PNG
+    :param project_name: Chart title
+    :param today: Draws a "today" line when given
+    :return: output_path, or None when there is no valid milestone to draw
+    """
+    parsed = parse_milestones(milestones)
+    if not parsed:
+        return None
+    figure = build_figure(parsed, project_name, today)
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # Written under a temporary name so a reader never sees a partial file;
+    # no Software metadata, so identical input gives identical bytes.
+    partial = f"{output_path}.{os.getpid()}.tmp"
+    figure.savefig(partial, format="png", metadata={"Software": None})
+    os.replace(partial, output_path)
+    return output_path
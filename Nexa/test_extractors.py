@@ -0,0 +1,164 @@
+"""
+Tests for the streaming extractor API.
+"""
+import os
+
+import fitz  # PyMuPDF
+import pytest
+
+from services.extractors import CSVExtractor, ExtractionLimitError, MarkdownExtractor
+from services.extractors import pdf_extractor
+from services.extractors.pdf_extractor import PDFExtractor
+from services.extraction_cache import ExtractionCache, file_digest
+from services.services import UnifiedService
+
+
+def _make_pdf(path, pages):
+    doc = fitz.open()
+    for number in range(pages):
+        doc.new_page().insert_text((72, 72), f"Page {number + 1} body")
+    doc.save(str(path))
+    doc.close()
+
+
+def test_pdf_iter_text_yields_pages_in_order(tmp_path):
+    path = tmp_path / "doc.pdf"
+    _make_pdf(path, 3)
+
+    pages = list(PDFExtractor(str(path), workers=1).iter_text())
+
+    assert [p.strip() for p in pages] == ["Page 1 body", "Page 2 body", "Page 3 body"]
+
+
+def test_pdf_parallel_matches_serial(tmp_path, monkeypatch):
+    path = tmp_path / "doc.pdf"
+    _make_pdf(path, 9)
+    monkeypatch.setattr(pdf_extractor, "PARALLEL_MIN_PAGES", 2)
+
+    serial = PDFExtractor(str(path), workers=1).extract_text()
+    parallel = PDFExtractor(str(path), workers=2).extract_text()
+
+    assert parallel == serial
+    assert serial.startswith("Page 1 body") and serial.endswith("Page 9 body")
+
+
+def test_pdf_stays_serial_inside_worker_processes(tmp_path, monkeypatch):
+    path = tmp_path / "doc.pdf"
+    _make_pdf(path, 1)
+    monkeypatch.delenv("PDF_EXTRACT_WORKERS", raising=False)
+    monkeypatch.setattr(pdf_extractor.multiprocessing, "parent_process", lambda: object())
+
+    assert PDFExtractor(str(path)).workers == 1
+
+
+def test_pdf_limits(tmp_path):
+    path = tmp_path / "doc.pdf"
+    _make_pdf(path, 3)
+
+    with pytest.raises(ExtractionLimitError):
+        PDFExtractor(str(path), max_pages=2).extract_text()
+    with pytest.raises(ExtractionLimitError):
+        PDFExtractor(str(path), max_bytes=10).extract_text()
+
+
+@pytest.mark.parametrize("name, content", [
+    ("notes.txt", "\n\n  first line\nsecond line  \n\n\nthird line\n\n"),
+    ("table.csv", "name, city\nMurali ,Bangalore\n\nRavi,Mysore\n"),
+    ("doc.md", "# Title\n\nSome *text* here.\n\n```\ncode\n\nmore code\n```\n\n- a\n- b\n"),
+])
+def test_chunks_reassemble_to_extract_text(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content, encoding="utf-8")
+    extractor = UnifiedService(use_extraction_cache=False).extractors[path.suffix](str(path))
+
+    chunks = list(extractor.iter_chunks(chunk_chars=7))
+
+    assert "".join(c.text for c in chunks) == extractor.extract_text()
+    assert all(len(c.text) <= 7 for c in chunks)
+    assert [c.offset for c in chunks] == list(range(0, 7 * len(chunks), 7))
+
+
+def test_markdown_keeps_reference_links_and_indented_code(tmp_path):
+    path = tmp_path / "doc.md"
+    path.write_text(
+        "See [the docs][1].\n\n    code\n\n    more code\n\n[1]: http://example.com/docs\n",
+        encoding="utf-8",
+    )
+
+    text = MarkdownExtractor(str(path)).extract_text()
+
+    assert text == "See the docs.\ncode\n\nmore code"
+
+
+def test_extract_from_file_caps_and_spills(tmp_path):
+    path = tmp_path / "big.txt"
+    path.write_text("".join(f"line {i}\n" for i in range(20000)), encoding="utf-8")
+    service = UnifiedService(extraction_cache_dir=str(tmp_path / "cache"))
+    full = service.extract_from_file(str(path))
+
+    assert service.extract_from_file(str(path), max_chars=100) == full[:100]
+
+    spill = tmp_path / "spill.txt"
+    preview = service.extract_from_file(str(path), max_chars=100, spill_path=str(spill))
+    assert preview == full[:100]
+    assert spill.read_text(encoding="utf-8") == full
+
+
+def test_extraction_cache_reuses_and_dedupes(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    service = UnifiedService(extraction_cache_dir=str(cache_dir))
+    first, second = tmp_path / "a.csv", tmp_path / "b.csv"
+    for path in (first, second):
+        path.write_text("name,city\nRavi,Mysore\n", encoding="utf-8")
+
+    text = service.extract_from_file(str(first))
+
+    def fail(self):
+        raise AssertionError("extractor should not run on a cache hit")
+    monkeypatch.setattr(CSVExtractor, "iter_text", fail)
+
+    # Same bytes under another name: served from the cache, capped reads too.
+    assert service.extract_from_file(str(second)) == text
+    assert service.extract_from_file(str(second), max_chars=4) == text[:4]
+
+    stored = [name for _, _, files in os.walk(cache_dir / "texts") for name in files]
+    assert len(stored) == 1
+
+
+def test_pdf_limits_apply_to_cache_hits(tmp_path):
+    path = tmp_path / "doc.pdf"
+    _make_pdf(path, 3)
+    service = UnifiedService(extraction_cache_dir=str(tmp_path / "cache"))
+    service.extract_from_file(str(path))
+
+    service.extractors[".pdf"] = lambda file_path: PDFExtractor(file_path, max_pages=2)
+    with pytest.raises(ExtractionLimitError):
+        service.extract_from_file(str(path))
+
+
+def _digest(tmp_path, name):
+    path = tmp_path / f"{name}.txt"
+    path.write_text(name, encoding="utf-8")
+    return file_digest(str(path))
+
+
+def test_extraction_cache_prunes_least_recently_used(tmp_path):
+    cache = ExtractionCache(str(tmp_path / "cache"), max_bytes=0)
+    for name in ("old", "new"):
+        writer = cache.writer(_digest(tmp_path, name), "TXTExtractor:v1")
+        writer.write(name * 1000)
+        writer.commit()
+    old_hash = cache.lookup(_digest(tmp_path, "old"), "TXTExtractor:v1")
+    cache.lookup(_digest(tmp_path, "new"), "TXTExtractor:v1")  # now the most recent
+
+    conn = cache._connect()
+    new_size = conn.execute(
+        "SELECT stored_size FROM extraction_texts WHERE text_hash != ?", (old_hash,)
+    ).fetchone()[0]
+    conn.close()
+    cache.max_bytes = new_size
+    assert cache.prune() == 1
+
+    assert cache.lookup(_digest(tmp_path, "old"), "TXTExtractor:v1") is None
+    assert cache.lookup(_digest(tmp_path, "new"), "TXTExtractor:v1")
+    assert not os.path.exists(cache._text_path(old_hash))
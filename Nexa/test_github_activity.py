@@ -0,0 +1,291 @@
+"""
+Tests for GitHubUserActivity: the conditional-request cache, the GraphQL collector
+and the incremental activity store.
+Runs against a local stub server instead of api.github.com.
+"""
+import json
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from services.github_activity import GitHubUserActivity
+from services.github_store import ALL_REPOS, ISO_FORMAT, RESYNC_OVERLAP, GitHubActivityStore
+
+
+REPOS_ETAG = '"repos-v1"'
+
+
+class StubGitHubHandler(BaseHTTPRequestHandler):
+    """Serves two pages of repositories with ETags and answers revalidation with 304."""
+
+    hits = []
+    pr_state = "MERGED"
+
+    def do_GET(self):
+        StubGitHubHandler.hits.append((self.path, self.headers.get("If-None-Match")))
+        base = f"http://127.0.0.1:{self.server.server_port}"
+
+        if self.path.startswith("/users/octo/repos"):
+            page = 2 if "page=2" in self.path else 1
+            etag = f'{REPOS_ETAG[:-1]}-p{page}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            body = json.dumps([{"name": f"repo{page}", "owner": {"login": "octo"}}]).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("ETag", etag)
+            if page == 1:
+                self.send_header("Link", f'<{base}/users/octo/repos?page=2>; rel="next"')
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        if self.path.startswith(("/users/octo/gists", "/users/octo/events")):
+            self._send_json([])
+            return
+
+        self.send_response(404)
+        self.end_headers()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length))
+        query, variables = payload["query"], payload.get("variables", {})
+        StubGitHubHandler.hits.append(("/graphql", None))
+
+        if "contributionsCollection" in query:
+            repos = [
+                {"name": name, "nameWithOwner": f"octo/{name}", "owner": {"login": "octo"}}
+                for name in ("alpha", "beta")
+            ]
+            self._send_json({"data": {"user": {
+                "id": "U_octo",
+                "contributionsCollection": {
+                    "totalCommitContributions": 3,
+                    "totalPullRequestContributions": 1,
+                    "totalIssueContributions": 1,
+                    "commitContributionsByRepository": [
+                        {
+                            "repository": r,
+                            "contributions": {"nodes": [{
+                                "occurredAt": "2025-11-06T08:00:00Z",
+                                "commitCount": 2 if r["name"] == "alpha" else 1,
+                            }]},
+                        }
+                        for r in repos
+                    ],
+                },
+            }}})
+        elif "history(" in query:
+            data = {}
+            for alias in ("r0", "r1"):
+                if f"{alias}:" not in query:
+                    continue
+                block = query.split(f"{alias}:")[1]
+                name = block.split("name: ")[1].split(")")[0].strip('"')
+                second_page = 'after: "alpha-1"' in block
+                has_next = name == "alpha" and not second_page
+                oid = f"{name}-{2 if second_page else 1}"
+                data[alias] = {
+                    "nameWithOwner": f"octo/{name}",
+                    "defaultBranchRef": {"target": {"history": {
+                        "pageInfo": {"hasNextPage": has_next, "endCursor": oid},
+                        "nodes": [{
+                            "oid": oid, "message": "work", "additions": 2, "deletions": 1,
+                            "changedFiles": 1,
+                            "author": {"name": "Octo", "email": "o@x", "date": "2025-11-06T10:00:00Z"},
+                            "committer": {"name": "Octo", "email": "o@x", "date": "2025-11-06T10:00:00Z"},
+                            "parents": {"nodes": [{"oid": "p"}]},
+                        }],
+                    }}},
+                }
+            self._send_json({"data": data})
+        elif "search(" in query:
+            item = {
+                "title": "Fix", "state": StubGitHubHandler.pr_state, "createdAt": "2025-11-06T10:00:00Z",
+                "closedAt": None, "url": "https://github.com/octo/alpha/pull/1",
+                "repository": {"nameWithOwner": "octo/alpha"},
+            }
+            page = {"pageInfo": {"hasNextPage": False, "endCursor": None}, "nodes": [item]}
+            data = {}
+            if variables["withPrs"]:
+                data["prs"] = page
+            if variables["withIssues"]:
+                data["issues"] = {**page, "nodes": [{**item, "state": "OPEN"}]}
+            self._send_json({"data": data})
+        else:
+            self._send_json({"errors": [{"message": "unknown query"}]})
+
+    def _send_json(self, data):
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _start_stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubGitHubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def _make_tracker(tmp_path, port, **kwargs):
+    tracker = GitHubUserActivity(
+        username="octo",
+        start_date="2025-11-06",
+        end_date="2025-11-07",
+        token="test-token",
+        cache_path=str(tmp_path / "github_http_cache.db"),
+        store_path=str(tmp_path / "github_activity.db"),
+        **kwargs,
+    )
+    tracker.api_base = f"http://127.0.0.1:{port}"
+    tracker.graphql_url = f"http://127.0.0.1:{port}/graphql"
+    return tracker
+
+
+def test_revalidation_is_served_from_cache(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    server = _start_stub_server()
+    StubGitHubHandler.hits = []
+    try:
+        first = _make_tracker(tmp_path, server.server_port)._get_user_repos()
+
+        # A fresh instance shares only the on-disk cache with the first one.
+        second = _make_tracker(tmp_path, server.server_port)._get_user_repos()
+    finally:
+        server.shutdown()
+
+    assert [r["name"] for r in first] == ["repo1", "repo2"]
+    assert second == first
+
+    # Second pass revalidated both pages (pagination links came from the cache).
+    revalidations = [etag for _, etag in StubGitHubHandler.hits[2:]]
+    assert revalidations == ['"repos-v1-p1"', '"repos-v1-p2"']
+
+
+def test_cache_can_be_disabled(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    server = _start_stub_server()
+    StubGitHubHandler.hits = []
+    try:
+        _make_tracker(tmp_path, server.server_port)._get_user_repos()
+        _make_tracker(tmp_path, server.server_port, use_cache=False)._get_user_repos()
+    finally:
+        server.shutdown()
+
+    assert all(etag is None for _, etag in StubGitHubHandler.hits)
+
+
+def test_graphql_collector_batches_requests(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    server = _start_stub_server()
+    StubGitHubHandler.hits = []
+    try:
+        tracker = _make_tracker(
+            tmp_path, server.server_port, mode="graphql", use_cache=False,
+            export_dir=str(tmp_path / "export"),
+        )
+        summary = tracker.get_user_activity()
+    finally:
+        server.shutdown()
+
+    assert summary["collector"] == "graphql"
+    assert summary["repositories_worked_on"] == ["octo/alpha", "octo/beta"]
+    assert summary["commits"] == 3
+    assert summary["pull_requests"] == 1
+    assert summary["issues"] == 1
+
+    # contributions + two history pages + one search page, then gists and events over REST.
+    assert tracker.request_count == 6
+
+    with open(os.path.join(summary["output_folder"], "pull_requests.json")) as f:
+        prs = json.load(f)
+    assert prs[0]["state"] == "closed"
+    assert prs[0]["repository_url"].endswith("/repos/octo/alpha")
+
+
+def test_store_only_fetches_uncovered_windows(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    server = _start_stub_server()
+    StubGitHubHandler.hits = []
+    try:
+        first = _make_tracker(tmp_path, server.server_port, mode="graphql", use_cache=False)
+        first_summary = first.get_user_activity()
+
+        # Same past window again: everything is already in the store.
+        second = _make_tracker(tmp_path, server.server_port, mode="graphql", use_cache=False)
+        second_summary = second.get_user_activity()
+    finally:
+        server.shutdown()
+
+    # Only updated PRs/issues (one search) and the high-water-mark kinds (gists,
+    # events) are polled on the second run.
+    assert second.request_count == 3
+    assert second_summary == first_summary
+    assert second_summary["output_folder"] is None
+
+
+def test_state_changes_of_stored_pull_requests_are_picked_up(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(StubGitHubHandler, "pr_state", "OPEN")
+    server = _start_stub_server()
+    try:
+        first = _make_tracker(tmp_path, server.server_port, mode="graphql", use_cache=False)
+        first.get_user_activity()
+        assert first.store.query_activity("octo", "2025-11-06", "2025-11-07")["pull_requests"][0]["state"] == "open"
+
+        # Merged after its window was stored: found again by its update time.
+        StubGitHubHandler.pr_state = "MERGED"
+        second = _make_tracker(tmp_path, server.server_port, mode="graphql", use_cache=False)
+        second.get_user_activity()
+    finally:
+        server.shutdown()
+
+    assert second.store.query_activity("octo", "2025-11-06", "2025-11-07")["pull_requests"][0]["state"] == "closed"
+
+
+def test_failed_repository_fetch_leaves_window_unsynced(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    tracker = _make_tracker(tmp_path, 0, use_cache=False)
+    monkeypatch.setattr(tracker, "_get_user_repos", lambda: [
+        {"name": name, "owner": {"login": "octo"}} for name in ("alpha", "beta")
+    ])
+
+    def paginate(url, params=None, stop_when=None):
+        if "/beta/" in url:
+            raise RuntimeError("GitHub API error 403 for " + url)
+        return []
+    monkeypatch.setattr(tracker, "_paginate", paginate)
+    missing = tracker._missing("commits")
+
+    with pytest.raises(RuntimeError):
+        tracker._sync_window("commits", tracker._get_commits, lambda rows: None)
+
+    assert tracker._missing("commits") == missing
+
+
+def test_recent_coverage_is_fetched_again(tmp_path):
+    store = GitHubActivityStore(str(tmp_path / "store.db"))
+    now = datetime.now(timezone.utc)
+    since = (now - timedelta(days=10)).strftime(ISO_FORMAT)
+    until = now.strftime(ISO_FORMAT)
+    store.mark_synced("octo", "commits", ALL_REPOS, since, until)
+
+    # Commits pushed late may carry committer dates inside the last RESYNC_OVERLAP.
+    [(refetch_from, _)] = store.missing_ranges("octo", "commits", ALL_REPOS, since, until)
+    assert refetch_from <= (now - RESYNC_OVERLAP + timedelta(seconds=1)).strftime(ISO_FORMAT)
+    assert refetch_from > since
@@ -0,0 +1,66 @@
+"""
+Tests for map-reduce summarization of oversized contexts.
+"""
+import threading
+import time
+
+from services.llm.map_reduce import MapReduceSummarizer, split_text
+
+
+class CountingLLM:
+    """Summarizes to the first 20 characters of the text; records concurrency."""
+
+    def __init__(self):
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def invoke(self, prompt):
+        with self.lock:
+            self.calls += 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.02)
+        with self.lock:
+            self.active -= 1
+        return "S:" + prompt.rsplit("\n\n", 1)[-1][:20]
+
+
+def test_split_text_prefers_lines_and_bounds_size():
+    text = "".join(f"line {i}\n" for i in range(100)) + "x" * 250
+    pieces = list(split_text(text, 100))
+    assert "".join(pieces) == text
+    assert all(len(piece) <= 100 for piece in pieces)
+    assert all(piece.endswith("\n") for piece in pieces if "x" not in piece)
+    assert pieces[-3:] == ["x" * 100, "x" * 100, "x" * 50]
+
+
+def test_small_context_passes_through():
+    llm = CountingLLM()
+    assert MapReduceSummarizer(llm, max_context_chars=1000).fit("short") == "short"
+    assert llm.calls == 0
+
+
+def test_map_is_bounded_parallel_and_cached(tmp_path):
+    text = "".join(f"chunk {i:03d} " + "y" * 88 + "\n" for i in range(40))
+    db_path = str(tmp_path / "nexy.db")
+
+    llm = CountingLLM()
+    summary = MapReduceSummarizer(llm, db_path, "m", max_context_chars=2000, chunk_chars=200, max_parallel=3).fit(text)
+    assert len(summary) <= 2000
+    assert summary.startswith("S:chunk 000")
+    assert llm.calls == 20 and llm.peak <= 3
+
+    # Same chunks: every summary comes from the cache
+    again = CountingLLM()
+    assert MapReduceSummarizer(again, db_path, "m", max_context_chars=2000, chunk_chars=200).fit(text) == summary
+    assert again.calls == 0
+
+
+def test_reduce_rounds_until_it_fits():
+    llm = CountingLLM()
+    text = "".join(f"{i:04d}" + "z" * 95 + "\n" for i in range(200))
+    summary = MapReduceSummarizer(llm, max_context_chars=300, chunk_chars=100, max_parallel=8).fit(text)
+    assert len(summary) <= 300
+    assert llm.calls > 200  # map plus at least one reduce round
@@ -0,0 +1,85 @@
+"""
+Tests for the heap-based screenshot scheduler.
+"""
+import threading
+import time
+
+import pytest
+
+from services.screenshot_scheduler import ScheduledScreenshotCapture
+
+
+class VirtualClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return VirtualClock()
+
+
+def test_sessions_fire_on_their_intervals(tmp_path, clock):
+    stored = []
+    capture = ScheduledScreenshotCapture(
+        lambda path: "text", lambda sid, path, text: stored.append(sid), clock=clock, start=False
+    )
+    capture.start_session(1, str(tmp_path), interval_minutes=1)
+    capture.start_session(2, str(tmp_path), interval_minutes=2, duration_minutes=3)
+
+    for _ in range(6):  # six virtual minutes
+        assert capture.run_due() >= 0
+        assert capture.wait_idle(5)
+        clock.now += 60
+    capture.run_due()
+    capture.wait_idle(5)
+
+    assert stored.count(1) == 7
+    assert stored.count(2) == 2  # t=0 and t=2min; over at t=3min
+    assert capture.get_active_sessions() == [1]
+    capture.shutdown()
+
+
+def test_stop_takes_effect_immediately(tmp_path):
+    captured = threading.Event()
+    capture = ScheduledScreenshotCapture(lambda path: captured.set())
+    threads_before = threading.active_count()
+    for sid in range(50):
+        capture.start_session(sid, str(tmp_path), interval_minutes=60)
+    assert threading.active_count() == threads_before  # no thread per session
+    assert captured.wait(5)
+
+    started = time.monotonic()
+    capture.stop_session(7)
+    assert not capture.is_session_active(7)
+    assert time.monotonic() - started < 1
+    capture.shutdown()
+
+
+def test_drops_oldest_when_ocr_falls_behind(tmp_path, clock):
+    release = threading.Event()
+    stored = []
+
+    def slow_ocr(path):
+        release.wait(5)
+        return path
+
+    capture = ScheduledScreenshotCapture(
+        slow_ocr, lambda sid, path, text: stored.append(path),
+        max_workers=1, max_pending=2, clock=clock, start=False
+    )
+    capture.start_session(1, str(tmp_path), interval_minutes=1)
+    for _ in range(5):
+        capture.run_due()
+        time.sleep(0.05)  # let the worker pick up the first capture
+        clock.now += 60
+    release.set()
+    assert capture.wait_idle(5)
+
+    assert capture.dropped == 2
+    # The capture in progress and the two newest were kept
+    assert [path.split("_")[-3] for path in stored] == ["0000", "0003", "0004"]
+    capture.shutdown()
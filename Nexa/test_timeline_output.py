@@ -0,0 +1,59 @@
+"""
+Tests for timeline structured-output parsing and repair.
+"""
+import json
+
+from services.llm.timeline_output import generate_timeline, parse_timeline_output
+
+
+MILESTONE = {"title": "Design", "due_date": "2025-11-10", "assigned_to": "Asha", "status": "completed"}
+SUMMARY = {"name": "Asha", "role": "Designer", "strengths": ["UX"], "weaknesses": []}
+VALID = json.dumps({"project_name": "Nexa", "milestones": [MILESTONE], "employee_summaries": [SUMMARY]})
+
+
+class ScriptedLLM:
+    """Streams one scripted reply per call; a reply may be (chunks, error)."""
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.prompts = []
+
+    def stream(self, prompt):
+        self.prompts.append(prompt)
+        reply = self.replies.pop(0)
+        chunks, error = reply if isinstance(reply, tuple) else ([reply[i:i + 7] for i in range(0, len(reply), 7)], None)
+        yield from chunks
+        if error:
+            raise error
+
+
+def test_valid_reply_needs_one_call():
+    llm = ScriptedLLM("```json\n" + VALID + "\n```")
+    output, _ = generate_timeline(llm, "prompt", "Fallback")
+    assert output.project_name == "Nexa"
+    assert [m.title for m in output.milestones] == ["Design"]
+    assert len(llm.prompts) == 1
+
+
+def test_invalid_entries_are_dropped_not_fatal():
+    text = json.dumps({"milestones": [MILESTONE, {"title": "No date"}], "employee_summaries": [SUMMARY]})
+    output, errors = parse_timeline_output(text, "Fallback")
+    assert output.project_name == "Fallback"
+    assert len(output.milestones) == 1 and len(output.employee_summaries) == 1
+    assert len(errors) == 1 and errors[0].startswith("milestones[1]")
+
+
+def test_interrupted_stream_is_repaired_once():
+    llm = ScriptedLLM(([VALID[:60]], ConnectionError("reset")), VALID)
+    output, text = generate_timeline(llm, "prompt", "Fallback")
+    assert len(llm.prompts) == 2
+    assert VALID[:60] in llm.prompts[1]
+    assert text == VALID and len(output.employee_summaries) == 1
+
+
+def test_failed_repair_keeps_partial_result():
+    truncated = VALID[:VALID.index('"employee_summaries"') + 25]
+    llm = ScriptedLLM(truncated, "not json at all")
+    output, _ = generate_timeline(llm, "prompt", "Fallback")
+    assert len(llm.prompts) == 2
+    assert [m.title for m in output.milestones] == ["Design"]
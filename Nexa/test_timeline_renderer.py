@@ -0,0 +1,45 @@
+"""
+Tests for the built-in timeline renderer.
+"""
+from datetime import date
+
+from PIL import Image
+
+from services.timeline_renderer import normalize_status, parse_milestones, render_timeline
+
+
+MILESTONES = [
+    {"title": "Launch", "due_date": "2026-01-15", "assigned_to": "Team", "status": "Pending"},
+    {"title": "Design", "due_date": "2025-11-10", "assigned_to": "Asha", "status": "done"},
+    {"title": "Build API", "due_date": "2025-12-01", "assigned_to": "Ben", "status": "In Progress",
+     "critical_comment": "Blocked on auth vendor"},
+    {"title": "No date", "assigned_to": "Nobody", "status": "pending"},
+]
+
+
+def test_parse_and_status():
+    assert [m.title for m in parse_milestones(MILESTONES)] == ["Launch", "Design", "Build API"]
+    assert normalize_status("Completed") == "completed"
+    assert normalize_status("in-progress") == "in_progress"
+    assert normalize_status("Delayed") == "at_risk"
+    assert normalize_status("Not started") == "pending"
+    assert normalize_status("Incomplete") == "pending"
+    assert normalize_status("Not completed") == "pending"
+    assert normalize_status("Not completed, blocked") == "at_risk"
+    assert normalize_status("Started, not done yet") == "in_progress"
+    assert normalize_status(None) == "pending"
+
+
+def test_render_is_deterministic(tmp_path):
+    first = render_timeline(MILESTONES, str(tmp_path / "a.png"), "Nexa", date(2025, 12, 5))
+    second = render_timeline(MILESTONES, str(tmp_path / "b.png"), "Nexa", date(2025, 12, 5))
+    with open(first, "rb") as a, open(second, "rb") as b:
+        assert a.read() == b.read()
+    with Image.open(first) as image:
+        assert image.format == "PNG"
+        assert image.width > image.height
+
+
+def test_nothing_to_render(tmp_path):
+    assert render_timeline([{"title": "x"}], str(tmp_path / "c.png")) is None
+    assert not (tmp_path / "c.png").exists()
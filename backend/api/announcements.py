@@ -4,6 +4,7 @@ Announcements API routes.
 from fastapi import APIRouter, Depends, HTTPException
 from typing import List, Optional
 from datetime import datetime
+import asyncio
 import sys
 import os
 
@@ -64,10 +65,7 @@ async def create_announcement(
     current_user: dict = Depends(get_current_user)
 ):
     """Create a new announcement."""
-    conn = db.get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("""
+    announcement_id = await asyncio.wrap_future(db.writer.execute("""
         INSERT INTO announcements (project_id, title, body, from_user_id, type)
         VALUES (?, ?, ?, ?, ?)
     """, (
@@ -76,12 +74,11 @@ async def create_announcement(
         announcement.body,
         current_user['id'],  # Use current user as sender
         announcement.type.value
-    ))
-    
-    announcement_id = cursor.lastrowid
-    conn.commit()
+    )))
     
     # Fetch the created announcement
+    conn = db.get_connection()
+    cursor = conn.cursor()
     cursor.execute("SELECT * FROM announcements WHERE id = ?", (announcement_id,))
     created_announcement = cursor.fetchone()
     conn.close()
@@ -103,17 +100,13 @@ async def delete_announcement(
     current_user: dict = Depends(get_current_user)
 ):
     """Delete an announcement."""
-    conn = db.get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("DELETE FROM announcements WHERE id = ?", (announcement_id,))
+    deleted = await asyncio.wrap_future(
+        db.writer.execute("DELETE FROM announcements WHERE id = ?", (announcement_id,))
+    )
     
-    if cursor.rowcount == 0:
+    if deleted == 0:
         raise HTTPException(status_code=404, detail="Announcement not found")
     
-    conn.commit()
-    conn.close()
-    
     db.log_audit(
         current_user['id'],
         "ANNOUNCEMENT_DELETED",
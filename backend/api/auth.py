@@ -2,8 +2,9 @@
 Authentication API routes.
 """
 from fastapi import APIRouter, HTTPException, Request
+from starlette.concurrency import run_in_threadpool
 from models.schemas import UserRegister, UserLogin, LoginResponse, UserResponse
-from models.database import db
+from backend.models.database import db
 from services.auth_service import AuthService
 from datetime import datetime
 import logging
@@ -17,7 +18,8 @@ auth_service = AuthService(db)
 @router.post("/register", response_model=LoginResponse)
 async def register(user: UserRegister, request: Request):
     """Register a new user (employee or team leader)."""
-    success, message, user_id = auth_service.register_user(
+    success, message, user_id = await run_in_threadpool(
+        auth_service.register_user,
         username=user.username,
         password=user.password,
         name=user.name,
@@ -28,7 +30,8 @@ async def register(user: UserRegister, request: Request):
         raise HTTPException(status_code=400, detail=message)
     
     # Auto-login after registration
-    _, _, user_dict, session_token = auth_service.login_user(
+    _, _, user_dict, session_token = await run_in_threadpool(
+        auth_service.login_user,
         username=user.username,
         password=user.password,
         ip_address=request.client.host if request.client else None
@@ -49,7 +52,8 @@ async def login(credentials: UserLogin, request: Request):
     logger.info(f"Request headers: {dict(request.headers)}")
     logger.info(f"Client IP: {request.client.host if request.client else 'unknown'}")
     
-    success, message, user_dict, session_token = auth_service.login_user(
+    success, message, user_dict, session_token = await run_in_threadpool(
+        auth_service.login_user,
         username=credentials.username,
         password=credentials.password,
         ip_address=request.client.host if request.client else None
@@ -71,7 +75,7 @@ async def logout(authorization: str):
     """Logout user by invalidating session."""
     try:
         _, token = authorization.split()
-        auth_service.logout_user(token)
+        await run_in_threadpool(auth_service.logout_user, token)
         return {"success": True, "message": "Logged out successfully"}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -1,7 +1,9 @@
 """
 Chat API routes using the UnifiedService chat functionality.
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import Optional
+import asyncio
 import os
 import sys
 
@@ -10,6 +12,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
 from backend.models.schemas import ChatRequest, ChatResponse
 from backend.models.database import db
 from backend.dependencies import get_current_user
+from backend.services.pagination import NEXT_CURSOR_HEADER, after_cursor, paginate
 from Nexa.services.services import UnifiedService
 from datetime import datetime
 
@@ -107,21 +110,14 @@ async def send_chat_message(
             history_limit=20
         )
         
-        # Store chat messages in database
-        cursor = db.get_connection().cursor()
-        
-        cursor.execute("""
-            INSERT INTO chat_messages (user_id, session_id, role, message)
-            VALUES (?, ?, 'user', ?)
-        """, (current_user['id'], full_session_id, chat_request.message))
-        
-        cursor.execute("""
+        # Store chat messages in database (group-committed by the writer thread)
+        await asyncio.wrap_future(db.writer.executemany("""
             INSERT INTO chat_messages (user_id, session_id, role, message)
-            VALUES (?, ?, 'assistant', ?)
-        """, (current_user['id'], full_session_id, response_text))
-        
-        cursor.connection.commit()
-        cursor.connection.close()
+            VALUES (?, ?, ?, ?)
+        """, [
+            (current_user['id'], full_session_id, 'user', chat_request.message),
+            (current_user['id'], full_session_id, 'assistant', response_text),
+        ]))
         
         db.log_audit(
             current_user['id'], 
@@ -144,39 +140,55 @@ async def send_chat_message(
 @router.get("/history/{session_id}")
 async def get_chat_history(
     session_id: str,
-    limit: int = 50,
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
     current_user: dict = Depends(get_current_user)
 ):
-    """Get chat history for a session."""
+    """
+    Get the latest chat history for a session.
+    Older messages are paged with the X-Next-Cursor header (pass it as ?cursor=).
+    """
     try:
         full_session_id = f"user_{current_user['id']}_{session_id}"
         
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT role, message, created_at 
+        query = """
+            SELECT id, role, message, created_at 
             FROM chat_messages 
             WHERE user_id = ? AND session_id = ?
-            ORDER BY created_at DESC
-            LIMIT ?
-        """, (current_user['id'], full_session_id, limit))
+        """
+        params = [current_user['id'], full_session_id]
+        condition, cursor_params = after_cursor(("created_at", "id"), cursor)
+        if condition:
+            query += f" AND {condition}"
+            params.extend(cursor_params)
+        query += " ORDER BY created_at DESC, id DESC LIMIT ?"
+        params.append(limit + 1)
         
-        messages = cursor.fetchall()
+        conn = db.get_connection()
+        db_cursor = conn.cursor()
+        db_cursor.execute(query, params)
+        messages = db_cursor.fetchall()
         conn.close()
         
+        messages, next_cursor = paginate(messages, limit, lambda msg: (msg['created_at'], msg['id']))
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        
         return {
             "session_id": session_id,
             "messages": [
                 {
-                    "role": msg[0],
-                    "message": msg[1],
-                    "timestamp": msg[2]
+                    "role": msg['role'],
+                    "message": msg['message'],
+                    "timestamp": msg['created_at']
                 }
                 for msg in reversed(messages)
             ]
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch history: {str(e)}")
 
@@ -190,17 +202,10 @@ async def delete_chat_session(
     try:
         full_session_id = f"user_{current_user['id']}_{session_id}"
         
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
+        deleted_count = await asyncio.wrap_future(db.writer.execute("""
             DELETE FROM chat_messages 
             WHERE user_id = ? AND session_id = ?
-        """, (current_user['id'], full_session_id))
-        
-        deleted_count = cursor.rowcount
-        conn.commit()
-        conn.close()
+        """, (current_user['id'], full_session_id)))
         
         db.log_audit(
             current_user['id'],
@@ -1,10 +1,11 @@
 """
 Daily Updates API endpoints.
 """
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends, Header, Body
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends, Header, Body, Query, Response
 from typing import Optional, List
 from datetime import datetime, date
 from pydantic import BaseModel
+import asyncio
 import os
 import shutil
 import logging
@@ -13,12 +14,30 @@ import sys
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
 
-from models.database import db
+from backend.models.database import db
 from dependencies import get_current_user
+from services.task_repository import TaskRepository
+from services.event_extraction import extract_events
+from services.pagination import NEXT_CURSOR_HEADER, after_cursor, limit_clause, page_size, paginate, parse_fields
 from Nexa.services.services import UnifiedService
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
+
+UPDATE_PAGE_SIZE = 50
+MAX_UPDATE_PAGE_SIZE = 500
+# API field -> daily_updates column
+UPDATE_FIELDS = {
+    "id": "id",
+    "userId": "user_id",
+    "date": "date",
+    "type": "type",
+    "title": "title",
+    "description": "description",
+    "content": "content",
+    "filePath": "file_path",
+    "createdAt": "created_at",
+}
 unified_service = UnifiedService()
 
 # Upload directory for daily update files
@@ -65,54 +84,55 @@ class DailyUpdateCreate(BaseModel):
 
 @router.get("")
 async def get_daily_updates(
+    response: Response,
     date: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_UPDATE_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
     authorization: Optional[str] = Header(None)
 ):
-    """Get daily updates for a specific date or all updates."""
+    """
+    Get daily updates for a specific date (all of them) or the latest 50, newest first.
+    ?limit= or ?cursor= pages instead; pages continue with the X-Next-Cursor
+    header (pass it as ?cursor=). ?fields=id,title,... returns only those fields.
+    """
     try:
         # Get current user from auth
         current_user = await get_current_user(authorization)
         
-        conn = db.get_connection()
-        cursor = conn.cursor()
+        selected = parse_fields(fields, list(UPDATE_FIELDS))
+        wanted = selected or list(UPDATE_FIELDS)
+        columns = dict.fromkeys(["id", "created_at", *(UPDATE_FIELDS[f] for f in wanted)])
+        size = page_size(limit, cursor, UPDATE_PAGE_SIZE)
+        if size is None and not date:
+            size = UPDATE_PAGE_SIZE
         
+        query = f"SELECT {', '.join(columns)} FROM daily_updates WHERE user_id = ?"
+        params = [current_user['id']]
         if date:
-            cursor.execute(
-                """
-                SELECT * FROM daily_updates 
-                WHERE user_id = ? AND date = ?
-                ORDER BY created_at DESC
-                """,
-                (current_user['id'], date)
-            )
-        else:
-            cursor.execute(
-                """
-                SELECT * FROM daily_updates 
-                WHERE user_id = ?
-                ORDER BY created_at DESC
-                LIMIT 50
-                """,
-                (current_user['id'],)
-            )
+            query += " AND date = ?"
+            params.append(date)
+        condition, cursor_params = after_cursor(("created_at", "id"), cursor)
+        if condition:
+            query += f" AND {condition}"
+            params.extend(cursor_params)
+        limit_sql, limit_params = limit_clause(size)
+        query += " ORDER BY created_at DESC, id DESC" + limit_sql
+        params.extend(limit_params)
         
-        updates = cursor.fetchall()
+        conn = db.get_connection()
+        db_cursor = conn.cursor()
+        db_cursor.execute(query, params)
+        updates = db_cursor.fetchall()
         conn.close()
         
-        return [
-            {
-                "id": row[0],
-                "userId": row[1],
-                "date": row[2],
-                "type": row[3],
-                "title": row[4],
-                "description": row[5],
-                "content": row[6],
-                "filePath": row[7],
-                "createdAt": row[8],
-            }
-            for row in updates
-        ]
+        updates, next_cursor = paginate(updates, size, lambda row: (row['created_at'], row['id']))
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        
+        return [{field: row[UPDATE_FIELDS[field]] for field in wanted} for row in updates]
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to fetch daily updates: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -180,10 +200,7 @@ async def create_daily_update(
         
         # Insert into database
         created_at = datetime.now().isoformat()
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute(
+        update_id = await asyncio.wrap_future(db.writer.execute(
             """
             INSERT INTO daily_updates 
             (user_id, date, type, title, description, content, file_path, created_at)
@@ -191,14 +208,13 @@ async def create_daily_update(
             """,
             (current_user['id'], update_data.date, update_data.type, update_data.title, 
              update_data.description, update_content, None, created_at)
-        )
-        conn.commit()
+        ))
+        
+        conn = db.get_connection()
+        cursor = conn.cursor()
         
         # Get the inserted record
-        cursor.execute(
-            "SELECT * FROM daily_updates WHERE user_id = ? ORDER BY created_at DESC LIMIT 1",
-            (current_user['id'],)
-        )
+        cursor.execute("SELECT * FROM daily_updates WHERE id = ?", (update_id,))
         result = cursor.fetchone()
         conn.close()
         
@@ -261,13 +277,13 @@ async def delete_daily_update(
             except Exception as e:
                 logger.warning(f"Failed to delete file {file_path}: {e}")
         
+        conn.close()
+        
         # Delete from database
-        cursor.execute(
+        await asyncio.wrap_future(db.writer.execute(
             "DELETE FROM daily_updates WHERE id = ?",
             (update_id,)
-        )
-        conn.commit()
-        conn.close()
+        ))
         
         return {"success": True, "message": "Daily update deleted successfully"}
         
@@ -280,33 +296,54 @@ async def delete_daily_update(
 
 @router.post("/update-all-to-events")
 async def update_all_to_events(
+    full: bool = False,
     authorization: Optional[str] = Header(None)
 ):
     """
-    Process ALL daily updates for the current user and convert them to calendar events using LLM.
-    This aggregates all updates and extracts tasks, meetings, and events from the combined content.
+    Convert the current user's daily updates to calendar events.
+    Only updates added since the previous run are processed; pass full=true to
+    reprocess all of them. Events are upserted per source update, so running
+    again never duplicates tasks.
     """
     try:
         # Get current user from auth
         current_user = await get_current_user(authorization)
         
-        # Get ALL daily updates for this user
         conn = db.get_connection()
         cursor = conn.cursor()
         
+        watermark = 0
+        if not full:
+            cursor.execute(
+                "SELECT last_update_id FROM update_event_watermarks WHERE user_id = ?",
+                (current_user['id'],)
+            )
+            row = cursor.fetchone()
+            watermark = row[0] if row else 0
+        
+        # Get the daily updates not converted yet
         cursor.execute(
             """
             SELECT id, user_id, date, type, title, description, content, created_at
             FROM daily_updates 
-            WHERE user_id = ?
+            WHERE user_id = ? AND id > ?
             ORDER BY date DESC, created_at DESC
             """,
-            (current_user['id'],)
+            (current_user['id'], watermark)
         )
         updates = cursor.fetchall()
+        conn.close()
         
         if not updates:
-            conn.close()
+            if watermark:
+                return {
+                    "success": True,
+                    "message": "No new daily updates since the last run",
+                    "total_updates_processed": 0,
+                    "events_created": 0,
+                    "events": [],
+                    "summary": "",
+                }
             raise HTTPException(status_code=404, detail="No daily updates found for this user")
         
         # Build aggregated context from ALL updates
@@ -373,118 +410,7 @@ Total Updates: {len(updates)}
         # Advanced rule-based event extraction (no LLM needed)
         logger.info(f"Processing {len(updates)} updates to events using smart pattern matching")
         
-        import re
-        from datetime import datetime, timedelta
-        
-        events_data = []
-        
-        for update in updates:
-            update_dict = {
-                "date": update[2],
-                "type": update[3],
-                "title": update[4],
-                "content": update[6] or ""
-            }
-            
-            full_text = f"{update_dict['title']}\n{update_dict['content']}"
-            
-            # Extract dates - multiple formats
-            date_patterns = [
-                r'(?:start date|begin|starts?|from)[\s:]*(?:🕓|🗓️)?[\s]*([A-Za-z]+\s+\d{1,2},?\s+\d{4})',
-                r'(?:end date|deadline|due|until|by)[\s:]*(?:🕔|🗓️)?[\s]*([A-Za-z]+\s+\d{1,2},?\s+\d{4})',
-                r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
-                r'(\d{4}[/-]\d{1,2}[/-]\d{1,2})',
-            ]
-            
-            # Extract times - multiple formats
-            time_patterns = [
-                r'(\d{1,2}):(\d{2})\s*(am|pm|AM|PM)',
-                r'(\d{1,2})\s*(am|pm|AM|PM)',
-            ]
-            
-            # Extract priority
-            priority = "medium"
-            if re.search(r'priority[\s:]*(?:🔴|high|urgent)', full_text, re.IGNORECASE):
-                priority = "high"
-            elif re.search(r'priority[\s:]*(?:🟢|low)', full_text, re.IGNORECASE):
-                priority = "low"
-            
-            # Extract status
-            status = "pending"
-            if re.search(r'status[\s:]*(?:🟢|completed|done)', full_text, re.IGNORECASE):
-                status = "completed"
-            elif re.search(r'status[\s:]*(?:🟡|in progress|ongoing)', full_text, re.IGNORECASE):
-                status = "in_progress"
-            
-            # Try to find start date
-            start_date = None
-            start_time = "09:00"
-            for pattern in date_patterns:
-                match = re.search(pattern, full_text, re.IGNORECASE)
-                if match and 'start' in pattern:
-                    try:
-                        date_str = match.group(1)
-                        # Parse "November 10, 2025" format
-                        parsed_date = datetime.strptime(date_str.replace(',', ''), '%B %d %Y')
-                        start_date = parsed_date.strftime('%Y-%m-%d')
-                        break
-                    except:
-                        pass
-            
-            # Try to find start time
-            for pattern in time_patterns:
-                match = re.search(r'(?:start|begin|from).*?' + pattern, full_text, re.IGNORECASE)
-                if match:
-                    try:
-                        hour = int(match.group(1))
-                        minute = int(match.group(2)) if len(match.groups()) > 2 and match.group(2) else 0
-                        meridiem = match.group(3 if len(match.groups()) > 2 else 2).lower()
-                        
-                        if meridiem == 'pm' and hour < 12:
-                            hour += 12
-                        elif meridiem == 'am' and hour == 12:
-                            hour = 0
-                        
-                        start_time = f"{hour:02d}:{minute:02d}"
-                        break
-                    except:
-                        pass
-            
-            # Try to find end time
-            end_time = "18:00"  # Default 6 PM
-            for pattern in time_patterns:
-                match = re.search(r'(?:end|deadline|by|until).*?' + pattern, full_text, re.IGNORECASE)
-                if match:
-                    try:
-                        hour = int(match.group(1))
-                        minute = int(match.group(2)) if len(match.groups()) > 2 and match.group(2) else 0
-                        meridiem = match.group(3 if len(match.groups()) > 2 else 2).lower()
-                        
-                        if meridiem == 'pm' and hour < 12:
-                            hour += 12
-                        elif meridiem == 'am' and hour == 12:
-                            hour = 0
-                        
-                        end_time = f"{hour:02d}:{minute:02d}"
-                        break
-                    except:
-                        pass
-            
-            # If no start date found, use today
-            if not start_date:
-                start_date = datetime.now().strftime('%Y-%m-%d')
-            
-            # Create event
-            events_data.append({
-                "title": update_dict['title'],
-                "description": update_dict['content'][:500] if update_dict['content'] else update_dict['title'],
-                "start_time": start_time,
-                "end_time": end_time,
-                "date": start_date,
-                "type": "task",
-                "priority": priority,
-                "status": status
-            })
+        events_data = extract_events((update[4], update[6]) for update in updates)
         
         summary = f"Extracted {len(events_data)} detailed events from {len(updates)} daily updates"
         
@@ -521,63 +447,8 @@ Total Updates: {len(updates)}
             event_type = event.get('type', 'general') if isinstance(event, dict) else getattr(event, 'type', 'general')
             priority = event.get('priority', 'medium') if isinstance(event, dict) else getattr(event, 'priority', 'medium')
             
-            # Calculate duration in hours
-            try:
-                start_h, start_m = map(int, start_time.split(':'))
-                end_h, end_m = map(int, end_time.split(':'))
-                duration = ((end_h * 60 + end_m) - (start_h * 60 + start_m)) / 60.0
-            except:
-                duration = 1.0
-            
-            # Create full datetime strings for start and end
-            start_datetime = f"{event_date}T{start_time}:00"
-            end_datetime = f"{event_date}T{end_time}:00"
-            
-            # Get or create a session for today
-            cursor.execute("""
-                SELECT id FROM daily_sessions 
-                WHERE user_id = ? AND date = date('now')
-            """, (current_user['id'],))
-            session_row = cursor.fetchone()
-            
-            if session_row:
-                session_id = session_row[0]
-            else:
-                # Create a new session for today
-                cursor.execute("""
-                    INSERT INTO daily_sessions (user_id, date, status)
-                    VALUES (?, date('now'), 'in_progress')
-                """, (current_user['id'],))
-                session_id = cursor.lastrowid
-            
-            # Get default project ID (first project or None)
-            cursor.execute("SELECT id FROM projects LIMIT 1")
-            project_row = cursor.fetchone()
-            project_id = str(project_row[0]) if project_row else None
-            
-            cursor.execute("""
-                INSERT INTO tasks 
-                (session_id, user_id, title, description, status, priority, due_date, start_time, end_time, project_id, assignee, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                session_id,
-                current_user['id'],
-                event_title,
-                f"[Auto-generated from Daily Updates]\n{event_desc}\nScheduled: {start_time} - {end_time}",
-                'pending',
-                priority,
-                event_date,
-                start_datetime,
-                end_datetime,
-                project_id,
-                current_user['name'],
-                datetime.now().isoformat(),
-                datetime.now().isoformat()
-            ))
-            
-            event_id = cursor.lastrowid
             created_events.append({
-                "id": event_id,
+                "id": None,
                 "title": event_title,
                 "description": event_desc,
                 "start_time": start_time,
@@ -587,8 +458,48 @@ Total Updates: {len(updates)}
                 "date": event_date
             })
         
-        conn.commit()
-        conn.close()
+        def store_events(cursor):
+            repository = TaskRepository(cursor)
+            session_id = repository.today_session_id(current_user['id'])
+            project_id = repository.default_project_id()
+            now = datetime.now().isoformat()
+            rows = [
+                {
+                    "source_update_id": update[0],
+                    "session_id": session_id,
+                    "user_id": current_user['id'],
+                    "title": event['title'],
+                    "description": f"[Auto-generated from Daily Updates]\n{event['description']}\nScheduled: {event['start_time']} - {event['end_time']}",
+                    "status": 'pending',
+                    "priority": event['priority'],
+                    "due_date": event['date'],
+                    "start_time": f"{event['date']}T{event['start_time']}:00",
+                    "end_time": f"{event['date']}T{event['end_time']}:00",
+                    "project_id": project_id,
+                    "assignee": current_user['name'],
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for update, event in zip(updates, created_events)
+            ]
+            event_ids = repository.insert_many(
+                rows,
+                conflict_key=("user_id", "source_update_id"),
+                # Keep status and assignment the user may have changed since
+                update_columns=("title", "description", "priority", "due_date", "start_time", "end_time", "updated_at"),
+            )
+            cursor.execute("""
+                INSERT INTO update_event_watermarks (user_id, last_update_id) VALUES (?, ?)
+                ON CONFLICT(user_id) DO UPDATE SET
+                    last_update_id = MAX(last_update_id, excluded.last_update_id),
+                    updated_at = CURRENT_TIMESTAMP
+            """, (current_user['id'], max(update[0] for update in updates)))
+            return event_ids
+        
+        # One transaction: session and project lookups, a bulk upsert and the watermark
+        event_ids = await db.writer.write(store_events)
+        for event, event_id in zip(created_events, event_ids):
+            event["id"] = event_id
         
         return {
             "success": True,
@@ -4,6 +4,7 @@ Projects API routes.
 from fastapi import APIRouter, Depends, HTTPException
 from typing import List
 from datetime import datetime
+import asyncio
 import sys
 import os
 
@@ -54,10 +55,7 @@ async def create_project(
     current_user: dict = Depends(get_current_user)
 ):
     """Create a new project."""
-    conn = db.get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("""
+    project_id = await asyncio.wrap_future(db.writer.execute("""
         INSERT INTO projects (name, description, lead_user_id, deadline, color)
         VALUES (?, ?, ?, ?, ?)
     """, (
@@ -66,12 +64,11 @@ async def create_project(
         project.lead_user_id,
         project.deadline,
         project.color
-    ))
-    
-    project_id = cursor.lastrowid
-    conn.commit()
+    )))
     
     # Fetch the created project
+    conn = db.get_connection()
+    cursor = conn.cursor()
     cursor.execute("SELECT * FROM projects WHERE id = ?", (project_id,))
     created_project = cursor.fetchone()
     conn.close()
@@ -133,8 +130,7 @@ async def update_project(
         params.append(project_id)
         
         query = f"UPDATE projects SET {', '.join(updates)} WHERE id = ?"
-        cursor.execute(query, params)
-        conn.commit()
+        await asyncio.wrap_future(db.writer.execute(query, params))
     
     # Fetch updated project
     cursor.execute("SELECT * FROM projects WHERE id = ?", (project_id,))
@@ -158,17 +154,13 @@ async def delete_project(
     current_user: dict = Depends(get_current_user)
 ):
     """Delete a project."""
-    conn = db.get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("DELETE FROM projects WHERE id = ?", (project_id,))
+    deleted = await asyncio.wrap_future(
+        db.writer.execute("DELETE FROM projects WHERE id = ?", (project_id,))
+    )
     
-    if cursor.rowcount == 0:
+    if deleted == 0:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    conn.commit()
-    conn.close()
-    
     db.log_audit(
         current_user['id'],
         "PROJECT_DELETED",
@@ -1,11 +1,12 @@
 """
 Daily session API routes for handling uploads and data submission.
 """
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Header, BackgroundTasks, Request, Response
+from starlette.concurrency import run_in_threadpool
 from typing import Optional, List
 from datetime import date, datetime
+import asyncio
 import os
-import shutil
 import sys
 
 # Add parent paths
@@ -13,42 +14,61 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
 
 from backend.models.schemas import *
 from backend.models.database import db
-from backend.services.video_processor import VideoProcessor, get_video_duration
+from backend.services.video_processor import get_video_duration
+from backend.services.blob_store import BlobStore
+from backend.services.ingest import ingest_to_blob, MAX_DOCUMENT_BYTES, MAX_VIDEO_BYTES
+from backend.services.resumable_upload import ResumableUploadService
+from backend.services.screenshot_schedules import ScreenshotScheduleService
+from backend.services.workers import (
+    run_in_worker, WorkerTimeout, extract_text, capture_screen, process_video as extract_video_text,
+    OCR_TIMEOUT, VIDEO_TIMEOUT
+)
 from backend.dependencies import get_current_user
-from Nexa.services.services import UnifiedService
 
 router = APIRouter()
-video_processor = VideoProcessor()
-unified_service = UnifiedService()
+blob_store = BlobStore(db)
+resumable_uploads = ResumableUploadService(db)
+# Started from the app lifespan; only the process owning the schedules captures
+screenshot_schedules = ScreenshotScheduleService(db, blob_store=blob_store)
 
+TUS_VERSION = "1.0.0"
 
-def get_or_create_daily_session(user_id: int, session_date: date) -> int:
-    """Get existing or create new daily session for user and date."""
-    conn = db.get_connection()
-    cursor = conn.cursor()
-    
-    # Check if session exists
+# Extracted text kept in SQLite is capped; extraction stops once the cap is reached.
+MAX_STORED_TEXT_CHARS = int(os.getenv("MAX_STORED_TEXT_CHARS", "2000000"))
+
+
+def _find_daily_session(cursor, user_id: int, session_date: date) -> Optional[int]:
     cursor.execute("""
         SELECT id FROM daily_sessions 
         WHERE user_id = ? AND date = ?
     """, (user_id, session_date))
-    
     row = cursor.fetchone()
-    if row:
-        session_id = row[0]
-    else:
-        # Create new session
+    return row[0] if row else None
+
+
+async def get_or_create_daily_session(user_id: int, session_date: date) -> int:
+    """Get existing or create new daily session for user and date."""
+    conn = db.get_connection()
+    session_id = _find_daily_session(conn.cursor(), user_id, session_date)
+    conn.close()
+    if session_id:
+        return session_id
+
+    def create_session(cursor):
+        # Checked again on the writer: another request may have created it meanwhile
+        existing = _find_daily_session(cursor, user_id, session_date)
+        if existing:
+            return existing, False
         cursor.execute("""
             INSERT INTO daily_sessions (user_id, date, status)
             VALUES (?, ?, 'in_progress')
         """, (user_id, session_date))
-        session_id = cursor.lastrowid
-        conn.commit()
-        
+        return cursor.lastrowid, True
+
+    session_id, created = await db.writer.write(create_session)
+    if created:
         db.log_audit(user_id, "SESSION_CREATED", "daily_sessions", session_id,
                     f"Daily session created for {session_date}")
-    
-    conn.close()
     return session_id
 
 
@@ -58,19 +78,15 @@ async def create_daily_session(
     current_user: dict = Depends(get_current_user)
 ):
     """Create or get daily session for a specific date."""
-    session_id = get_or_create_daily_session(current_user['id'], session_data.date)
+    session_id = await get_or_create_daily_session(current_user['id'], session_data.date)
     
     # Update GitHub info if provided
     if session_data.github_username or session_data.github_repo:
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
+        await asyncio.wrap_future(db.writer.execute("""
             UPDATE daily_sessions 
             SET github_username = ?, github_repo = ?
             WHERE id = ?
-        """, (session_data.github_username, session_data.github_repo, session_id))
-        conn.commit()
-        conn.close()
+        """, (session_data.github_username, session_data.github_repo, session_id)))
     
     return {"session_id": session_id, "date": session_data.date, "status": "in_progress"}
 
@@ -80,32 +96,33 @@ async def upload_transcript(
     session_date: date = Form(...),
     upload_type: Optional[UploadType] = Form(UploadType.GENERAL),
     file: UploadFile = File(...),
+    content_sha256: Optional[str] = Header(None),
     current_user: dict = Depends(get_current_user)
 ):
     """Upload transcript file (meeting notes, etc.)."""
-    session_id = get_or_create_daily_session(current_user['id'], session_date)
+    session_id = await get_or_create_daily_session(current_user['id'], session_date)
     
-    # Save file
-    file_path = f"backend/uploads/transcripts/{current_user['id']}_{session_date}_{file.filename}"
-    with open(file_path, "wb") as f:
-        shutil.copyfileobj(file.file, f)
+    # Save file once under its content hash; identical uploads share it
+    file_ext = os.path.splitext(file.filename)[1].lower()
+    upload = await ingest_to_blob(file, blob_store, max_bytes=MAX_DOCUMENT_BYTES, expected_sha256=content_sha256)
+    blob_hash, file_path = upload.blob_hash, upload.path
     
     # Extract text content
     try:
-        content = unified_service.extract_from_file(file_path)
+        content = await run_in_worker(extract_text, file_path, MAX_STORED_TEXT_CHARS, file_ext)
     except Exception as e:
         content = f"[Error extracting content: {str(e)}]"
     
+    def store_transcript(cursor):
+        cursor.execute("""
+            INSERT INTO transcripts (session_id, filename, file_path, blob_hash, content, upload_type)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (session_id, file.filename, file_path, blob_hash, content, upload_type.value))
+        blob_store.add_ref(cursor, blob_hash)
+        return cursor.lastrowid
+
     # Store in database
-    conn = db.get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO transcripts (session_id, filename, file_path, content, upload_type)
-        VALUES (?, ?, ?, ?, ?)
-    """, (session_id, file.filename, file_path, content, upload_type.value))
-    transcript_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
+    transcript_id = await db.writer.write(store_transcript)
     
     db.log_audit(current_user['id'], "TRANSCRIPT_UPLOADED", "transcripts", transcript_id,
                 f"Uploaded transcript: {file.filename}")
@@ -119,50 +136,57 @@ async def upload_transcript(
     )
 
 
+def register_video(session_id: int, filename: str, blob_hash: str, file_path: str):
+    """Insert a stored video (not processed yet) and return (video_id, duration)."""
+    duration = get_video_duration(file_path)
+    
+    def store_video(cursor):
+        cursor.execute("""
+            INSERT INTO videos (session_id, filename, file_path, blob_hash, duration_seconds, processed)
+            VALUES (?, ?, ?, ?, ?, FALSE)
+        """, (session_id, filename, file_path, blob_hash, int(duration)))
+        blob_store.add_ref(cursor, blob_hash)
+        return cursor.lastrowid
+
+    video_id = db.writer.submit(store_video).result()
+    return video_id, duration
+
+
+async def process_video(video_id: int, file_path: str, interval_seconds: int):
+    """Extract frames with OCR (in a worker process) and store the combined text on the video row."""
+    output_dir = f"backend/uploads/video_frames/{video_id}"
+    try:
+        result = await run_in_worker(extract_video_text, file_path, output_dir, interval_seconds,
+                                     timeout=VIDEO_TIMEOUT)
+    except WorkerTimeout as e:
+        result = {'error': str(e)}
+    
+    # Update with extracted text
+    if 'combined_text' in result:
+        await asyncio.wrap_future(db.writer.execute("""
+            UPDATE videos 
+            SET extracted_text = ?, processed = TRUE, processed_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        """, (result['combined_text'], video_id)))
+
+
 @router.post("/upload-video")
 async def upload_video(
     session_date: date = Form(...),
     interval_seconds: int = Form(30),
     file: UploadFile = File(...),
+    content_sha256: Optional[str] = Header(None),
     current_user: dict = Depends(get_current_user)
 ):
     """Upload video file and extract frames with OCR."""
-    session_id = get_or_create_daily_session(current_user['id'], session_date)
+    session_id = await get_or_create_daily_session(current_user['id'], session_date)
     
-    # Save video file
-    file_path = f"backend/uploads/videos/{current_user['id']}_{session_date}_{file.filename}"
-    with open(file_path, "wb") as f:
-        shutil.copyfileobj(file.file, f)
+    # Save video file under its content hash
+    upload = await ingest_to_blob(file, blob_store, max_bytes=MAX_VIDEO_BYTES, expected_sha256=content_sha256)
+    blob_hash, file_path = upload.blob_hash, upload.path
     
-    # Get video duration
-    duration = get_video_duration(file_path)
-    
-    # Store in database (mark as not processed yet)
-    conn = db.get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO videos (session_id, filename, file_path, duration_seconds, processed)
-        VALUES (?, ?, ?, ?, FALSE)
-    """, (session_id, file.filename, file_path, int(duration)))
-    video_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
-    
-    # Process video in background
-    output_dir = f"backend/uploads/video_frames/{video_id}"
-    result = video_processor.process_video_with_ocr(file_path, output_dir, interval_seconds, store=True)
-    
-    # Update with extracted text
-    if 'combined_text' in result:
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            UPDATE videos 
-            SET extracted_text = ?, processed = TRUE, processed_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-        """, (result['combined_text'], video_id))
-        conn.commit()
-        conn.close()
+    video_id, duration = await run_in_threadpool(register_video, session_id, file.filename, blob_hash, file_path)
+    await process_video(video_id, file_path, interval_seconds)
     
     db.log_audit(current_user['id'], "VIDEO_UPLOADED", "videos", video_id,
                 f"Uploaded and processed video: {file.filename}")
@@ -175,6 +199,109 @@ async def upload_video(
     )
 
 
+# ============= Resumable video uploads (tus-style) =============
+
+def _upload_response(upload: dict) -> ResumableUploadResponse:
+    return ResumableUploadResponse(
+        upload_id=upload['id'],
+        filename=upload['filename'],
+        offset=upload['upload_offset'],
+        total_size=upload['total_size'],
+        status=upload['status']
+    )
+
+
+@router.post("/uploads", status_code=201, response_model=ResumableUploadResponse)
+async def create_resumable_upload(
+    upload_data: ResumableUploadCreate,
+    response: Response,
+    current_user: dict = Depends(get_current_user)
+):
+    """Start a resumable video upload; send the bytes with PATCH, then finalize."""
+    if upload_data.total_size > MAX_VIDEO_BYTES:
+        raise HTTPException(status_code=413, detail=f"Uploads are limited to {MAX_VIDEO_BYTES} bytes")
+    
+    upload = await run_in_threadpool(
+        resumable_uploads.create, current_user['id'], upload_data.session_date, upload_data.filename,
+        upload_data.total_size, upload_data.interval_seconds
+    )
+    response.headers["Location"] = f"/api/sessions/uploads/{upload['id']}"
+    response.headers["Upload-Offset"] = "0"
+    response.headers["Tus-Resumable"] = TUS_VERSION
+    return _upload_response(upload)
+
+
+@router.head("/uploads/{upload_id}")
+async def get_resumable_upload_offset(
+    upload_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Report how many bytes of an upload have been received."""
+    upload = resumable_uploads.get(upload_id, current_user['id'])
+    return Response(status_code=200, headers={
+        "Upload-Offset": str(upload['upload_offset']),
+        "Upload-Length": str(upload['total_size']),
+        "Tus-Resumable": TUS_VERSION,
+        "Cache-Control": "no-store"
+    })
+
+
+@router.patch("/uploads/{upload_id}", status_code=204)
+async def append_resumable_upload(
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(...),
+    upload_checksum: Optional[str] = Header(None),
+    current_user: dict = Depends(get_current_user)
+):
+    """Append the request body at Upload-Offset (optionally verified by Upload-Checksum)."""
+    offset = await resumable_uploads.append(
+        upload_id, current_user['id'], upload_offset, request.stream(), upload_checksum
+    )
+    return Response(status_code=204, headers={"Upload-Offset": str(offset), "Tus-Resumable": TUS_VERSION})
+
+
+@router.post("/uploads/{upload_id}/finalize")
+async def finalize_resumable_upload(
+    upload_id: str,
+    background_tasks: BackgroundTasks,
+    current_user: dict = Depends(get_current_user)
+):
+    """Store a completed upload as a session video and queue its processing."""
+    upload = await run_in_threadpool(resumable_uploads.claim_for_finalize, upload_id, current_user['id'])
+    if upload is None:
+        # Finalized earlier (e.g. the client retried after a lost response)
+        upload = resumable_uploads.get(upload_id, current_user['id'])
+        return {"upload_id": upload_id, "video_id": upload['video_id'], "status": "finalized"}
+    
+    try:
+        # Linked, not moved: a failed finalize can be retried from the partial file.
+        blob_hash = await run_in_threadpool(blob_store.put_file, upload['partial_path'], link=True)
+        file_path = blob_store.path_for(blob_hash)
+        session_id = await get_or_create_daily_session(current_user['id'], upload['session_date'])
+        video_id, duration = await run_in_threadpool(
+            register_video, session_id, upload['filename'], blob_hash, file_path
+        )
+    except Exception:
+        await run_in_threadpool(resumable_uploads.release_claim, upload_id)
+        raise
+    await run_in_threadpool(resumable_uploads.mark_finalized, upload_id, video_id)
+    await run_in_threadpool(resumable_uploads.remove_partial, upload)
+    
+    # Frame extraction and OCR run after the response is sent
+    background_tasks.add_task(process_video, video_id, file_path, upload['interval_seconds'])
+    
+    db.log_audit(current_user['id'], "VIDEO_UPLOADED", "videos", video_id,
+                f"Uploaded video via resumable upload: {upload['filename']}")
+    
+    return {
+        "upload_id": upload_id,
+        "video_id": video_id,
+        "status": "finalized",
+        "duration_seconds": duration
+    }
+
+
 @router.post("/start-screenshot-schedule")
 async def start_screenshot_schedule(
     session_date: date = Form(...),
@@ -182,19 +309,15 @@ async def start_screenshot_schedule(
     current_user: dict = Depends(get_current_user)
 ):
     """Start automated screenshot capture schedule."""
-    session_id = get_or_create_daily_session(current_user['id'], session_date)
+    session_id = await get_or_create_daily_session(current_user['id'], session_date)
     
     # Create schedule record
-    conn = db.get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
+    schedule_id = await asyncio.wrap_future(db.writer.execute("""
         INSERT INTO screenshot_schedules 
         (session_id, user_id, interval_minutes, duration_minutes, status)
         VALUES (?, ?, ?, ?, 'active')
-    """, (session_id, current_user['id'], schedule.interval_minutes, schedule.duration_minutes))
-    schedule_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
+    """, (session_id, current_user['id'], schedule.interval_minutes, schedule.duration_minutes)))
+    await run_in_threadpool(screenshot_schedules.sync)
     
     db.log_audit(current_user['id'], "SCREENSHOT_SCHEDULE_STARTED", "screenshot_schedules", schedule_id,
                 f"Started screenshot capture: {schedule.interval_minutes}min interval for {schedule.duration_minutes}min")
@@ -212,29 +335,36 @@ async def capture_screenshot(
     current_user: dict = Depends(get_current_user)
 ):
     """Manually capture a single screenshot."""
-    session_id = get_or_create_daily_session(current_user['id'], session_date)
+    session_id = await get_or_create_daily_session(current_user['id'], session_date)
     
     # Capture screenshot using unified service
-    result = unified_service.capture_and_process_screen(store=False)
+    try:
+        result = await run_in_worker(capture_screen, timeout=OCR_TIMEOUT)
+    except WorkerTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
     
     if 'error' in result:
         raise HTTPException(status_code=500, detail=result['error'])
     
     # Save screenshot
+    blob_hash = None
     screenshot_path = f"backend/uploads/screenshots/{current_user['id']}_{session_date}_{datetime.now().strftime('%H%M%S')}.png"
     if result.get('image_path'):
-        shutil.move(result['image_path'], screenshot_path)
+        blob_hash = await run_in_threadpool(blob_store.put_file, result['image_path'], True)
+        screenshot_path = blob_store.path_for(blob_hash)
     
+    def store_screenshot(cursor):
+        cursor.execute("""
+            INSERT INTO screenshots (session_id, file_path, blob_hash, extracted_text, capture_mode)
+            VALUES (?, ?, ?, ?, 'manual')
+        """, (session_id, screenshot_path, blob_hash, result.get('text', '')))
+        screenshot_id = cursor.lastrowid
+        if blob_hash:
+            blob_store.add_ref(cursor, blob_hash)
+        return screenshot_id
+
     # Store in database
-    conn = db.get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO screenshots (session_id, file_path, extracted_text, capture_mode)
-        VALUES (?, ?, ?, 'manual')
-    """, (session_id, screenshot_path, result.get('text', '')))
-    screenshot_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
+    screenshot_id = await db.writer.write(store_screenshot)
     
     db.log_audit(current_user['id'], "SCREENSHOT_CAPTURED", "screenshots", screenshot_id,
                 "Manual screenshot captured")
@@ -252,17 +382,12 @@ async def stop_screenshot_schedule(
     current_user: dict = Depends(get_current_user)
 ):
     """Stop an active screenshot schedule."""
-    conn = db.get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("""
+    await asyncio.wrap_future(db.writer.execute("""
         UPDATE screenshot_schedules 
         SET status = 'stopped', stopped_at = CURRENT_TIMESTAMP
         WHERE id = ? AND user_id = ?
-    """, (schedule_id, current_user['id']))
-    
-    conn.commit()
-    conn.close()
+    """, (schedule_id, current_user['id'])))
+    await run_in_threadpool(screenshot_schedules.sync)
     
     db.log_audit(current_user['id'], "SCREENSHOT_SCHEDULE_STOPPED", "screenshot_schedules", schedule_id,
                 "Screenshot schedule stopped")
@@ -274,34 +399,34 @@ async def stop_screenshot_schedule(
 async def upload_file(
     session_date: date = Form(...),
     file: UploadFile = File(...),
+    content_sha256: Optional[str] = Header(None),
     current_user: dict = Depends(get_current_user)
 ):
     """Upload any additional file."""
-    session_id = get_or_create_daily_session(current_user['id'], session_date)
+    session_id = await get_or_create_daily_session(current_user['id'], session_date)
     
     # Save file
     file_ext = os.path.splitext(file.filename)[1].lower()
-    file_path = f"backend/uploads/files/{current_user['id']}_{session_date}_{file.filename}"
-    with open(file_path, "wb") as f:
-        shutil.copyfileobj(file.file, f)
+    upload = await ingest_to_blob(file, blob_store, max_bytes=MAX_DOCUMENT_BYTES, expected_sha256=content_sha256)
+    blob_hash, file_path = upload.blob_hash, upload.path
     
     # Try to extract text
     extracted_text = ""
     try:
-        extracted_text = unified_service.extract_from_file(file_path)
+        extracted_text = await run_in_worker(extract_text, file_path, MAX_STORED_TEXT_CHARS, file_ext)
     except:
         pass
     
+    def store_file(cursor):
+        cursor.execute("""
+            INSERT INTO uploaded_files (session_id, filename, file_path, blob_hash, file_type, extracted_text)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (session_id, file.filename, file_path, blob_hash, file_ext, extracted_text))
+        blob_store.add_ref(cursor, blob_hash)
+        return cursor.lastrowid
+
     # Store in database
-    conn = db.get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO uploaded_files (session_id, filename, file_path, file_type, extracted_text)
-        VALUES (?, ?, ?, ?, ?)
-    """, (session_id, file.filename, file_path, file_ext, extracted_text))
-    file_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
+    file_id = await db.writer.write(store_file)
     
     db.log_audit(current_user['id'], "FILE_UPLOADED", "uploaded_files", file_id,
                 f"Uploaded file: {file.filename}")
@@ -368,21 +493,15 @@ async def submit_daily_session(
     current_user: dict = Depends(get_current_user)
 ):
     """Mark daily session as submitted and ready for processing."""
-    conn = db.get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("""
+    submitted = await asyncio.wrap_future(db.writer.execute("""
         UPDATE daily_sessions 
         SET status = 'submitted', submitted_at = CURRENT_TIMESTAMP
         WHERE user_id = ? AND date = ?
-    """, (current_user['id'], session_date))
+    """, (current_user['id'], session_date)))
     
-    if cursor.rowcount == 0:
+    if submitted == 0:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    conn.commit()
-    conn.close()
-    
     db.log_audit(current_user['id'], "SESSION_SUBMITTED", "daily_sessions", None,
                 f"Daily session submitted for {session_date}")
     
@@ -2,6 +2,7 @@
 User settings API routes.
 """
 from fastapi import APIRouter, Depends, HTTPException
+from starlette.concurrency import run_in_threadpool
 import sys
 import os
 
@@ -28,7 +29,8 @@ async def update_profile(
     current_user: dict = Depends(get_current_user)
 ):
     """Update user settings."""
-    success = auth_service.update_user_settings(
+    success = await run_in_threadpool(
+        auth_service.update_user_settings,
         user_id=current_user['id'],
         work_hours=settings.work_hours,
         comments=settings.comments,
@@ -60,7 +62,8 @@ async def update_work_hours(
     current_user: dict = Depends(get_current_user)
 ):
     """Update work hours."""
-    success = auth_service.update_user_settings(
+    success = await run_in_threadpool(
+        auth_service.update_user_settings,
         user_id=current_user['id'],
         work_hours=work_hours
     )
@@ -85,7 +88,8 @@ async def update_comments(
     current_user: dict = Depends(get_current_user)
 ):
     """Update user comments."""
-    success = auth_service.update_user_settings(
+    success = await run_in_threadpool(
+        auth_service.update_user_settings,
         user_id=current_user['id'],
         comments=comments
     )
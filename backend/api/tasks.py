@@ -1,9 +1,13 @@
 """
 Tasks API routes for processing sessions and managing tasks.
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional
 from datetime import date, datetime, timedelta
+import asyncio
 import sys
 import os
 import json
@@ -13,9 +17,18 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
 from backend.models.schemas import *
 from backend.models.database import db
 from backend.dependencies import get_current_user
+from backend.services.task_repository import TaskRepository
+from backend.services.pagination import (
+    NEXT_CURSOR_HEADER, after_cursor, limit_clause, page_size, paginate, parse_fields, project
+)
 from Nexa.services.services import UnifiedService
 
 router = APIRouter()
+
+TASK_PAGE_SIZE = 200
+MAX_TASK_PAGE_SIZE = 1000
+TASK_FIELDS = list(TaskResponse.model_fields)
+TASK_SORT_KEY = ("COALESCE(due_date, '')", "COALESCE(priority, '')", "id")
 unified_service = UnifiedService()
 
 
@@ -153,7 +166,13 @@ async def process_session_with_llm(
     
     # Call LLM agent
     try:
-        result = unified_service.run_agentic_query(
+        # Oversized session data is map-reduce summarized to fit the model window
+        full_context = await run_in_threadpool(
+            unified_service.fit_context, full_context,
+            "It will be used to derive the employee's tasks for the day."
+        )
+        result = await run_in_threadpool(
+            unified_service.run_agentic_query,
             context=full_context,
             question=question
         )
@@ -175,30 +194,47 @@ async def process_session_with_llm(
             tasks_data = result.get('tasks', [])
             summary = result.get('summary', '')
         
-        # Store tasks in database
-        created_tasks = []
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        
+        new_tasks = []
         for task_data in tasks_data:
             if hasattr(task_data, 'dict'):
                 task_dict = task_data.dict()
             else:
                 task_dict = task_data if isinstance(task_data, dict) else {}
             
-            title = task_dict.get('title', 'Untitled Task')
-            description = task_dict.get('description', '')
-            priority = task_dict.get('priority', 'medium')
-            
+            new_tasks.append((
+                task_dict.get('title', 'Untitled Task'),
+                task_dict.get('description', ''),
+                task_dict.get('priority', 'medium'),
+            ))
+        
+        def store_tasks(cursor):
             # Set due date to session date (today)
-            cursor.execute("""
-                INSERT INTO tasks (session_id, user_id, title, description, priority, due_date, status)
-                VALUES (?, ?, ?, ?, ?, ?, 'pending')
-            """, (session_id, current_user['id'], title, description, priority, session_date))
-            
-            task_id = cursor.lastrowid
+            task_ids = TaskRepository(cursor).insert_many([
+                {
+                    "session_id": session_id,
+                    "user_id": current_user['id'],
+                    "title": title,
+                    "description": description,
+                    "priority": priority,
+                    "due_date": session_date,
+                    "status": 'pending',
+                }
+                for title, description, priority in new_tasks
+            ])
             
-            created_tasks.append(TaskResponse(
+            # Update session status
+            cursor.execute("""
+                UPDATE daily_sessions 
+                SET status = 'processed', processed_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            """, (session_id,))
+            return task_ids
+        
+        # Store tasks in database (one atomic operation on the writer thread)
+        task_ids = await db.writer.write(store_tasks)
+        
+        created_tasks = [
+            TaskResponse(
                 id=task_id,
                 title=title,
                 description=description,
@@ -208,17 +244,9 @@ async def process_session_with_llm(
                 completed=False,
                 completed_at=None,
                 created_at=datetime.now()
-            ))
-        
-        # Update session status
-        cursor.execute("""
-            UPDATE daily_sessions 
-            SET status = 'processed', processed_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-        """, (session_id,))
-        
-        conn.commit()
-        conn.close()
+            )
+            for task_id, (title, description, priority) in zip(task_ids, new_tasks)
+        ]
         
         db.log_audit(current_user['id'], "SESSION_PROCESSED", "daily_sessions", session_id,
                     f"Generated {len(created_tasks)} tasks from session")
@@ -237,17 +265,30 @@ async def process_session_with_llm(
 
 @router.get("/list", response_model=List[TaskResponse])
 async def list_tasks(
+    response: Response,
     status: Optional[TaskStatus] = None,
     priority: Optional[TaskPriority] = None,
     date_from: Optional[date] = None,
     date_to: Optional[date] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_TASK_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
     current_user: dict = Depends(get_current_user)
 ):
-    """List tasks with optional filters."""
+    """
+    List tasks with optional filters, newest due date first.
+    Returns every match unless ?limit= or ?cursor= is given; pages continue
+    with the X-Next-Cursor header (pass it as ?cursor=).
+    ?fields=id,title,... returns only those fields.
+    """
+    selected = parse_fields(fields, TASK_FIELDS)
+    columns = "*" if selected is None else ", ".join(dict.fromkeys(["id", "due_date", "priority", *selected]))
+    size = page_size(limit, cursor, TASK_PAGE_SIZE)
+    
     conn = db.get_connection()
-    cursor = conn.cursor()
+    db_cursor = conn.cursor()
     
-    query = "SELECT * FROM tasks WHERE user_id = ?"
+    query = f"SELECT {columns} FROM tasks WHERE user_id = ?"
     params = [current_user['id']]
     
     if status:
@@ -266,12 +307,32 @@ async def list_tasks(
         query += " AND due_date <= ?"
         params.append(date_to)
     
-    query += " ORDER BY due_date DESC, priority DESC"
+    # Keyset on (due_date, priority, id); tasks without a due date sort last
+    condition, cursor_params = after_cursor(TASK_SORT_KEY, cursor)
+    if condition:
+        query += f" AND {condition}"
+        params.extend(cursor_params)
     
-    cursor.execute(query, params)
-    tasks = cursor.fetchall()
+    limit_sql, limit_params = limit_clause(size)
+    query += f" ORDER BY {', '.join(c + ' DESC' for c in TASK_SORT_KEY)}{limit_sql}"
+    params.extend(limit_params)
+    
+    db_cursor.execute(query, params)
+    tasks = db_cursor.fetchall()
     conn.close()
     
+    tasks, next_cursor = paginate(
+        tasks, size, lambda task: (task['due_date'] or '', task['priority'] or '', task['id'])
+    )
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+    
+    if selected is not None:
+        # Partial items don't fit TaskResponse
+        return JSONResponse(
+            content=jsonable_encoder([project(task_row_to_response(task), selected) for task in tasks]),
+            headers=headers,
+        )
+    response.headers.update(headers)
     return [TaskResponse(**task_row_to_response(task)) for task in tasks]
 
 
@@ -390,8 +451,7 @@ async def update_task(
         params.append(task_id)
         
         query = f"UPDATE tasks SET {', '.join(updates)} WHERE id = ?"
-        cursor.execute(query, params)
-        conn.commit()
+        await asyncio.wrap_future(db.writer.execute(query, params))
     
     # Get updated task
     cursor.execute("SELECT * FROM tasks WHERE id = ?", (task_id,))
@@ -409,17 +469,13 @@ async def delete_task(
     current_user: dict = Depends(get_current_user)
 ):
     """Delete a task."""
-    conn = db.get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("DELETE FROM tasks WHERE id = ? AND user_id = ?", (task_id, current_user['id']))
+    deleted = await asyncio.wrap_future(
+        db.writer.execute("DELETE FROM tasks WHERE id = ? AND user_id = ?", (task_id, current_user['id']))
+    )
     
-    if cursor.rowcount == 0:
+    if deleted == 0:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    conn.commit()
-    conn.close()
-    
     db.log_audit(current_user['id'], "TASK_DELETED", "tasks", task_id, "Task deleted")
     
     return {"success": True, "message": "Task deleted"}
@@ -1,9 +1,9 @@
 """
 Team leader API routes for viewing team member activities.
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import List, Optional
-from datetime import date
+from datetime import date, datetime
 import sys
 import os
 
@@ -12,8 +12,10 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
 from backend.models.schemas import TeamMemberActivity, TeamOverviewResponse, TaskResponse
 from backend.models.database import db
 from backend.dependencies import get_team_leader
+from backend.services.audit_archive import AuditLogArchive
 
 router = APIRouter()
+audit_archive = AuditLogArchive(db)
 
 
 @router.get("/overview", response_model=TeamOverviewResponse)
@@ -274,3 +276,16 @@ async def get_member_stats(
         },
         "recent_activity": recent_sessions
     }
+
+
+@router.get("/audit-logs")
+async def get_audit_logs(
+    user_id: Optional[int] = None,
+    action: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: dict = Depends(get_team_leader)
+):
+    """Search the audit log (current and archived months), newest first."""
+    return audit_archive.query(user_id=user_id, action=action, start=start, end=end, limit=limit)
@@ -1,15 +1,15 @@
 """
 Team Leader API routes for dashboard, chat, and timeline chart features.
 """
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Header, Query, Request, Response
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional
 from datetime import datetime, date
+import asyncio
 import sys
 import os
 import json
-import base64
 import uuid
-import traceback
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
 
@@ -19,6 +19,15 @@ from backend.models.schemas import (
     TimelineChartRequest, TimelineChartResponse, Milestone, EmployeeSummary
 )
 from backend.models.database import db
+from backend.services.document_batch import ingest_and_extract
+from backend.services.workers import run_in_worker, render_timeline_chart, RENDER_TIMEOUT
+from backend.services.pagination import (
+    NEXT_CURSOR_HEADER, after_cursor, limit_clause, page_size, paginate, parse_fields, project
+)
+from backend.services.chart_images import (
+    THUMBNAIL_TIMEOUT, chart_image_url, chart_thumbnail_url, image_response, make_thumbnail, thumbnail_path,
+    verify_signature
+)
 from backend.dependencies import get_team_leader, get_current_user
 
 # Initialize Nexa UnifiedService
@@ -39,6 +48,10 @@ GEMINI_API_KEY = os.environ.get("GOOGLE_API_KEY", "AIzaSyDv1IIfdNbpy9C1cCFYEYmej
 
 router = APIRouter()
 
+CHART_PAGE_SIZE = 20
+MAX_CHART_PAGE_SIZE = 100
+CHART_FIELDS = ["id", "project_name", "summary_text", "image_path", "image_url", "thumbnail_url", "created_at"]
+
 
 # ============= Team Member Management =============
 
@@ -89,15 +102,13 @@ async def add_team_member(
         raise HTTPException(status_code=404, detail="User not found")
     
     user_dict = dict(user)
+    conn.close()
     
     try:
-        cursor.execute("""
+        member_id = await asyncio.wrap_future(db.writer.execute("""
             INSERT INTO team_members (team_leader_id, member_user_id, role, email)
             VALUES (?, ?, ?, ?)
-        """, (current_user['id'], member.member_user_id, member.role, member.email))
-        
-        member_id = cursor.lastrowid
-        conn.commit()
+        """, (current_user['id'], member.member_user_id, member.role, member.email)))
         
         response = TeamMemberResponse(
             id=member_id,
@@ -110,11 +121,9 @@ async def add_team_member(
             added_at=datetime.now()
         )
         
-        conn.close()
         return response
         
     except Exception as e:
-        conn.close()
         if "UNIQUE constraint failed" in str(e):
             raise HTTPException(status_code=400, detail="Team member already added")
         raise HTTPException(status_code=500, detail=str(e))
@@ -126,21 +135,14 @@ async def remove_team_member(
     current_user: dict = Depends(get_team_leader)
 ):
     """Remove a team member."""
-    conn = db.get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("""
+    removed = await asyncio.wrap_future(db.writer.execute("""
         DELETE FROM team_members 
         WHERE id = ? AND team_leader_id = ?
-    """, (member_id, current_user['id']))
+    """, (member_id, current_user['id'])))
     
-    if cursor.rowcount == 0:
-        conn.close()
+    if removed == 0:
         raise HTTPException(status_code=404, detail="Team member not found")
     
-    conn.commit()
-    conn.close()
-    
     return {"success": True, "message": "Team member removed"}
 
 
@@ -432,19 +434,16 @@ async def team_leader_chat(
             history_limit=20
         )
         
-        # Store chat message in database
-        cursor.execute("""
-            INSERT INTO chat_messages (user_id, session_id, role, message)
-            VALUES (?, ?, 'user', ?)
-        """, (current_user['id'], session_id, request.message))
+        conn.close()
         
-        cursor.execute("""
+        # Store chat message in database
+        await asyncio.wrap_future(db.writer.executemany("""
             INSERT INTO chat_messages (user_id, session_id, role, message)
-            VALUES (?, ?, 'assistant', ?)
-        """, (current_user['id'], session_id, response))
-        
-        conn.commit()
-        conn.close()
+            VALUES (?, ?, ?, ?)
+        """, [
+            (current_user['id'], session_id, 'user', request.message),
+            (current_user['id'], session_id, 'assistant', response),
+        ]))
         
         return TeamLeaderChatResponse(
             response=response,
@@ -468,32 +467,15 @@ async def upload_timeline_documents(
     upload_dir = "backend/uploads/timeline_docs"
     os.makedirs(upload_dir, exist_ok=True)
     
-    uploaded_files = []
+    # Save (streamed, size-limited) and extract all files concurrently
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    documents = await ingest_and_extract(files, upload_dir, f"{current_user['id']}_{timestamp}")
     
-    for file in files:
-        # Generate unique filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{current_user['id']}_{timestamp}_{file.filename}"
-        file_path = os.path.join(upload_dir, filename)
-        
-        # Save file
-        with open(file_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
-        
-        # Extract text if possible
-        extracted_text = ""
-        if unified_service:
-            try:
-                extracted_text = unified_service.extract_from_file(file_path)
-            except:
-                pass
-        
-        uploaded_files.append({
-            "filename": file.filename,
-            "path": file_path,
-            "extracted_text": extracted_text[:500] if extracted_text else ""
-        })
+    uploaded_files = [{
+        "filename": document.filename,
+        "path": document.path,
+        "extracted_text": document.text[:500]
+    } for document in documents]
     
     return {
         "success": True,
@@ -534,21 +516,14 @@ async def generate_timeline_chart(
         upload_dir = "backend/uploads/timeline_docs"
         os.makedirs(upload_dir, exist_ok=True)
         
-        for file in files:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{current_user['id']}_{timestamp}_{file.filename}"
-            file_path = os.path.join(upload_dir, filename)
-            
-            with open(file_path, "wb") as f:
-                content = await file.read()
-                f.write(content)
-            
-            # Extract text
-            try:
-                extracted_text = unified_service.extract_from_file(file_path)
-                document_contents.append(f"## Document: {file.filename}\n{extracted_text}")
-            except Exception as e:
-                document_contents.append(f"## Document: {file.filename}\n[Could not extract text: {str(e)}]")
+        # Save and extract all files concurrently; results stay in upload order
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        documents = await ingest_and_extract(files, upload_dir, f"{current_user['id']}_{timestamp}")
+        for document in documents:
+            if document.error:
+                document_contents.append(f"## Document: {document.filename}\n[Could not extract text: {document.error}]")
+            else:
+                document_contents.append(f"## Document: {document.filename}\n{document.text}")
     
     # Get member information
     member_data = []
@@ -567,8 +542,16 @@ async def generate_timeline_chart(
                 "role": member_dict['role']
             })
     
-    # Combine all content
-    full_context = "\n\n".join(document_contents)
+    # Combine all content; oversized documents are map-reduce summarized to fit the model window
+    try:
+        full_context = await run_in_threadpool(
+            unified_service.fit_context, "\n\n".join(document_contents),
+            "It will be used to build the project timeline, milestones and employee summaries.",
+            model_name=GEMINI_MODEL, api_key=GEMINI_API_KEY
+        )
+    except Exception as e:
+        conn.close()
+        raise HTTPException(status_code=500, detail=f"Document summarization error: {str(e)}")
     full_context += "\n\n## Team Members:\n"
     full_context += json.dumps(member_data, indent=2)
     
@@ -585,19 +568,16 @@ async def generate_timeline_chart(
         system_instruction = "Generate a timeline chart with milestones and employee summaries."
     
     # Create prompt for timeline generation with structured output
-    prompt = f"""Based on the following project documents and team member information, generate:
-
-1. A structured analysis with:
+    prompt = f"""Based on the following project documents and team member information, generate
+a structured analysis with:
    - Project milestones with dates, assignments, and status
    - Employee summaries with strengths, weaknesses, and critical comments
 
-2. Python code using matplotlib to create a professional timeline chart showing the milestones
-
 ## Documents and Context:
 {full_context}
 
 Output Format:
-First, provide the structured data in JSON format matching this schema:
+Respond with JSON only, matching this schema (the timeline chart is drawn from the milestones):
 {{
     "project_name": "string",
     "milestones": [
@@ -621,113 +601,54 @@ First, provide the structured data in JSON format matching this schema:
         }}
     ]
 }}
-
-Then, provide Python code to generate a matplotlib timeline chart. The code should:
-- Import matplotlib.pyplot as plt and matplotlib.dates as mdates
-- Create a professional-looking Gantt-style timeline
-- Use colors to distinguish between completed, in-progress, and pending tasks
-- Include milestone markers and employee names
-- Save the chart as 'image.png'
-
-Wrap the Python code in ```python ``` code blocks.
 """
     
     try:
-        # Use Gemini to get the response with structured data and code
+        # Use Gemini to get the structured data
         session_id = f"timeline_{current_user['id']}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         
         # Import LLM utilities
         sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
         from Nexa.services.llm.agent_logic import get_llm
-        from langchain_core.prompts import ChatPromptTemplate
-        
-        # Create LLM instance
-        llm = get_llm(model_name=GEMINI_MODEL, api_key=GEMINI_API_KEY)
-        
-        # Get response from Gemini
-        response = llm.invoke(prompt)
-        
-        # Extract content
-        if hasattr(response, "content"):
-            response_text = response.content if not callable(response.content) else response.content()
-        else:
-            response_text = str(response)
+        from Nexa.services.llm.timeline_output import generate_timeline
         
-        print(f"Timeline generation response received: {len(response_text)} chars")
+        # Create LLM instance (JSON mode: the reply is the structured data only)
+        llm = get_llm(model_name=GEMINI_MODEL, api_key=GEMINI_API_KEY, json_mode=True)
         
-        # Extract JSON data
-        milestones = []
-        employee_summaries = []
+        # Stream and validate the reply (with at most one repair round) off the event loop
+        timeline, response_text = await run_in_threadpool(generate_timeline, llm, prompt, project_name)
+        milestones = [m.model_dump(mode="json") for m in timeline.milestones]
+        employee_summaries = [e.model_dump(mode="json") for e in timeline.employee_summaries]
+        print(f"Parsed {len(milestones)} milestones and {len(employee_summaries)} employee summaries")
         
-        # Try to parse JSON from response
-        try:
-            # Find JSON block
-            json_start = response_text.find('{')
-            json_end = response_text.rfind('}') + 1
-            
-            if json_start != -1 and json_end > json_start:
-                json_str = response_text[json_start:json_end]
-                structured_data = json.loads(json_str)
-                milestones = structured_data.get('milestones', [])
-                employee_summaries = structured_data.get('employee_summaries', [])
-                print(f"Parsed {len(milestones)} milestones and {len(employee_summaries)} employee summaries")
-        except Exception as e:
-            print(f"Error parsing JSON from response: {e}")
-            print(f"Response text: {response_text[:500]}...")
-        
-        # Extract and execute Python code
+        # Draw the chart from the milestones in the worker pool
         image_path = None
-        if "```python" in response_text:
+        if milestones:
+            output_dir = "backend/uploads/timeline_charts"
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            image_path = os.path.join(output_dir, f"timeline_{current_user['id']}_{timestamp}.png")
             try:
-                # Extract Python code
-                code_start = response_text.find("```python") + 9
-                code_end = response_text.find("```", code_start)
-                python_code = response_text[code_start:code_end].strip()
-                
-                print(f"Extracted Python code: {len(python_code)} chars")
-                
-                # Create output directory
-                output_dir = "backend/uploads/timeline_charts"
-                os.makedirs(output_dir, exist_ok=True)
-                
-                # Generate unique filename
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                image_filename = f"timeline_{current_user['id']}_{timestamp}.png"
-                image_path = os.path.join(output_dir, image_filename)
-                
-                # Replace image.png with actual path
-                python_code = python_code.replace("'image.png'", f"'{image_path}'")
-                python_code = python_code.replace('"image.png"', f'"{image_path}"')
-                python_code = python_code.replace("image.png", image_path)
-                
-                # Ensure matplotlib is imported and use Agg backend
-                if "import matplotlib" not in python_code:
-                    python_code = "import matplotlib\nmatplotlib.use('Agg')\nimport matplotlib.pyplot as plt\nimport matplotlib.dates as mdates\nfrom datetime import datetime, date\n" + python_code
-                else:
-                    python_code = "import matplotlib\nmatplotlib.use('Agg')\n" + python_code
-                
-                print(f"Executing Python code to generate chart...")
-                
-                # Execute the code in a clean namespace
-                exec_globals = {}
-                exec(python_code, exec_globals)
-                
-                # Verify image was created
-                if os.path.exists(image_path):
-                    print(f"Timeline chart generated successfully: {image_path}")
-                else:
-                    print(f"Warning: Image file not found after execution: {image_path}")
-                    image_path = None
-                    
+                image_path = await run_in_worker(
+                    render_timeline_chart, milestones, image_path, project_name, date.today(),
+                    timeout=RENDER_TIMEOUT
+                )
             except Exception as e:
-                print(f"Error executing Python code: {e}")
-                print(f"Traceback: {traceback.format_exc()}")
+                print(f"Error rendering timeline chart: {e}")
                 image_path = None
+            
+            if image_path:
+                try:
+                    await run_in_worker(make_thumbnail, image_path, timeout=THUMBNAIL_TIMEOUT)
+                except Exception as e:
+                    # Not fatal: the thumbnail endpoint renders it on demand
+                    print(f"Warning: Could not render chart thumbnail: {e}")
         else:
-            print("No Python code found in response")
+            print("No milestones found in response; skipping chart")
+        
+        conn.close()
         
         # Store in database
-        cursor.execute("""
+        chart_id = await asyncio.wrap_future(db.writer.execute("""
             INSERT INTO timeline_charts (team_leader_id, project_name, summary_text, image_path, milestones_data, employee_summaries_data)
             VALUES (?, ?, ?, ?, ?, ?)
         """, (
@@ -737,23 +658,15 @@ Wrap the Python code in ```python ``` code blocks.
             image_path or "",
             json.dumps(milestones),
             json.dumps(employee_summaries)
-        ))
-        
-        chart_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        
-        # Encode image as base64 if exists
-        image_base64 = None
-        if image_path and os.path.exists(image_path):
-            with open(image_path, "rb") as img_file:
-                image_base64 = base64.b64encode(img_file.read()).decode()
+        )))
         
         return TimelineChartResponse(
+            id=chart_id,
             project_name=project_name,
             image_path=image_path or "",
-            image_base64=image_base64,
-            summary_text=response,
+            image_url=chart_image_url(chart_id, current_user['id']) if image_path else None,
+            thumbnail_url=chart_thumbnail_url(chart_id, current_user['id']) if image_path else None,
+            summary_text=response_text,
             milestones=milestones,
             employee_summaries=employee_summaries,
             created_at=datetime.now()
@@ -765,41 +678,124 @@ Wrap the Python code in ```python ``` code blocks.
 
 
 @router.get("/timeline/charts")
-async def get_timeline_charts(current_user: dict = Depends(get_team_leader)):
-    """Get all timeline charts created by the team leader."""
-    conn = db.get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("""
+async def get_timeline_charts(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_CHART_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    current_user: dict = Depends(get_team_leader)
+):
+    """
+    Get the timeline charts created by the team leader, newest first.
+    Returns all of them unless ?limit= or ?cursor= is given; pages continue
+    with the X-Next-Cursor header (pass it as ?cursor=).
+    ?fields=id,project_name,... returns only those fields. Images are linked
+    by signed, short-lived URLs (image_url, thumbnail_url), not inlined.
+    """
+    selected = parse_fields(fields, CHART_FIELDS)
+    size = page_size(limit, cursor, CHART_PAGE_SIZE)
+    
+    query = """
         SELECT id, project_name, summary_text, image_path, created_at
         FROM timeline_charts
         WHERE team_leader_id = ?
-        ORDER BY created_at DESC
-    """, (current_user['id'],))
+    """
+    params = [current_user['id']]
+    condition, cursor_params = after_cursor(("created_at", "id"), cursor)
+    if condition:
+        query += f" AND {condition}"
+        params.extend(cursor_params)
+    limit_sql, limit_params = limit_clause(size)
+    query += " ORDER BY created_at DESC, id DESC" + limit_sql
+    params.extend(limit_params)
     
-    charts = cursor.fetchall()
+    conn = db.get_connection()
+    db_cursor = conn.cursor()
+    db_cursor.execute(query, params)
+    charts = db_cursor.fetchall()
     conn.close()
     
+    charts, next_cursor = paginate(charts, size, lambda chart: (chart['created_at'], chart['id']))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    
     result = []
     for chart in charts:
         chart_dict = dict(chart)
-        
-        # Encode image as base64
-        image_base64 = None
-        if chart_dict['image_path'] and os.path.exists(chart_dict['image_path']):
-            try:
-                with open(chart_dict['image_path'], "rb") as img_file:
-                    image_base64 = base64.b64encode(img_file.read()).decode()
-            except:
-                pass
-        
-        result.append({
+        has_image = bool(chart_dict['image_path'])
+        result.append(project({
             "id": chart_dict['id'],
             "project_name": chart_dict['project_name'],
             "summary_text": chart_dict['summary_text'][:200] if chart_dict['summary_text'] else "",
             "image_path": chart_dict['image_path'],
-            "image_base64": image_base64,
+            "image_url": chart_image_url(chart_dict['id'], current_user['id']) if has_image else None,
+            "thumbnail_url": chart_thumbnail_url(chart_dict['id'], current_user['id']) if has_image else None,
             "created_at": chart_dict['created_at']
-        })
+        }, selected))
     
     return result
+
+
+def _chart_image_path(chart_id: int, team_leader_id: int) -> str:
+    """Image file of one of the team leader's charts; 404 if there is none."""
+    conn = db.get_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT image_path FROM timeline_charts WHERE id = ? AND team_leader_id = ?",
+        (chart_id, team_leader_id)
+    )
+    row = cursor.fetchone()
+    conn.close()
+    
+    if not row or not row['image_path'] or not os.path.exists(row['image_path']):
+        raise HTTPException(status_code=404, detail="Chart image not found")
+    return row['image_path']
+
+
+async def _chart_viewer(chart_id: int, kind: str, user: Optional[int], expires: Optional[int],
+                        signature: Optional[str], authorization: Optional[str]) -> int:
+    """Team leader id a chart image request is made for: from its signed URL, else the Bearer token."""
+    if signature is not None:
+        if user is None or expires is None or not verify_signature(chart_id, kind, user, expires, signature):
+            raise HTTPException(status_code=403, detail="Invalid or expired image URL")
+        return user
+    return (await get_team_leader(authorization))['id']
+
+
+@router.get("/timeline/charts/{chart_id}/image")
+async def get_timeline_chart_image(
+    chart_id: int,
+    request: Request,
+    user: Optional[int] = None,
+    expires: Optional[int] = None,
+    signature: Optional[str] = None,
+    authorization: Optional[str] = Header(None)
+):
+    """
+    Chart PNG, cacheable (ETag/Last-Modified) and with Range support.
+    Open the signed image_url from the chart listing (works in <img src>), or
+    send Authorization: Bearer <token>.
+    """
+    team_leader_id = await _chart_viewer(chart_id, "image", user, expires, signature, authorization)
+    return image_response(request, _chart_image_path(chart_id, team_leader_id))
+
+
+@router.get("/timeline/charts/{chart_id}/thumbnail")
+async def get_timeline_chart_thumbnail(
+    chart_id: int,
+    request: Request,
+    user: Optional[int] = None,
+    expires: Optional[int] = None,
+    signature: Optional[str] = None,
+    authorization: Optional[str] = Header(None)
+):
+    """
+    Thumbnail of a chart, rendered on first request for older charts.
+    Authenticated like the image: signed thumbnail_url or the Bearer token.
+    """
+    team_leader_id = await _chart_viewer(chart_id, "thumbnail", user, expires, signature, authorization)
+    image_path = _chart_image_path(chart_id, team_leader_id)
+    thumbnail = thumbnail_path(image_path)
+    if not os.path.exists(thumbnail):
+        thumbnail = await run_in_worker(make_thumbnail, image_path, timeout=THUMBNAIL_TIMEOUT)
+    return image_response(request, thumbnail)
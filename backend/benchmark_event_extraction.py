@@ -0,0 +1,67 @@
+"""
+Benchmark: event extraction from daily updates, original inline rules vs the
+precompiled single-pass module.
+
+    cd backend
+    python benchmark_event_extraction.py --updates 5000
+
+Both implementations are run over the same synthetic updates and their
+outputs are checked to be identical before timings are reported.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from backend.services.event_extraction import extract_events
+from backend.test_event_extraction import TODAY, legacy_extract_event
+
+SAMPLE_UPDATES = [
+    ("Sprint planning", "Start date: November 10, 2025\nStart: 10:30 am\nEnd: 4 PM\n"
+                        "Priority: 🔴 High\nStatus: 🟡 In progress\n"),
+    ("Client call", "Call with the client from 2 pm until 3:30 pm about the rollout. Priority: low"),
+    ("Bug triage", "Went through the backlog, closed stale issues. Status: done"),
+    ("Release", "🗓️ Starts November 3 2025 from 9am, deadline 11:15pm. Priority urgent"),
+]
+
+
+def make_updates(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    filler = ("Worked on the dashboard and reviewed pull requests with the team. " * 8)
+    updates = []
+    for i in range(count):
+        title, body = rng.choice(SAMPLE_UPDATES)
+        updates.append((f"{title} #{i}", filler[:rng.randint(0, len(filler))] + body))
+    return updates
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark event extraction")
+    parser.add_argument("--updates", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    updates = make_updates(args.updates)
+
+    def best_of(fn):
+        best = float("inf")
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            result = fn()
+            best = min(best, time.perf_counter() - started)
+        return best, result
+
+    legacy_time, legacy = best_of(lambda: [legacy_extract_event(t, c) for t, c in updates])
+    new_time, new = best_of(lambda: extract_events(updates, TODAY))
+    assert new == legacy, "outputs differ"
+
+    print(f"{args.updates} updates (best of {args.repeat})")
+    print(f"  inline rules : {legacy_time * 1000:8.1f} ms")
+    print(f"  precompiled  : {new_time * 1000:8.1f} ms  ({legacy_time / new_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
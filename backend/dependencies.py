@@ -12,7 +12,7 @@ def get_auth_service():
     """Lazy load auth service to avoid circular imports."""
     global _auth_service
     if _auth_service is None:
-        from models.database import db
+        from backend.models.database import db
         from services.auth_service import AuthService
         _auth_service = AuthService(db)
     return _auth_service
@@ -0,0 +1,126 @@
+"""
+Load test for the API: requests per second at different worker counts.
+
+    cd backend
+    python load_test.py --workers 1,2,4 --path /api/health
+
+For each worker count a server is started with serve.py on a free port, hit
+by --concurrency client threads (keep-alive connections) for --requests
+requests, and stopped again. Pass --url to load an already running server
+instead. Use --token for endpoints that need a login.
+"""
+import argparse
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_until_up(host: str, port: int, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=2)
+            conn.request("GET", "/api/health")
+            if conn.getresponse().status == 200:
+                conn.close()
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server on port {port} did not come up within {timeout}s")
+
+
+def run_load(host: str, port: int, path: str, total: int, concurrency: int, token: str = None) -> dict:
+    """Send total GET requests from concurrency threads; return throughput and latencies."""
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    per_thread = [total // concurrency + (1 if i < total % concurrency else 0) for i in range(concurrency)]
+
+    def client(count: int):
+        conn = http.client.HTTPConnection(host, port, timeout=30)
+        latencies, errors = [], 0
+        for _ in range(count):
+            started = time.perf_counter()
+            try:
+                conn.request("GET", path, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                if response.status >= 400:
+                    errors += 1
+            except OSError:
+                errors += 1
+                conn.close()
+                conn = http.client.HTTPConnection(host, port, timeout=30)
+            latencies.append(time.perf_counter() - started)
+        conn.close()
+        return latencies, errors
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(client, per_thread))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(l for result in results for l in result[0])
+    return {
+        "requests": total,
+        "errors": sum(result[1] for result in results),
+        "rps": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def _print(label: str, stats: dict):
+    print(f"{label:>10}  {stats['rps']:9.1f} req/s  p50 {stats['p50_ms']:7.2f} ms  "
+          f"p99 {stats['p99_ms']:7.2f} ms  errors {stats['errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default=",".join(str(n) for n in sorted({1, os.cpu_count() or 1})),
+                        help="Comma-separated worker counts to compare")
+    parser.add_argument("--url", help="Test a running server instead of starting one")
+    parser.add_argument("--path", default="/api/health")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--token", help="Session token for authenticated endpoints")
+    args = parser.parse_args()
+
+    if args.url:
+        url = urlparse(args.url)
+        _print("server", run_load(url.hostname, url.port or 80, args.path,
+                                  args.requests, args.concurrency, args.token))
+        return
+
+    serve = os.path.join(os.path.dirname(os.path.abspath(__file__)), "serve.py")
+    print(f"GET {args.path}: {args.requests} requests, {args.concurrency} clients, {os.cpu_count()} CPUs")
+    for workers in (int(n) for n in args.workers.split(",")):
+        port = _free_port()
+        server = subprocess.Popen(
+            [sys.executable, serve, "--workers", str(workers), "--port", str(port), "--host", "127.0.0.1"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            _wait_until_up("127.0.0.1", port)
+            # Warm up every worker before measuring
+            run_load("127.0.0.1", port, args.path, args.concurrency * 4, args.concurrency, args.token)
+            _print(f"{workers} worker{'s' if workers > 1 else ''}",
+                   run_load("127.0.0.1", port, args.path, args.requests, args.concurrency, args.token))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
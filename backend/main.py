@@ -6,10 +6,12 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, FileResponse
 from typing import Optional, List
 from datetime import date, datetime
+import asyncio
 import logging
 import os
 import sys
 from contextlib import asynccontextmanager
+from starlette.concurrency import run_in_threadpool
 
 # Add current directory and parent directory to path for imports
 backend_dir = os.path.dirname(os.path.abspath(__file__))
@@ -17,9 +19,17 @@ parent_dir = os.path.dirname(backend_dir)
 sys.path.insert(0, backend_dir)
 sys.path.insert(0, parent_dir)
 
-from models.database import db, Database
+# The routers import the database as backend.models.database; importing it
+# under a second name would start a second copy (and a second writer thread)
+from backend.models.database import db
 from models.schemas import *
 from services.auth_service import AuthService
+from services.blob_store import BlobStore
+from services.resumable_upload import ResumableUploadService
+from services.audit_archive import AuditLogArchive
+# Same module path as the API routers use, so this is the pool they started
+from backend.services.workers import shutdown_workers
+from backend.services.screenshot_schedules import SCHEDULE_SYNC_INTERVAL
 from api import auth, sessions, tasks, chat, settings, team, projects, announcements, daily_updates, team_leader
 
 # Configure logging
@@ -29,6 +39,33 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+AUDIT_MAINTENANCE_INTERVAL = 6 * 3600
+
+
+async def _maintain_audit_logs():
+    """Rotate the audit log into monthly tables and apply retention, periodically."""
+    archive = AuditLogArchive(db)
+    while True:
+        try:
+            await run_in_threadpool(archive.maintain)
+        except Exception:
+            logger.exception("Audit log maintenance failed")
+        await asyncio.sleep(AUDIT_MAINTENANCE_INTERVAL)
+
+
+async def _run_screenshot_schedules():
+    """Resume the stored screenshot schedules and follow changes made by other workers."""
+    schedules = sessions.screenshot_schedules
+    while True:
+        try:
+            # Retried so another worker takes over when the owning one exits
+            if await run_in_threadpool(schedules.start):
+                await run_in_threadpool(schedules.sync)
+        except Exception:
+            logger.exception("Screenshot schedule sync failed")
+        await asyncio.sleep(SCHEDULE_SYNC_INTERVAL)
+
+
 # Lifespan handler replaces deprecated startup/shutdown events
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -41,8 +78,28 @@ async def lifespan(app: FastAPI):
     os.makedirs("backend/uploads/files", exist_ok=True)
     os.makedirs("backend/uploads/video_frames", exist_ok=True)
 
+    # serve.py runs this once before starting its workers
+    if os.getenv("BACKEND_STARTUP_MAINTENANCE", "1") != "0":
+        # Drop upload blobs that no row references any more
+        removed = BlobStore(db).collect_garbage()
+        if removed["blobs"]:
+            logger.info(f"Removed {removed['blobs']} unreferenced upload blobs ({removed['bytes']} bytes)")
+        stale = ResumableUploadService(db).cleanup_stale()
+        if stale:
+            logger.info(f"Dropped {stale} abandoned resumable uploads")
+
+    # Month boundaries pass while the server runs; rotation is a no-op otherwise
+    audit_task = asyncio.create_task(_maintain_audit_logs())
+    schedule_task = asyncio.create_task(_run_screenshot_schedules())
+
     yield
 
+    audit_task.cancel()
+    schedule_task.cancel()
+    sessions.screenshot_schedules.shutdown()
+
+    shutdown_workers()
+    db.close_writer()
     logger.info("Employee Tracking System API shutdown complete.")
 
 
@@ -61,6 +118,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # keyset pagination of list endpoints
 )
 
 # Initialize services
@@ -0,0 +1,99 @@
+"""
+Buffered audit logging.
+
+Database.log_audit only appends the event to an in-memory buffer; the buffer
+is written to audit_logs with a single executemany through the write queue
+when it reaches FLUSH_SIZE events or every FLUSH_INTERVAL seconds, whichever
+comes first. Request handlers therefore never wait on an audit write. Each
+event keeps the time it was logged, not the time it was flushed, and
+close() flushes whatever is left on shutdown.
+"""
+import os
+import threading
+from datetime import datetime
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+FLUSH_SIZE = int(os.getenv("AUDIT_FLUSH_SIZE", "100"))
+FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL_SECONDS", "1.0"))
+
+INSERT_SQL = """
+    INSERT INTO audit_logs (user_id, action, resource_type, resource_id, details, ip_address, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+class AuditBuffer:
+    """Collects audit events and writes them to the database in batches."""
+
+    def __init__(self, get_writer, flush_size: int = FLUSH_SIZE, flush_interval: float = FLUSH_INTERVAL):
+        """
+        Args:
+            get_writer: Returns the DatabaseWriter to flush through.
+            flush_size: Flush as soon as this many events are buffered.
+            flush_interval: Flush buffered events at least this often (seconds).
+        """
+        self._get_writer = get_writer
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._events = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._timer = None
+
+    def add(self, user_id: Optional[int], action: str, resource_type: Optional[str] = None,
+            resource_id: Optional[int] = None, details: Optional[str] = None, ip_address: Optional[str] = None):
+        """Buffer one audit event."""
+        # Same format as SQLite's CURRENT_TIMESTAMP
+        created_at = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock:
+            self._events.append((user_id, action, resource_type, resource_id, details, ip_address, created_at))
+            full = len(self._events) >= self.flush_size
+            if self._timer is None:
+                self._timer = threading.Thread(target=self._flush_periodically, args=(self._stop,),
+                                               name="audit-flush", daemon=True)
+                self._timer.start()
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Hand all buffered events to the writer; returns its Future, or None if there were none."""
+        with self._lock:
+            events, self._events = self._events, []
+        if not events:
+            return None
+        future = self._get_writer().executemany(INSERT_SQL, events)
+        future.add_done_callback(lambda f: self._report(f, len(events)))
+        return future
+
+    @staticmethod
+    def _report(future, count: int):
+        if future.exception() is not None:
+            logger.error(f"Lost {count} audit events: {future.exception()}")
+
+    def _flush_periodically(self, stop: threading.Event):
+        while not stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Audit flush failed")
+
+    def close(self):
+        """
+        Stop the timer and flush the remaining events; waits until they are committed.
+
+        Events added afterwards start a new timer, so they are still flushed.
+        """
+        with self._lock:
+            self._stop.set()
+            # The old timer keeps its own (set) event and exits
+            self._stop = threading.Event()
+            self._timer = None
+        future = self.flush()
+        if future is not None:
+            try:
+                future.result()
+            except Exception:
+                pass  # already logged by _report
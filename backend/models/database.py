@@ -1,29 +1,63 @@
 """
 Database models and schema for the employee tracking system.
 """
+import atexit
 import sqlite3
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 import json
 import logging
+import os
+import threading
+
+from .writer import DatabaseWriter
+from .audit import AuditBuffer
 
 logger = logging.getLogger(__name__)
 
+# How long a connection waits for another process's write lock before failing.
+BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "10000"))
+
 
 class Database:
     def __init__(self, db_path: str = "employee_tracker.db"):
         self.db_path = db_path
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self.audit_buffer = AuditBuffer(lambda: self.writer)
         self.init_database()
 
     def get_connection(self):
         """Get a database connection."""
-        conn = sqlite3.connect(self.db_path)
+        conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_MS / 1000)
         conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        # WAL keeps reads going while another worker process writes;
+        # NORMAL sync is durable across application crashes in WAL mode.
+        conn.execute("PRAGMA synchronous = NORMAL")
         return conn
 
+    @property
+    def writer(self) -> DatabaseWriter:
+        """The process-wide write queue, started on first use (and again if it failed to connect)."""
+        with self._writer_lock:
+            if self._writer is None or self._writer.error is not None:
+                self._writer = DatabaseWriter(self.get_connection)
+            return self._writer
+
+    def close_writer(self):
+        """Flush buffered audit events, commit queued writes and stop the writer thread."""
+        self.audit_buffer.close()
+        with self._writer_lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.close()
+
     def init_database(self):
         """Initialize all database tables."""
         conn = self.get_connection()
+        # Persistent per database file; every later connection uses WAL.
+        conn.execute("PRAGMA journal_mode = WAL")
         cursor = conn.cursor()
 
         # Users table (employees and team leaders)
@@ -131,6 +165,26 @@ class Database:
             )
         """)
 
+        # Resumable (chunked) uploads in progress, see services/resumable_upload.py
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS resumable_uploads (
+                id TEXT PRIMARY KEY,
+                user_id INTEGER NOT NULL,
+                session_date DATE NOT NULL,
+                filename TEXT NOT NULL,
+                total_size INTEGER NOT NULL,
+                upload_offset INTEGER NOT NULL DEFAULT 0,
+                interval_seconds INTEGER NOT NULL DEFAULT 30,
+                partial_path TEXT NOT NULL,
+                status TEXT DEFAULT 'uploading' CHECK(status IN ('uploading', 'finalizing', 'finalized')),
+                video_id INTEGER,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users(id),
+                FOREIGN KEY (video_id) REFERENCES videos(id)
+            )
+        """)
+
         # Tasks table (generated from LLM)
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS tasks (
@@ -176,6 +230,49 @@ class Database:
         except sqlite3.OperationalError:
             pass  # Column already exists
 
+        # Daily update a task was generated from (update-all-to-events)
+        try:
+            cursor.execute("ALTER TABLE tasks ADD COLUMN source_update_id INTEGER")
+        except sqlite3.OperationalError:
+            pass  # Column already exists
+        # NULLs are distinct, so only generated tasks are constrained
+        cursor.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_tasks_source_update ON tasks(user_id, source_update_id)"
+        )
+        # Keyset pagination of /api/tasks/list (same expressions as its ORDER BY)
+        cursor.execute("DROP INDEX IF EXISTS idx_tasks_user_due")
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tasks_user_due_priority "
+            "ON tasks(user_id, COALESCE(due_date, ''), COALESCE(priority, ''), id)"
+        )
+
+        # Content-addressed upload blobs (see services/blob_store.py)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS blobs (
+                hash TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                ref_count INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                last_written_at REAL NOT NULL
+            )
+        """)
+
+        # Upload rows reference their file by blob hash
+        for table in ("transcripts", "videos", "screenshots", "uploaded_files"):
+            try:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN blob_hash TEXT")
+            except sqlite3.OperationalError:
+                pass  # Column already exists
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_blob_hash ON {table}(blob_hash)")
+
+        # Progress of screenshot schedules, so they resume after a restart
+        for column in ("captures_taken INTEGER DEFAULT 0", "last_capture_at TIMESTAMP"):
+            try:
+                cursor.execute(f"ALTER TABLE screenshot_schedules ADD COLUMN {column}")
+            except sqlite3.OperationalError:
+                pass  # Column already exists
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_screenshot_schedules_status ON screenshot_schedules(status)")
+
         # Chat messages table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS chat_messages (
@@ -189,6 +286,10 @@ class Database:
             )
         """)
 
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_chat_messages_session ON chat_messages(user_id, session_id, created_at, id)"
+        )
+
         # Audit logs table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS audit_logs (
@@ -203,6 +304,10 @@ class Database:
                 FOREIGN KEY (user_id) REFERENCES users(id)
             )
         """)
+        # Only the current month stays here; see services/audit_archive.py
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_audit_logs_created ON audit_logs(created_at)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_audit_logs_user ON audit_logs(user_id, created_at)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_audit_logs_action ON audit_logs(action, created_at)")
 
         # Sessions table (for simple auth tracking)
         cursor.execute("""
@@ -262,6 +367,18 @@ class Database:
             )
         """)
 
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_daily_updates_user_created ON daily_updates(user_id, created_at, id)")
+
+        # Newest daily update already converted to events, per user
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS update_event_watermarks (
+                user_id INTEGER PRIMARY KEY,
+                last_update_id INTEGER NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users(id)
+            )
+        """)
+
         # Team members table (for team leader to manage team)
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS team_members (
@@ -307,6 +424,9 @@ class Database:
                 FOREIGN KEY (team_leader_id) REFERENCES users(id)
             )
         """)
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_timeline_charts_leader ON timeline_charts(team_leader_id, created_at, id)"
+        )
 
         conn.commit()
         conn.close()
@@ -314,16 +434,11 @@ class Database:
 
     def log_audit(self, user_id: Optional[int], action: str, resource_type: Optional[str] = None,
                   resource_id: Optional[int] = None, details: Optional[str] = None, ip_address: Optional[str] = None):
-        """Log an audit entry."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO audit_logs (user_id, action, resource_type, resource_id, details, ip_address)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (user_id, action, resource_type, resource_id, details, ip_address))
-        conn.commit()
-        conn.close()
+        """Log an audit entry (buffered; written in batches off the request path)."""
+        self.audit_buffer.add(user_id, action, resource_type, resource_id, details, ip_address)
 
 
 # Initialize database instance
 db = Database()
+# Scripts (e.g. seed_data.py) exit without an application shutdown
+atexit.register(db.close_writer)
@@ -102,6 +102,21 @@ class VideoUploadResponse(BaseModel):
     uploaded_at: datetime
 
 
+class ResumableUploadCreate(BaseModel):
+    session_date: date
+    filename: str
+    total_size: int = Field(gt=0, description="Total upload size in bytes")
+    interval_seconds: int = Field(30, gt=0, description="Frame interval used when processing the video")
+
+
+class ResumableUploadResponse(BaseModel):
+    upload_id: str
+    filename: str
+    offset: int
+    total_size: int
+    status: str
+
+
 class ScreenshotScheduleCreate(BaseModel):
     interval_minutes: int = Field(gt=0, le=60, description="Screenshot interval in minutes")
     duration_minutes: int = Field(gt=0, le=480, description="Total duration in minutes")
@@ -365,9 +380,12 @@ class EmployeeSummary(BaseModel):
 
 
 class TimelineChartResponse(BaseModel):
+    id: Optional[int] = None
     project_name: str
     image_path: str
-    image_base64: Optional[str] = None
+    # Signed and short-lived, so they work in <img src> without the Authorization header
+    image_url: Optional[str] = None
+    thumbnail_url: Optional[str] = None
     summary_text: str
     milestones: List[Milestone]
     employee_summaries: List[EmployeeSummary]
@@ -0,0 +1,188 @@
+"""
+Single-writer queue for SQLite writes.
+
+One background thread owns the only write connection. Callers queue write
+operations (functions taking a cursor) and get a Future back; the thread
+gathers whatever is queued within a few milliseconds and commits it as one
+transaction, so N concurrent writes cost one fsync instead of N and never
+contend for SQLite's write lock inside this process. Each operation runs
+inside its own SAVEPOINT: a failing operation is rolled back and its Future
+gets the exception, without affecting the rest of the batch. A Future
+completes only after the transaction containing it has committed.
+"""
+import asyncio
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Iterable, Optional, Sequence
+import logging
+
+logger = logging.getLogger(__name__)
+
+# How long the writer waits for more operations before committing a batch
+BATCH_WINDOW_SECONDS = float(os.getenv("DB_WRITE_BATCH_MS", "5")) / 1000
+MAX_BATCH_SIZE = int(os.getenv("DB_WRITE_MAX_BATCH", "256"))
+
+_STOP = object()
+
+
+class DatabaseWriter:
+    """Owns the write connection and commits queued operations in groups."""
+
+    def __init__(self, connect: Callable[[], sqlite3.Connection],
+                 batch_window: float = BATCH_WINDOW_SECONDS, max_batch: int = MAX_BATCH_SIZE):
+        """
+        Args:
+            connect: Returns a new connection; called once, on the writer thread.
+            batch_window: Seconds to keep collecting operations after the first one arrives.
+            max_batch: Commit early once this many operations are collected.
+        """
+        self._connect = connect
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self._queue: "queue.Queue" = queue.Queue()
+        # Set if the write connection could not be opened; fails every submit()
+        self.error: Optional[BaseException] = None
+        self._submit_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._closed = False
+        self._thread.start()
+
+    # ---------------------------------------------------------------
+    # Submitting work
+    # ---------------------------------------------------------------
+
+    def submit(self, operation: Callable[[sqlite3.Cursor], Any]) -> Future:
+        """Queue operation(cursor); the Future resolves to its return value once committed."""
+        if self._closed:
+            raise RuntimeError("Database writer is closed")
+        future: Future = Future()
+        with self._submit_lock:
+            if self.error is not None:
+                future.set_exception(self.error)
+            else:
+                self._queue.put((operation, future))
+        return future
+
+    def execute(self, sql: str, params: Sequence = ()) -> Future:
+        """Queue one statement; resolves to the row id of an INSERT (or the row count otherwise)."""
+        def operation(cursor):
+            cursor.execute(sql, params)
+            return cursor.lastrowid if sql.lstrip()[:6].upper() == "INSERT" else cursor.rowcount
+        return self.submit(operation)
+
+    def executemany(self, sql: str, seq_of_params: Iterable[Sequence]) -> Future:
+        """Queue a statement for many parameter sets; resolves to the row count."""
+        rows = list(seq_of_params)
+
+        def operation(cursor):
+            cursor.executemany(sql, rows)
+            return cursor.rowcount
+        return self.submit(operation)
+
+    async def write(self, operation: Callable[[sqlite3.Cursor], Any]) -> Any:
+        """submit() for async callers: await the committed result."""
+        return await asyncio.wrap_future(self.submit(operation))
+
+    def close(self, timeout: Optional[float] = None):
+        """Commit everything already queued and stop the thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    # ---------------------------------------------------------------
+    # Writer thread
+    # ---------------------------------------------------------------
+
+    def _collect(self, first) -> tuple:
+        """Gather a batch starting with first; returns (batch, stop_requested)."""
+        batch = [first]
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        try:
+            conn = self._connect()
+        except Exception as e:
+            logger.exception("Could not open the database write connection")
+            self._fail_queued(e)
+            return
+        # Transactions are managed explicitly below.
+        conn.isolation_level = None
+        try:
+            stop = False
+            while not stop:
+                first = self._queue.get()
+                if first is _STOP:
+                    break
+                batch, stop = self._collect(first)
+                self._commit_batch(conn, batch)
+            # Anything queued after the stop marker (submitted while closing)
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not _STOP:
+                    self._commit_batch(conn, [item])
+        finally:
+            conn.close()
+
+    def _fail_queued(self, error: BaseException):
+        """Fail everything queued so far and every later submit() with error."""
+        with self._submit_lock:
+            self.error = error
+        # No put() can happen after the error is set, so this drains the queue for good
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP and item[1].set_running_or_notify_cancel():
+                item[1].set_exception(error)
+
+    def _commit_batch(self, conn: sqlite3.Connection, batch: list):
+        live = [(op, fut) for op, fut in batch if fut.set_running_or_notify_cancel()]
+        if not live:
+            return
+        cursor = conn.cursor()
+        outcomes = []
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            for operation, _ in live:
+                cursor.execute("SAVEPOINT op")
+                try:
+                    outcomes.append((True, operation(cursor)))
+                    cursor.execute("RELEASE op")
+                except Exception as e:
+                    cursor.execute("ROLLBACK TO op")
+                    cursor.execute("RELEASE op")
+                    outcomes.append((False, e))
+            cursor.execute("COMMIT")
+        except Exception as e:
+            logger.exception(f"Write batch of {len(live)} operations failed")
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for _, future in live:
+                future.set_exception(e)
+            return
+
+        for (_, future), (ok, value) in zip(live, outcomes):
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
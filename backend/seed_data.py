@@ -5,11 +5,12 @@ Run this script to create test users including a team leader.
 import sys
 import os
 
-# Add backend to path
+# Add backend and its parent to path (same import layout as main.py)
 backend_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, backend_dir)
+sys.path.insert(0, os.path.dirname(backend_dir))
 
-from models.database import db
+from backend.models.database import db
 from services.auth_service import AuthService
 
 def seed_users():
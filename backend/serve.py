@@ -0,0 +1,71 @@
+"""
+Production entry point: serves the API from several worker processes.
+
+    cd backend
+    python serve.py --workers 4 --port 8000
+
+Workers share nothing in memory. Login sessions, uploads and the last screen
+capture embedding all live in SQLite, which runs in WAL mode with a busy
+timeout so the workers can read and write the same database concurrently.
+Schema migrations and startup housekeeping run once here, before any worker
+starts, instead of once per worker.
+"""
+import argparse
+import logging
+import os
+import sys
+
+# Same import layout as main.py
+backend_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(backend_dir)
+sys.path.insert(0, backend_dir)
+sys.path.insert(0, parent_dir)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def run_startup_maintenance():
+    """Create/migrate the schema and drop leftovers from previous runs."""
+    from backend.models.database import db  # importing runs init_database()
+    from services.blob_store import BlobStore
+    from services.resumable_upload import ResumableUploadService
+    from services.audit_archive import AuditLogArchive
+
+    removed = BlobStore(db).collect_garbage()
+    if removed["blobs"]:
+        logger.info(f"Removed {removed['blobs']} unreferenced upload blobs ({removed['bytes']} bytes)")
+    stale = ResumableUploadService(db).cleanup_stale()
+    if stale:
+        logger.info(f"Dropped {stale} abandoned resumable uploads")
+    AuditLogArchive(db).maintain()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Employee Tracking System API")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument(
+        "--workers", type=int,
+        default=int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1))),
+        help="Number of API worker processes (default: WEB_CONCURRENCY or CPU count)",
+    )
+    args = parser.parse_args()
+
+    run_startup_maintenance()
+    # Already done above; the workers' lifespan handlers skip it.
+    os.environ["BACKEND_STARTUP_MAINTENANCE"] = "0"
+    # Each API worker has its own extraction/OCR pool; split the cores between them.
+    os.environ.setdefault("WORKER_PROCESSES", str(max(1, (os.cpu_count() or 1) // args.workers)))
+
+    import uvicorn
+    app_path = "backend.main:app" if __package__ else "main:app"
+    logger.info(f"Starting {args.workers} API workers on {args.host}:{args.port}")
+    uvicorn.run(app_path, host=args.host, port=args.port, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
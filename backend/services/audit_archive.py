@@ -0,0 +1,204 @@
+"""
+Monthly partitioning and retention for the audit log.
+
+audit_logs is the hot table and only holds the current month. rotate() moves
+every earlier row into a per-month table (audit_logs_2024_05, ...) with the
+same columns and ids, indexed by user and by action over time; apply_retention()
+drops month tables older than the retention window. query() searches the hot
+table and just the month tables that overlap the requested time range.
+"""
+import os
+import re
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+RETENTION_MONTHS = int(os.getenv("AUDIT_RETENTION_MONTHS", "12"))
+
+HOT_TABLE = "audit_logs"
+_PARTITION_RE = re.compile(r"^audit_logs_(\d{4})_(\d{2})$")
+COLUMNS = "id, user_id, action, resource_type, resource_id, details, ip_address, created_at"
+
+
+def partition_name(year: int, month: int) -> str:
+    return f"{HOT_TABLE}_{year:04d}_{month:02d}"
+
+
+def _month_start(year: int, month: int) -> str:
+    return f"{year:04d}-{month:02d}-01 00:00:00"
+
+
+def _next_month(year: int, month: int) -> Tuple[int, int]:
+    return (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def _months_before(year: int, month: int, count: int) -> Tuple[int, int]:
+    index = year * 12 + (month - 1) - count
+    return index // 12, index % 12 + 1
+
+
+def _timestamp(value: Union[date, datetime, str]) -> str:
+    """Format a bound like SQLite's CURRENT_TIMESTAMP so text comparison works."""
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, date):
+        return value.strftime("%Y-%m-%d 00:00:00")
+    return value
+
+
+class AuditLogArchive:
+    """Rotates audit_logs into monthly tables, prunes old months and queries across them."""
+
+    def __init__(self, db, retention_months: int = RETENTION_MONTHS):
+        self.db = db
+        self.retention_months = retention_months
+
+    def partitions(self, cursor=None) -> List[Tuple[int, int, str]]:
+        """(year, month, table) of every month table, oldest first."""
+        conn = None
+        if cursor is None:
+            conn = self.db.get_connection()
+            cursor = conn.cursor()
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'audit_logs_%'")
+        names = [row[0] for row in cursor.fetchall()]
+        if conn:
+            conn.close()
+        found = []
+        for name in names:
+            match = _PARTITION_RE.match(name)
+            if match:
+                found.append((int(match.group(1)), int(match.group(2)), name))
+        return sorted(found)
+
+    def _ensure_partition(self, cursor, year: int, month: int) -> str:
+        table = partition_name(year, month)
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                id INTEGER PRIMARY KEY,
+                user_id INTEGER,
+                action TEXT NOT NULL,
+                resource_type TEXT,
+                resource_id INTEGER,
+                details TEXT,
+                ip_address TEXT,
+                created_at TIMESTAMP NOT NULL
+            )
+        """)
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_user ON {table}(user_id, created_at)")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_action ON {table}(action, created_at)")
+        return table
+
+    def rotate(self, now: Optional[datetime] = None) -> int:
+        """Move rows from before the current month into their month tables; returns rows moved."""
+        now = now or datetime.utcnow()
+        current_start = _month_start(now.year, now.month)
+
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT DISTINCT CAST(strftime('%Y', created_at) AS INTEGER),
+                            CAST(strftime('%m', created_at) AS INTEGER)
+            FROM {HOT_TABLE} WHERE created_at < ?
+        """, (current_start,))
+        months = cursor.fetchall()
+        conn.close()
+        if not months:
+            return 0
+
+        def move_rows(cursor):
+            for year, month in months:
+                table = self._ensure_partition(cursor, year, month)
+                cursor.execute(f"""
+                    INSERT OR IGNORE INTO {table} ({COLUMNS})
+                    SELECT {COLUMNS} FROM {HOT_TABLE}
+                    WHERE created_at >= ? AND created_at < ?
+                """, (_month_start(year, month), _month_start(*_next_month(year, month))))
+            cursor.execute(f"DELETE FROM {HOT_TABLE} WHERE created_at < ?", (current_start,))
+            return cursor.rowcount
+
+        moved = self.db.writer.submit(move_rows).result()
+        logger.info(f"Moved {moved} audit log rows into monthly tables")
+        return moved
+
+    def apply_retention(self, now: Optional[datetime] = None) -> List[str]:
+        """Drop month tables older than the retention window; returns the dropped tables."""
+        now = now or datetime.utcnow()
+        oldest_kept = _months_before(now.year, now.month, self.retention_months)
+
+        def drop_expired(cursor):
+            dropped = []
+            for year, month, table in self.partitions(cursor):
+                if (year, month) < oldest_kept:
+                    cursor.execute(f"DROP TABLE {table}")
+                    dropped.append(table)
+            return dropped
+
+        dropped = self.db.writer.submit(drop_expired).result()
+        if dropped:
+            logger.info(f"Dropped expired audit log tables: {', '.join(dropped)}")
+        return dropped
+
+    def maintain(self, now: Optional[datetime] = None) -> Dict:
+        """rotate() then apply_retention(); safe to run repeatedly."""
+        return {"moved": self.rotate(now), "dropped": self.apply_retention(now)}
+
+    def query(
+        self,
+        user_id: Optional[int] = None,
+        action: Optional[str] = None,
+        start: Optional[Union[date, datetime, str]] = None,
+        end: Optional[Union[date, datetime, str]] = None,
+        limit: int = 100,
+    ) -> List[Dict]:
+        """
+        Audit entries matching all given filters, newest first.
+
+        Args:
+            user_id: Only entries by this user.
+            action: Only this action (e.g. 'USER_LOGIN').
+            start: Inclusive lower bound on created_at.
+            end: Exclusive upper bound on created_at.
+            limit: Maximum number of entries.
+        """
+        start_ts = _timestamp(start) if start is not None else None
+        end_ts = _timestamp(end) if end is not None else None
+
+        tables = [HOT_TABLE]
+        for year, month, table in self.partitions():
+            if end_ts is not None and _month_start(year, month) >= end_ts:
+                continue
+            if start_ts is not None and _month_start(*_next_month(year, month)) <= start_ts:
+                continue
+            tables.append(table)
+
+        conditions, params = [], []
+        if user_id is not None:
+            conditions.append("user_id = ?")
+            params.append(user_id)
+        if action is not None:
+            conditions.append("action = ?")
+            params.append(action)
+        if start_ts is not None:
+            conditions.append("created_at >= ?")
+            params.append(start_ts)
+        if end_ts is not None:
+            conditions.append("created_at < ?")
+            params.append(end_ts)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        # Each branch is limited on its own indexes before the merge
+        union = " UNION ALL ".join(
+            f"SELECT * FROM (SELECT {COLUMNS} FROM {table} {where} ORDER BY created_at DESC, id DESC LIMIT ?)"
+            for table in tables
+        )
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            f"{union} ORDER BY created_at DESC, id DESC LIMIT ?",
+            (params + [limit]) * len(tables) + [limit],
+        )
+        rows = [dict(row) for row in cursor.fetchall()]
+        conn.close()
+        return rows
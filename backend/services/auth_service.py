@@ -31,24 +31,22 @@ class AuthService:
             Tuple of (success, message, user_id)
         """
         try:
-            conn = self.db.get_connection()
-            cursor = conn.cursor()
-            
-            # Check if username exists
-            cursor.execute("SELECT id FROM users WHERE username = ?", (username,))
-            if cursor.fetchone():
-                return False, "Username already exists", None
-            
-            # Hash password and insert user
             hashed_password = self.hash_password(password)
-            cursor.execute("""
-                INSERT INTO users (username, password, name, role)
-                VALUES (?, ?, ?, ?)
-            """, (username, hashed_password, name, role))
-            
-            user_id = cursor.lastrowid
-            conn.commit()
-            conn.close()
+
+            def insert_user(cursor):
+                # Check if username exists
+                cursor.execute("SELECT id FROM users WHERE username = ?", (username,))
+                if cursor.fetchone():
+                    return None
+                cursor.execute("""
+                    INSERT INTO users (username, password, name, role)
+                    VALUES (?, ?, ?, ?)
+                """, (username, hashed_password, name, role))
+                return cursor.lastrowid
+
+            user_id = self.db.writer.submit(insert_user).result()
+            if user_id is None:
+                return False, "Username already exists", None
             
             # Log audit
             self.db.log_audit(user_id, "USER_REGISTERED", "users", user_id, 
@@ -98,18 +96,16 @@ class AuthService:
                 return False, "Invalid username or password", None, None
             
             user = dict(user_row)
+            conn.close()
             
             # Create session token
             session_token = self.generate_session_token()
             expires_at = datetime.now() + timedelta(days=7)
             
-            cursor.execute("""
+            self.db.writer.execute("""
                 INSERT INTO sessions (user_id, session_token, expires_at)
                 VALUES (?, ?, ?)
-            """, (user['id'], session_token, expires_at))
-            
-            conn.commit()
-            conn.close()
+            """, (user['id'], session_token, expires_at)).result()
             
             # Log audit
             self.db.log_audit(user['id'], "USER_LOGIN", "users", user['id'], 
@@ -161,22 +157,20 @@ class AuthService:
     def logout_user(self, session_token: str) -> bool:
         """Logout user by removing session."""
         try:
-            conn = self.db.get_connection()
-            cursor = conn.cursor()
-            
-            # Get user_id before deleting
-            cursor.execute("SELECT user_id FROM sessions WHERE session_token = ?", (session_token,))
-            row = cursor.fetchone()
-            
-            if row:
-                user_id = row[0]
+            def delete_session(cursor):
+                # Get user_id before deleting
+                cursor.execute("SELECT user_id FROM sessions WHERE session_token = ?", (session_token,))
+                row = cursor.fetchone()
+                if not row:
+                    return None
                 cursor.execute("DELETE FROM sessions WHERE session_token = ?", (session_token,))
-                conn.commit()
-                
+                return row[0]
+
+            user_id = self.db.writer.submit(delete_session).result()
+            if user_id is not None:
                 # Log audit
                 self.db.log_audit(user_id, "USER_LOGOUT", "users", user_id, "User logged out")
             
-            conn.close()
             return True
             
         except Exception as e:
@@ -207,9 +201,6 @@ class AuthService:
                            comments: Optional[str] = None, name: Optional[str] = None) -> bool:
         """Update user settings."""
         try:
-            conn = self.db.get_connection()
-            cursor = conn.cursor()
-            
             updates = []
             params = []
             
@@ -232,10 +223,7 @@ class AuthService:
             params.append(user_id)
             
             query = f"UPDATE users SET {', '.join(updates)} WHERE id = ?"
-            cursor.execute(query, params)
-            
-            conn.commit()
-            conn.close()
+            self.db.writer.execute(query, params).result()
             
             # Log audit
             self.db.log_audit(user_id, "USER_SETTINGS_UPDATED", "users", user_id, 
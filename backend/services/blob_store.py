@@ -0,0 +1,230 @@
+"""
+Content-addressed storage for uploaded files.
+
+Each distinct file is written once under the SHA-256 of its bytes
+(uploads/blobs/ab/abcdef...), with the hash computed while the upload streams
+to a temporary file. Rows in transcripts, videos, screenshots and
+uploaded_files point at blobs through their blob_hash column; the blobs table
+keeps a reference count so duplicates cost nothing and garbage collection can
+remove files nobody points at any more.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from typing import BinaryIO, Dict
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROOT = "backend/uploads/blobs"
+
+# Tables whose rows reference blobs through a blob_hash column.
+REFERENCING_TABLES = ("transcripts", "videos", "screenshots", "uploaded_files")
+
+COPY_CHUNK_BYTES = 1024 * 1024
+
+
+def file_sha256(path: str) -> str:
+    """SHA-256 hex digest of a file, read in chunks."""
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(COPY_CHUNK_BYTES), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class BlobWriter:
+    """Streams one upload into the store, hashing as it writes."""
+
+    def __init__(self, store: "BlobStore"):
+        self.store = store
+        self.size = 0
+        self._hasher = hashlib.sha256()
+        fd, self._tmp_path = tempfile.mkstemp(dir=store.tmp_dir)
+        self._file = os.fdopen(fd, "wb")
+
+    def write(self, data: bytes):
+        self._hasher.update(data)
+        self._file.write(data)
+        self.size += len(data)
+
+    @property
+    def hexdigest(self) -> str:
+        """SHA-256 of everything written so far."""
+        return self._hasher.hexdigest()
+
+    def commit(self) -> str:
+        """Move the data under its hash (dropping it if already stored) and return the hash."""
+        self._file.close()
+        blob_hash = self._hasher.hexdigest()
+        self.store._adopt(self._tmp_path, blob_hash, self.size)
+        self._tmp_path = None
+        return blob_hash
+
+    def abort(self):
+        """Throw away an unfinished write."""
+        if self._tmp_path:
+            self._file.close()
+            os.remove(self._tmp_path)
+            self._tmp_path = None
+
+
+class BlobStore:
+    """Deduplicating file store keyed by content hash, with reference counts."""
+
+    def __init__(self, db, root: str = DEFAULT_ROOT):
+        self.db = db
+        self.root = root
+        self.tmp_dir = os.path.join(root, "tmp")
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+    def path_for(self, blob_hash: str) -> str:
+        """Filesystem path of a blob."""
+        return os.path.join(self.root, blob_hash[:2], blob_hash)
+
+    # ---------------------------------------------------------------
+    # Writes
+    # ---------------------------------------------------------------
+
+    def writer(self) -> BlobWriter:
+        """Start a streamed write; call commit() once all data is written."""
+        return BlobWriter(self)
+
+    def put_stream(self, fileobj: BinaryIO) -> str:
+        """Store everything readable from a file object and return its hash."""
+        writer = self.writer()
+        try:
+            for chunk in iter(lambda: fileobj.read(COPY_CHUNK_BYTES), b""):
+                writer.write(chunk)
+        except BaseException:
+            writer.abort()
+            raise
+        return writer.commit()
+
+    def put_file(self, path: str, move: bool = False, link: bool = False) -> str:
+        """
+        Store an existing file and return its hash.
+
+        With move=True the file is moved in. With link=True it stays where it
+        is and is hard-linked in (copied where the filesystem cannot link);
+        the caller must not modify it afterwards. Otherwise it is copied.
+        """
+        if not (move or link):
+            with open(path, "rb") as f:
+                return self.put_stream(f)
+
+        blob_hash = file_sha256(path)
+        # Land the file next to the blobs first so the final rename is atomic.
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir)
+        os.close(fd)
+        if move:
+            shutil.move(path, tmp_path)
+        else:
+            os.remove(tmp_path)
+            try:
+                os.link(path, tmp_path)
+            except OSError:
+                shutil.copyfile(path, tmp_path)
+        self._adopt(tmp_path, blob_hash, os.path.getsize(tmp_path))
+        return blob_hash
+
+    def _adopt(self, tmp_path: str, blob_hash: str, size: int):
+        path = self.path_for(blob_hash)
+
+        def adopt(cursor):
+            # last_written_at is refreshed on duplicates too, keeping GC away
+            # from a blob that a new upload is about to reference.
+            now = time.time()
+            cursor.execute("""
+                INSERT INTO blobs (hash, size, ref_count, created_at, last_written_at)
+                VALUES (?, ?, 0, ?, ?)
+                ON CONFLICT(hash) DO UPDATE SET last_written_at = excluded.last_written_at
+            """, (blob_hash, size, now, now))
+            if os.path.exists(path):
+                os.remove(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+
+        # Placed inside the write transaction, so garbage collection (also a
+        # writer operation) cannot remove the blob in between.
+        self.db.writer.submit(adopt).result()
+
+    # ---------------------------------------------------------------
+    # References
+    # ---------------------------------------------------------------
+
+    def add_ref(self, cursor, blob_hash: str):
+        """Count a new referencing row; run in the same transaction as its INSERT."""
+        cursor.execute("UPDATE blobs SET ref_count = ref_count + 1 WHERE hash = ?", (blob_hash,))
+
+    def release(self, cursor, blob_hash: str):
+        """Drop a reference; run in the same transaction as the row's DELETE."""
+        cursor.execute(
+            "UPDATE blobs SET ref_count = MAX(ref_count - 1, 0) WHERE hash = ?", (blob_hash,)
+        )
+
+    def delete_row(self, cursor, table: str, row_id: int) -> bool:
+        """Delete a row of a referencing table and release its blob; False if there was no such row."""
+        if table not in REFERENCING_TABLES:
+            raise ValueError(f"{table} does not reference blobs")
+        cursor.execute(f"SELECT blob_hash FROM {table} WHERE id = ?", (row_id,))
+        row = cursor.fetchone()
+        if row is None:
+            return False
+        cursor.execute(f"DELETE FROM {table} WHERE id = ?", (row_id,))
+        if row[0]:
+            self.release(cursor, row[0])
+        return True
+
+    def collect_garbage(self, grace_seconds: int = 3600) -> Dict[str, int]:
+        """
+        Delete blobs that no row references.
+
+        Reference counts are first recomputed from the referencing tables, so
+        counts left wrong by a crash are repaired. Blobs younger than
+        grace_seconds are kept: their row may still be on its way in.
+        Returns the number of blobs and bytes removed.
+        """
+        def collect(cursor):
+            # One write transaction: no reference or adoption can slip in
+            # between counting, deleting a row and removing its file.
+            removed = {"blobs": 0, "bytes": 0}
+            referenced = " UNION ALL ".join(
+                f"SELECT blob_hash FROM {table} WHERE blob_hash IS NOT NULL" for table in REFERENCING_TABLES
+            )
+            cursor.execute(f"""
+                UPDATE blobs SET ref_count = (
+                    SELECT COUNT(*) FROM ({referenced}) AS refs WHERE refs.blob_hash = blobs.hash
+                )
+            """)
+            cursor.execute(
+                "SELECT hash, size FROM blobs WHERE ref_count = 0 AND last_written_at < ?",
+                (time.time() - grace_seconds,),
+            )
+            for row in cursor.fetchall():
+                # Row first: a blob row never points at a removed file.
+                cursor.execute("DELETE FROM blobs WHERE hash = ?", (row["hash"],))
+                try:
+                    os.remove(self.path_for(row["hash"]))
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    logger.warning(f"Could not remove blob {row['hash']}: {e}")
+                    continue
+                removed["blobs"] += 1
+                removed["bytes"] += row["size"]
+            return removed
+
+        removed = self.db.writer.submit(collect).result()
+
+        # Leftovers of interrupted writes.
+        cutoff = time.time() - grace_seconds
+        for name in os.listdir(self.tmp_dir):
+            tmp_path = os.path.join(self.tmp_dir, name)
+            if os.path.getmtime(tmp_path) < cutoff:
+                os.remove(tmp_path)
+
+        return removed
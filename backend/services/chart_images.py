@@ -0,0 +1,196 @@
+"""
+Serving of timeline chart images and their thumbnails.
+
+Chart PNGs are written once under a unique name and never modified, so they
+are served by URL (instead of base64 inside JSON) with a strong validator and
+a year-long private cache lifetime. Conditional requests (If-None-Match /
+If-Modified-Since) get a 304, and single byte ranges a 206, so clients never
+download the same image twice. Thumbnails are rendered next to the chart
+(chart.png -> chart_thumb.png) when it is generated, or on first request.
+
+<img src> cannot send the Authorization header, so the image and thumbnail
+URLs handed out by the API carry a short-lived signature (?user=, ?expires=,
+?signature=, an HMAC over chart, kind, user and expiry). The expiry is
+rounded to URL_TTL_SECONDS windows so the same URL, and the browser cache
+entry behind it, is reused within a window; a URL stays valid for one to two
+windows. The endpoints accept the header as well.
+"""
+import hashlib
+import hmac
+import os
+import secrets
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from functools import lru_cache
+from typing import Optional, Tuple
+from urllib.parse import urlencode
+
+from fastapi import Request
+from fastapi.responses import FileResponse, Response
+
+THUMBNAIL_SIZE = (
+    int(os.getenv("CHART_THUMBNAIL_WIDTH", "480")),
+    int(os.getenv("CHART_THUMBNAIL_HEIGHT", "270")),
+)
+THUMBNAIL_TIMEOUT = float(os.getenv("THUMBNAIL_TIMEOUT_SECONDS", "30"))
+CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+URL_TTL_SECONDS = int(os.getenv("CHART_URL_TTL_SECONDS", "3600"))
+# Shared by all API workers; generated on first use unless CHART_URL_SECRET is set
+SECRET_FILE = os.getenv("CHART_URL_SECRET_FILE", "backend/uploads/.chart_url_secret")
+
+
+@lru_cache(maxsize=1)
+def _url_secret() -> bytes:
+    configured = os.getenv("CHART_URL_SECRET")
+    if configured:
+        return configured.encode()
+    try:
+        with open(SECRET_FILE, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        pass
+    os.makedirs(os.path.dirname(SECRET_FILE) or ".", exist_ok=True)
+    partial = f"{SECRET_FILE}.{os.getpid()}.tmp"
+    with open(partial, "wb") as f:
+        f.write(secrets.token_hex(32).encode())
+    try:
+        # link() fails if another worker published its secret first; use that one
+        os.link(partial, SECRET_FILE)
+    except FileExistsError:
+        pass
+    finally:
+        os.remove(partial)
+    with open(SECRET_FILE, "rb") as f:
+        return f.read()
+
+
+def _signature(chart_id: int, kind: str, user_id: int, expires: int) -> str:
+    message = f"{chart_id}:{kind}:{user_id}:{expires}".encode()
+    return hmac.new(_url_secret(), message, hashlib.sha256).hexdigest()
+
+
+def _signed_url(chart_id: int, kind: str, user_id: int, now: Optional[float] = None) -> str:
+    now = time.time() if now is None else now
+    expires = (int(now) // URL_TTL_SECONDS + 2) * URL_TTL_SECONDS
+    query = urlencode({"user": user_id, "expires": expires,
+                       "signature": _signature(chart_id, kind, user_id, expires)})
+    return f"/api/team-leader/timeline/charts/{chart_id}/{kind}?{query}"
+
+
+def chart_image_url(chart_id: int, user_id: int) -> str:
+    """Signed URL of a chart image, usable in <img src> by the given team leader."""
+    return _signed_url(chart_id, "image", user_id)
+
+
+def chart_thumbnail_url(chart_id: int, user_id: int) -> str:
+    """Signed URL of a chart thumbnail, usable in <img src> by the given team leader."""
+    return _signed_url(chart_id, "thumbnail", user_id)
+
+
+def verify_signature(chart_id: int, kind: str, user_id: int, expires: int, signature: str,
+                     now: Optional[float] = None) -> bool:
+    """True if the signature matches and has not expired."""
+    now = time.time() if now is None else now
+    if expires < now:
+        return False
+    return hmac.compare_digest(_signature(chart_id, kind, user_id, expires), signature)
+
+
+def thumbnail_path(image_path: str) -> str:
+    root, ext = os.path.splitext(image_path)
+    return f"{root}_thumb{ext or '.png'}"
+
+
+def make_thumbnail(image_path: str, size: Tuple[int, int] = THUMBNAIL_SIZE) -> str:
+    """
+    Render the thumbnail of a chart image (kept within size, aspect preserved).
+
+    Runs in the worker pool. Returns the thumbnail path; an existing thumbnail
+    is reused.
+    """
+    from PIL import Image
+
+    path = thumbnail_path(image_path)
+    if os.path.exists(path):
+        return path
+    with Image.open(image_path) as image:
+        image.thumbnail(size, Image.LANCZOS)
+        # Write then rename so a concurrent request never serves a partial file
+        partial = f"{path}.{os.getpid()}.tmp"
+        image.save(partial, format="PNG", optimize=True)
+    os.replace(partial, path)
+    return path
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Inclusive (start, end) of a single-range "bytes=..." header.
+
+    Returns None when the header should be ignored (not bytes, multiple ranges
+    or malformed) and raises ValueError when the range is unsatisfiable.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep or not (first or last) or not (first or "0").isdigit() or not (last or "0").isdigit():
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        if int(last) == 0:
+            raise ValueError("empty suffix range")
+        return max(0, size - int(last)), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size:
+        raise ValueError("range starts past the end of the file")
+    if start > end:
+        return None
+    return start, min(end, size - 1)
+
+
+def _not_modified(request: Request, etag: str, mtime: float) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def image_response(request: Request, path: str, media_type: str = "image/png") -> Response:
+    """Serve an immutable image file with caching, validators and Range support."""
+    stat = os.stat(path)
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        "Cache-Control": CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+    }
+    if _not_modified(request, etag, stat.st_mtime):
+        return Response(status_code=304, headers=headers)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range == etag or if_range == headers["Last-Modified"]):
+        try:
+            byte_range = parse_range(range_header, stat.st_size)
+        except ValueError:
+            headers["Content-Range"] = f"bytes */{stat.st_size}"
+            return Response(status_code=416, headers=headers)
+        if byte_range is not None:
+            start, end = byte_range
+            with open(path, "rb") as f:
+                f.seek(start)
+                body = f.read(end - start + 1)
+            headers["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+            return Response(body, status_code=206, media_type=media_type, headers=headers)
+
+    return FileResponse(path, media_type=media_type, headers=headers, stat_result=stat)
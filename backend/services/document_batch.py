@@ -0,0 +1,85 @@
+"""
+Concurrent ingestion and extraction of a batch of uploaded documents.
+
+Timeline requests carry several documents. Instead of save, extract, next
+file, every file gets its own pipeline: it is streamed to disk and then
+extracted in the worker pool. All pipelines run at once, so extraction of one
+file overlaps with saving and extracting the others, and the pool size bounds
+CPU parallelism. Each extraction has its own timeout, capped by what is left
+of the batch's latency budget. A slow or broken document costs its own text,
+never the whole request. Results come back in upload order.
+"""
+import asyncio
+import os
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence
+import logging
+
+from fastapi import UploadFile
+
+from .ingest import ingest_to_file
+from .workers import EXTRACTION_TIMEOUT, extract_text, run_in_worker
+
+logger = logging.getLogger(__name__)
+
+# Latency budget for ingesting and extracting one batch, in seconds
+BATCH_EXTRACTION_BUDGET = float(os.getenv("BATCH_EXTRACTION_BUDGET_SECONDS", "90"))
+
+
+@dataclass
+class ExtractedDocument:
+    """Text of one uploaded document, or why there is none."""
+    filename: str
+    path: str
+    text: str = ""
+    error: Optional[str] = None
+
+
+async def ingest_and_extract(
+    files: Sequence[UploadFile],
+    upload_dir: str,
+    prefix: str,
+    file_timeout: float = EXTRACTION_TIMEOUT,
+    budget: float = BATCH_EXTRACTION_BUDGET,
+    extractor: Callable = extract_text,
+) -> List[ExtractedDocument]:
+    """
+    Save uploads under upload_dir and extract their text concurrently.
+
+    Upload errors (e.g. the size limit) are raised; extraction errors and
+    timeouts are reported per document in ExtractedDocument.error.
+
+    Args:
+        files: Uploaded documents.
+        upload_dir: Directory to save them in.
+        prefix: Filename prefix (user id and timestamp).
+        file_timeout: Longest extraction of a single document.
+        budget: Seconds the whole batch may take.
+        extractor: Worker task turning a file path into text.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + budget
+
+    async def process(index: int, file: UploadFile) -> ExtractedDocument:
+        # The index keeps same-named uploads of one batch apart
+        path = os.path.join(upload_dir, f"{prefix}_{index}_{file.filename}")
+        await ingest_to_file(file, path)
+        document = ExtractedDocument(filename=file.filename, path=path)
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            document.error = "extraction skipped: latency budget exhausted"
+            return document
+        try:
+            document.text = await run_in_worker(extractor, path, timeout=min(file_timeout, remaining))
+        except Exception as e:
+            logger.warning(f"Could not extract {file.filename}: {e}")
+            document.error = str(e) or type(e).__name__
+        return document
+
+    tasks = [asyncio.ensure_future(process(index, file)) for index, file in enumerate(files)]
+    try:
+        return list(await asyncio.gather(*tasks))
+    finally:
+        # An upload error fails the batch; stop the other pipelines.
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,141 @@
+"""
+Rule-based extraction of calendar events from daily update text.
+
+All patterns are compiled once at import. Each text is scanned a single time
+for keyword positions (start/begin/from, end/deadline/by/until, priority,
+status); the date, time, priority and status rules then only run anchored at
+those positions instead of re-searching the whole text once per rule. The
+results are identical to the original inline rules of update_all_to_events:
+
+- priority/status: 'priority: high' etc. anywhere in the text
+- start date: the first 'start date|begin|starts|from <Month> <d>, <yyyy>'
+  (today when missing or unparseable)
+- start/end time: the first 'h:mm am' (else 'h am') on the same line after a
+  start/end keyword, defaulting to 09:00 and 18:00
+"""
+import re
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_START_TIME = "09:00"
+DEFAULT_END_TIME = "18:00"
+
+_KEYWORD_SOURCE = r"(?P<start>start|begin|from)|(?P<end>end|deadline|by|until)|(?P<priority>priority)|(?P<status>status)"
+_KEYWORDS = re.compile(_KEYWORD_SOURCE, re.IGNORECASE)
+# Case-sensitive matching on lowercased text is much faster. It finds the same
+# positions unless the text has one of the characters IGNORECASE folds onto
+# these ASCII letters (long s, dotted/dotless i, Kelvin sign).
+_KEYWORDS_LOWER = re.compile(_KEYWORD_SOURCE)
+_SPECIAL_FOLDS = re.compile("[\u017f\u0130\u0131\u212a]")
+
+_START_DATE = re.compile(
+    r"(?:start date|begin|starts?|from)[\s:]*(?:🕓|🗓️)?[\s]*([A-Za-z]+\s+\d{1,2},?\s+\d{4})", re.IGNORECASE
+)
+_TIME_WITH_MINUTES = re.compile(r"(\d{1,2}):(\d{2})\s*(am|pm|AM|PM)", re.IGNORECASE)
+_TIME_HOUR_ONLY = re.compile(r"(\d{1,2})\s*(am|pm|AM|PM)", re.IGNORECASE)
+
+_PRIORITY_HIGH = re.compile(r"[\s:]*(?:🔴|high|urgent)", re.IGNORECASE)
+_PRIORITY_LOW = re.compile(r"[\s:]*(?:🟢|low)", re.IGNORECASE)
+_STATUS_COMPLETED = re.compile(r"[\s:]*(?:🟢|completed|done)", re.IGNORECASE)
+_STATUS_IN_PROGRESS = re.compile(r"[\s:]*(?:🟡|in progress|ongoing)", re.IGNORECASE)
+
+
+def _scan(text: str) -> Dict[str, List[Tuple[int, int]]]:
+    """(start, end) of each keyword occurrence, by keyword group."""
+    found = {"start": [], "end": [], "priority": [], "status": []}
+    if text.isascii() or not _SPECIAL_FOLDS.search(text):
+        pattern, text = _KEYWORDS_LOWER, text.lower()
+    else:
+        pattern = _KEYWORDS
+    match = pattern.search(text)
+    while match:
+        found[match.lastgroup].append(match.span())
+        # Keywords overlap by at most their last character ("statustart",
+        # "endeadline"), so resume there rather than after the match.
+        match = pattern.search(text, match.end() - 1)
+    return found
+
+
+def _any_follows(text: str, positions: List[Tuple[int, int]], tail: re.Pattern) -> bool:
+    return any(tail.match(text, end) for _, end in positions)
+
+
+def _first_time(text: str, positions: List[Tuple[int, int]]) -> Optional[str]:
+    """First time on the same line after one of the keywords, as HH:MM."""
+    for pattern in (_TIME_WITH_MINUTES, _TIME_HOUR_ONLY):
+        match = None
+        for _, end in positions:
+            # The earliest time after an earlier keyword is still the earliest
+            # after this one if it starts later; reuse it.
+            if match is None or match.start() < end:
+                match = pattern.search(text, end)
+                if match is None:
+                    break
+            if "\n" not in text[end:match.start()]:
+                groups = match.groups()
+                hour = int(groups[0])
+                minute = int(groups[1]) if len(groups) > 2 and groups[1] else 0
+                meridiem = groups[-1].lower()
+                if meridiem == "pm" and hour < 12:
+                    hour += 12
+                elif meridiem == "am" and hour == 12:
+                    hour = 0
+                return f"{hour:02d}:{minute:02d}"
+    return None
+
+
+def _start_date(text: str, positions: List[Tuple[int, int]]) -> Optional[str]:
+    for start, _ in positions:
+        match = _START_DATE.match(text, start)
+        if match:
+            try:
+                parsed = datetime.strptime(match.group(1).replace(",", ""), "%B %d %Y")
+            except ValueError:
+                return None
+            return parsed.strftime("%Y-%m-%d")
+    return None
+
+
+def extract_event(title: str, content: Optional[str], today: Optional[date] = None) -> Dict:
+    """
+    Build the calendar event for one daily update.
+
+    Args:
+        title: Update title.
+        content: Update body (may be empty or None).
+        today: Date used when the text names no start date (defaults to today).
+    """
+    content = content or ""
+    text = f"{title}\n{content}"
+    keywords = _scan(text)
+
+    priority = "medium"
+    if _any_follows(text, keywords["priority"], _PRIORITY_HIGH):
+        priority = "high"
+    elif _any_follows(text, keywords["priority"], _PRIORITY_LOW):
+        priority = "low"
+
+    status = "pending"
+    if _any_follows(text, keywords["status"], _STATUS_COMPLETED):
+        status = "completed"
+    elif _any_follows(text, keywords["status"], _STATUS_IN_PROGRESS):
+        status = "in_progress"
+
+    start_date = _start_date(text, keywords["start"]) or (today or date.today()).strftime("%Y-%m-%d")
+
+    return {
+        "title": title,
+        "description": content[:500] if content else title,
+        "start_time": _first_time(text, keywords["start"]) or DEFAULT_START_TIME,
+        "end_time": _first_time(text, keywords["end"]) or DEFAULT_END_TIME,
+        "date": start_date,
+        "type": "task",
+        "priority": priority,
+        "status": status,
+    }
+
+
+def extract_events(updates: Iterable[Tuple[str, Optional[str]]], today: Optional[date] = None) -> List[Dict]:
+    """extract_event() for many (title, content) pairs."""
+    today = today or date.today()
+    return [extract_event(title, content, today) for title, content in updates]
@@ -0,0 +1,118 @@
+"""
+Streaming ingestion of multipart uploads.
+
+Upload endpoints hand their UploadFile to one of the helpers below instead of
+copying it inline. Data is read in fixed-size chunks and every disk write runs
+in the threadpool, so the event loop keeps serving other requests while a large
+video lands. Size limits and the SHA-256 checksum are enforced on the fly; a
+full file is never held in memory.
+"""
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import Optional
+import logging
+
+from fastapi import HTTPException, UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from .blob_store import BlobStore
+
+logger = logging.getLogger(__name__)
+
+CHUNK_BYTES = 1024 * 1024
+
+# Per-kind upload limits, overridable through the environment.
+MAX_DOCUMENT_BYTES = int(os.getenv("MAX_DOCUMENT_UPLOAD_BYTES", str(50 * 1024 * 1024)))
+MAX_VIDEO_BYTES = int(os.getenv("MAX_VIDEO_UPLOAD_BYTES", str(2 * 1024 * 1024 * 1024)))
+
+
+@dataclass
+class IngestedUpload:
+    """Where an upload ended up and what it contained."""
+    path: str
+    size: int
+    sha256: str
+    blob_hash: Optional[str] = None
+
+
+class _HashingFile:
+    """Plain-file counterpart of BlobWriter: hashes what it writes."""
+
+    def __init__(self, fileobj):
+        self._file = fileobj
+        self._hasher = hashlib.sha256()
+
+    def write(self, data: bytes):
+        self._hasher.update(data)
+        self._file.write(data)
+
+    @property
+    def hexdigest(self) -> str:
+        return self._hasher.hexdigest()
+
+
+async def _pump(file: UploadFile, sink, max_bytes: int, expected_sha256: Optional[str]) -> tuple:
+    """
+    Copy an upload chunk by chunk into sink, returning (size, sha256).
+
+    The sink hashes while it writes, in the threadpool, so each chunk is
+    hashed once and never on the event loop.
+    """
+    size = 0
+    while True:
+        chunk = await file.read(CHUNK_BYTES)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=f"{file.filename} exceeds the {max_bytes} byte upload limit",
+            )
+        await run_in_threadpool(sink.write, chunk)
+
+    digest = sink.hexdigest
+    if expected_sha256 and expected_sha256.lower() != digest:
+        raise HTTPException(status_code=400, detail=f"Checksum mismatch for {file.filename}")
+    return size, digest
+
+
+async def ingest_to_blob(
+    file: UploadFile,
+    blob_store: BlobStore,
+    max_bytes: int = MAX_DOCUMENT_BYTES,
+    expected_sha256: Optional[str] = None,
+) -> IngestedUpload:
+    """Stream an upload into the blob store (deduplicated by content)."""
+    writer = await run_in_threadpool(blob_store.writer)
+    try:
+        size, digest = await _pump(file, writer, max_bytes, expected_sha256)
+    except BaseException:
+        await run_in_threadpool(writer.abort)
+        raise
+    blob_hash = await run_in_threadpool(writer.commit)
+    return IngestedUpload(path=blob_store.path_for(blob_hash), size=size, sha256=digest, blob_hash=blob_hash)
+
+
+async def ingest_to_file(
+    file: UploadFile,
+    path: str,
+    max_bytes: int = MAX_DOCUMENT_BYTES,
+    expected_sha256: Optional[str] = None,
+) -> IngestedUpload:
+    """Stream an upload to a plain file; the file appears only once complete."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".part")
+    out = os.fdopen(fd, "wb")
+    try:
+        size, digest = await _pump(file, _HashingFile(out), max_bytes, expected_sha256)
+        await run_in_threadpool(out.close)
+        os.replace(tmp_path, path)
+    except BaseException:
+        out.close()
+        os.remove(tmp_path)
+        raise
+    return IngestedUpload(path=path, size=size, sha256=digest)
@@ -0,0 +1,106 @@
+"""
+Keyset pagination and field projection for list endpoints.
+
+Pages are ordered newest first by a sort key that ends in the row id, e.g.
+(due_date, id). A page is fetched with LIMIT page_size + 1; when the extra
+row exists, the key of the last returned row becomes an opaque cursor sent
+back in the X-Next-Cursor header. The next request passes it as ?cursor= and
+continues with WHERE (key) < (cursor values), which an index on the key turns
+into a seek. The cost of a page therefore doesn't depend on how far back it
+is, unlike OFFSET. Listings that used to return every row keep doing so
+until the client asks for pages with ?limit= or ?cursor= (see page_size()).
+
+?fields=a,b,c limits each item to the listed (whitelisted) fields.
+"""
+import base64
+import json
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: Sequence) -> str:
+    raw = json.dumps(list(values), default=str, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], size: int) -> Optional[list]:
+    """Values of a cursor from encode_cursor(), or None; 400 if malformed."""
+    if not cursor:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def after_cursor(key_columns: Sequence[str], cursor: Optional[str]) -> Tuple[str, list]:
+    """
+    SQL condition (with params) for rows after the cursor in descending key order.
+
+    Returns ("", []) when there is no cursor.
+    """
+    values = decode_cursor(cursor, len(key_columns))
+    if values is None:
+        return "", []
+    placeholders = ", ".join("?" * len(key_columns))
+    return f"({', '.join(key_columns)}) < ({placeholders})", values
+
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str]) -> Optional[List[str]]:
+    """Requested field names in order, or None for all fields; 400 on unknown names."""
+    if not fields:
+        return None
+    requested = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(allowed)}",
+        )
+    return requested
+
+
+def project(item: dict, fields: Optional[List[str]]) -> dict:
+    return item if fields is None else {f: item.get(f) for f in fields}
+
+
+def page_size(limit: Optional[int], cursor: Optional[str], default: int) -> Optional[int]:
+    """
+    Page size for a request, or None for an unpaged listing.
+
+    Args:
+        limit: The ?limit= parameter, if given.
+        cursor: The ?cursor= parameter, if given.
+        default: Page size when only a cursor is given.
+    """
+    if limit is None and not cursor:
+        return None
+    return limit or default
+
+
+def limit_clause(limit: Optional[int]) -> Tuple[str, list]:
+    """' LIMIT ?' (with params) fetching one extra row for paginate(); ("", []) when unpaged."""
+    if limit is None:
+        return "", []
+    return " LIMIT ?", [limit + 1]
+
+
+def paginate(rows: list, limit: Optional[int], key: Callable) -> Tuple[list, Optional[str]]:
+    """
+    Split rows fetched with LIMIT limit + 1 into the page and the next cursor.
+
+    Args:
+        rows: Query result, at most limit + 1 rows.
+        limit: Page size; None when the rows were fetched unpaged.
+        key: Returns the sort key values of a row (matching after_cursor's columns).
+    """
+    if limit is None or len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(key(rows[-1]))
@@ -0,0 +1,229 @@
+"""
+Resumable, chunked uploads (tus-style) for large screen recordings.
+
+A client creates an upload with its total size, then sends the bytes in any
+number of PATCH requests, each starting at the current offset. Every chunk is
+written with positional writes into a preallocated partial file and may carry
+a checksum; the offset only advances once a chunk is complete and verified, so
+an interrupted or corrupted chunk is simply re-sent from the last offset.
+A PATCH holds an exclusive lock on the partial file while it writes, so a
+concurrent PATCH to the same upload (from any worker) is rejected instead of
+overwriting the same bytes.
+Finalizing hands the completed file to the caller (the blob store and video
+processing) exactly once.
+"""
+import asyncio
+import base64
+import hashlib
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, Optional
+import logging
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process deployments only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROOT = "backend/uploads/partial"
+
+# Bytes gathered from the request body before each positional write.
+WRITE_BYTES = 1024 * 1024
+
+# tus uses 460 for a chunk whose checksum does not match.
+CHECKSUM_MISMATCH = 460
+
+
+def _pwrite_all(fd: int, data: bytes, position: int):
+    view = memoryview(data)
+    while view:
+        written = os.pwrite(fd, view, position)
+        view = view[written:]
+        position += written
+
+
+class ResumableUploadService:
+    """Tracks resumable uploads in the resumable_uploads table and writes their chunks."""
+
+    def __init__(self, db, root: str = DEFAULT_ROOT):
+        self.db = db
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def create(self, user_id: int, session_date, filename: str, total_size: int,
+               interval_seconds: int = 30) -> Dict:
+        """Register a new upload and allocate its partial file."""
+        upload_id = uuid.uuid4().hex
+        partial_path = os.path.join(self.root, upload_id)
+        with open(partial_path, "wb") as f:
+            f.truncate(total_size)
+
+        self.db.writer.execute("""
+            INSERT INTO resumable_uploads
+            (id, user_id, session_date, filename, total_size, interval_seconds, partial_path)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (upload_id, user_id, session_date, filename, total_size, interval_seconds, partial_path)).result()
+        return self.get(upload_id, user_id)
+
+    def get(self, upload_id: str, user_id: int) -> Dict:
+        """Return an upload owned by the user, or raise 404."""
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT * FROM resumable_uploads WHERE id = ? AND user_id = ?", (upload_id, user_id)
+        )
+        row = cursor.fetchone()
+        conn.close()
+        if not row:
+            raise HTTPException(status_code=404, detail="Upload not found")
+        return dict(row)
+
+    async def append(self, upload_id: str, user_id: int, offset: int,
+                     body: AsyncIterator[bytes], checksum: Optional[str] = None) -> int:
+        """
+        Write one chunk starting at offset and return the new offset.
+
+        :param checksum: Optional tus-style 'sha256 <base64 digest>' of the chunk
+        """
+        upload = self.get(upload_id, user_id)
+        self._check_offset(upload, offset)
+
+        expected_digest = None
+        if checksum:
+            algorithm, _, encoded = checksum.partition(" ")
+            if algorithm.lower() != "sha256" or not encoded:
+                raise HTTPException(status_code=400, detail="Only 'sha256 <base64>' checksums are supported")
+            expected_digest = encoded.strip()
+
+        hasher = hashlib.sha256()
+        position = offset
+        pending = []
+        pending_size = 0
+        fd = os.open(upload["partial_path"], os.O_WRONLY)
+        try:
+            self._lock_partial(fd)
+            # Another PATCH may have advanced the offset before the lock was taken
+            self._check_offset(self.get(upload_id, user_id), offset)
+            async for data in body:
+                if position + pending_size + len(data) > upload["total_size"]:
+                    raise HTTPException(status_code=413, detail="Chunk runs past the declared upload size")
+                hasher.update(data)
+                pending.append(data)
+                pending_size += len(data)
+                if pending_size >= WRITE_BYTES:
+                    await run_in_threadpool(_pwrite_all, fd, b"".join(pending), position)
+                    position += pending_size
+                    pending, pending_size = [], 0
+            if pending:
+                await run_in_threadpool(_pwrite_all, fd, b"".join(pending), position)
+                position += pending_size
+
+            if expected_digest and base64.b64encode(hasher.digest()).decode() != expected_digest:
+                # The bytes stay in the file but the offset does not move; a retry overwrites them.
+                raise HTTPException(status_code=CHECKSUM_MISMATCH, detail="Chunk checksum mismatch")
+
+            advanced = await asyncio.wrap_future(self.db.writer.execute("""
+                UPDATE resumable_uploads
+                SET upload_offset = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND upload_offset = ? AND status = 'uploading'
+            """, (position, upload_id, offset)))
+        finally:
+            os.close(fd)  # also releases the lock, once the offset has moved
+        if not advanced:
+            raise HTTPException(status_code=409, detail="Upload changed concurrently; query the offset and retry")
+        return position
+
+    @staticmethod
+    def _check_offset(upload: Dict, offset: int):
+        if upload["status"] != "uploading":
+            raise HTTPException(status_code=409, detail="Upload is already finalized")
+        if offset != upload["upload_offset"]:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Offset mismatch: upload is at {upload['upload_offset']}",
+            )
+
+    @staticmethod
+    def _lock_partial(fd: int):
+        """Take the upload's write lock (held until fd is closed), or raise 409 if another PATCH has it."""
+        if fcntl is None:
+            return
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            raise HTTPException(status_code=409, detail="Another PATCH is writing to this upload; retry")
+
+    def claim_for_finalize(self, upload_id: str, user_id: int) -> Optional[Dict]:
+        """
+        Mark a complete upload as finalizing so only one request processes it.
+
+        Returns the upload, or None when it was already finalized.
+        """
+        upload = self.get(upload_id, user_id)
+        if upload["status"] == "finalized":
+            return None
+
+        claimed = self.db.writer.execute("""
+            UPDATE resumable_uploads
+            SET status = 'finalizing', updated_at = CURRENT_TIMESTAMP
+            WHERE id = ? AND status = 'uploading' AND upload_offset = total_size
+        """, (upload_id,)).result()
+        if not claimed:
+            current = self.get(upload_id, user_id)
+            if current["status"] == "finalized":
+                return None
+            raise HTTPException(
+                status_code=409,
+                detail=f"Upload incomplete or being finalized ({current['upload_offset']}/{current['total_size']} bytes)",
+            )
+        return upload
+
+    def mark_finalized(self, upload_id: str, video_id: int):
+        self.db.writer.execute("""
+            UPDATE resumable_uploads
+            SET status = 'finalized', video_id = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        """, (video_id, upload_id)).result()
+
+    def remove_partial(self, upload: Dict):
+        """Delete the partial file of a finalized upload."""
+        try:
+            os.remove(upload["partial_path"])
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Could not remove partial file of upload {upload['id']}: {e}")
+
+    def release_claim(self, upload_id: str):
+        """Undo claim_for_finalize after a failed finalize so the client can retry."""
+        self.db.writer.execute(
+            "UPDATE resumable_uploads SET status = 'uploading' WHERE id = ? AND status = 'finalizing'",
+            (upload_id,),
+        ).result()
+
+    def cleanup_stale(self, max_age: timedelta = timedelta(days=1)) -> int:
+        """Drop unfinished uploads untouched for max_age, with their partial files (not while finalizing)."""
+        cutoff = (datetime.utcnow() - max_age).strftime("%Y-%m-%d %H:%M:%S")
+
+        def delete_stale(cursor):
+            cursor.execute(
+                "SELECT id, partial_path FROM resumable_uploads WHERE status = 'uploading' AND updated_at < ?",
+                (cutoff,),
+            )
+            rows = cursor.fetchall()
+            cursor.execute(
+                "DELETE FROM resumable_uploads WHERE status = 'uploading' AND updated_at < ?", (cutoff,)
+            )
+            return [row["partial_path"] for row in rows]
+
+        removed = self.db.writer.submit(delete_stale).result()
+        for partial_path in removed:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+        return len(removed)
@@ -0,0 +1,222 @@
+"""
+Runs the screenshot schedules stored in the screenshot_schedules table.
+
+The table is the source of truth. sync() loads every active schedule into a
+ScheduledScreenshotCapture and stops the ones no longer active there. It runs
+at startup, after the start/stop endpoints, and periodically, so schedules
+changed by another worker process are picked up too. Calls are serialized,
+since the endpoints (in the threadpool) and the periodic task run it
+concurrently. Each capture is stored
+as a 'scheduled' screenshot, and the schedule's captures_taken and
+last_capture_at are updated in the same transaction. A schedule whose
+duration has passed is marked completed.
+
+After a restart, a schedule continues one interval after its last capture,
+or immediately if that time has passed while the server was down. It still
+ends at started_at + duration.
+
+Only one process runs captures: the one holding an exclusive lock on
+<database>.screenshot-scheduler.lock. With several API workers, the others
+only write rows.
+"""
+import asyncio
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Optional
+import logging
+
+from Nexa.services.screenshot_scheduler import ScheduledScreenshotCapture
+
+from .blob_store import BlobStore
+from .workers import OCR_TIMEOUT, capture_screen, run_in_worker
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process deployments only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+SCREENSHOT_DIR = "backend/uploads/screenshots"
+# How often the owning process re-reads the table
+SCHEDULE_SYNC_INTERVAL = float(os.getenv("SCREENSHOT_SCHEDULE_SYNC_SECONDS", "10"))
+
+
+def capture_to_file(path: str) -> str:
+    """Capture the screen in the worker pool, save it at path and return its OCR text."""
+    result = asyncio.run(run_in_worker(capture_screen, timeout=OCR_TIMEOUT))
+    if 'error' in result:
+        raise RuntimeError(result['error'])
+    if result.get('image_path'):
+        shutil.move(result['image_path'], path)
+    return result.get('text', '')
+
+
+def to_timestamp(seconds: float) -> str:
+    """Clock seconds as a SQLite CURRENT_TIMESTAMP-style UTC string."""
+    return datetime.fromtimestamp(seconds, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def from_timestamp(value: str) -> float:
+    return datetime.fromisoformat(value).replace(tzinfo=timezone.utc).timestamp()
+
+
+class ScreenshotScheduleService:
+    """Drives the screenshot_schedules rows of one database."""
+
+    def __init__(
+        self,
+        db,
+        capture: Callable[[str], str] = capture_to_file,
+        clock: Callable[[], float] = time.time,
+        blob_store: Optional[BlobStore] = None,
+        output_dir: str = SCREENSHOT_DIR,
+        run_thread: bool = True,
+    ):
+        """
+        Args:
+            db: Database holding the schedules.
+            capture: Takes a screenshot into the given path and returns its text.
+            clock: Wall-clock time in seconds (schedule times are persisted).
+            blob_store: Where captured images go (default: BlobStore(db)).
+            output_dir: Directory captures are written to before moving into the blob store.
+            run_thread: Run the scheduler thread; False leaves dispatching to run_due().
+        """
+        self.db = db
+        self.capture = capture
+        self.clock = clock
+        self.blob_store = blob_store or BlobStore(db)
+        self.output_dir = output_dir
+        self.run_thread = run_thread
+        self._scheduler: Optional[ScheduledScreenshotCapture] = None
+        self._lock_file = None
+        # Serializes start(), sync() and shutdown(); reentrant as start() calls sync()
+        self._sync_lock = threading.RLock()
+
+    @property
+    def running(self) -> bool:
+        return self._scheduler is not None
+
+    def start(self) -> bool:
+        """Take ownership of the schedules and resume them; False if another process owns them."""
+        with self._sync_lock:
+            if self._scheduler is not None:
+                return True
+            if not self._acquire_lock():
+                logger.info("Screenshot schedules are run by another process")
+                return False
+            self._scheduler = ScheduledScreenshotCapture(
+                self.capture,
+                storage_callback=self._store_capture,
+                completion_callback=self._complete,
+                clock=self.clock,
+                start=self.run_thread,
+            )
+            self.sync()
+            return True
+
+    def sync(self):
+        """Start active schedules that aren't running yet, stop those no longer active."""
+        with self._sync_lock:
+            if self._scheduler is None:
+                return
+            conn = self.db.get_connection()
+            rows = conn.execute("""
+                SELECT id, interval_minutes, duration_minutes, started_at, last_capture_at
+                FROM screenshot_schedules
+                WHERE status = 'active'
+            """).fetchall()
+            conn.close()
+
+            now = self.clock()
+            active = set()
+            for row in rows:
+                ends_at = from_timestamp(row['started_at']) + row['duration_minutes'] * 60
+                if ends_at <= now:
+                    self._complete(row['id'])
+                    continue
+                active.add(row['id'])
+                if self._scheduler.is_session_active(row['id']):
+                    continue
+                if row['last_capture_at']:
+                    next_capture = from_timestamp(row['last_capture_at']) + row['interval_minutes'] * 60
+                else:
+                    next_capture = from_timestamp(row['started_at'])
+                self._scheduler.start_session(
+                    row['id'], self.output_dir, row['interval_minutes'],
+                    first_capture_at=max(next_capture, now), ends_at=ends_at,
+                )
+            for schedule_id in self._scheduler.get_active_sessions():
+                if schedule_id not in active:
+                    self._scheduler.stop_session(schedule_id)
+
+    def run_due(self) -> int:
+        """Dispatch due captures now (for run_thread=False)."""
+        return self._scheduler.run_due() if self._scheduler else 0
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        return self._scheduler.wait_idle(timeout) if self._scheduler else True
+
+    def shutdown(self):
+        """Stop capturing (schedules stay active in the table) and release ownership."""
+        with self._sync_lock:
+            if self._scheduler is not None:
+                self._scheduler.shutdown()
+                self._scheduler = None
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None
+
+    def _acquire_lock(self) -> bool:
+        if fcntl is None:
+            return True
+        lock_file = open(f"{self.db.db_path}.screenshot-scheduler.lock", "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def _store_capture(self, schedule_id: int, image_path: str, extracted_text: str):
+        """Storage callback: save the screenshot row and the schedule's progress."""
+        blob_hash = None
+        if os.path.exists(image_path):
+            blob_hash = self.blob_store.put_file(image_path, move=True)
+            image_path = self.blob_store.path_for(blob_hash)
+        captured_at = to_timestamp(self.clock())
+
+        def store(cursor):
+            cursor.execute("SELECT session_id FROM screenshot_schedules WHERE id = ?", (schedule_id,))
+            row = cursor.fetchone()
+            if not row:
+                return
+            cursor.execute("""
+                INSERT INTO screenshots (session_id, file_path, blob_hash, extracted_text, capture_mode, captured_at)
+                VALUES (?, ?, ?, ?, 'scheduled', ?)
+            """, (row['session_id'], image_path, blob_hash, extracted_text or '', captured_at))
+            if blob_hash:
+                self.blob_store.add_ref(cursor, blob_hash)
+            cursor.execute("""
+                UPDATE screenshot_schedules
+                SET captures_taken = COALESCE(captures_taken, 0) + 1, last_capture_at = ?
+                WHERE id = ?
+            """, (captured_at, schedule_id))
+
+        self.db.writer.submit(store).result()
+
+    def _complete(self, schedule_id: int):
+        """Mark a schedule whose duration has passed as completed."""
+        def complete(cursor):
+            cursor.execute("""
+                UPDATE screenshot_schedules
+                SET status = 'completed', stopped_at = ?
+                WHERE id = ? AND status = 'active'
+            """, (to_timestamp(self.clock()), schedule_id))
+
+        self.db.writer.submit(complete).result()
+        logger.info(f"Screenshot schedule {schedule_id} completed")
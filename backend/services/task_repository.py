@@ -0,0 +1,103 @@
+"""
+Bulk task writes.
+
+A TaskRepository wraps the cursor of one transaction (typically a write-queue
+operation). insert_many() stores any number of tasks with multi-row
+INSERT ... RETURNING id statements instead of one execute per task, optionally
+as upserts on a unique key. The lookups every generated task needs (today's
+session, the default project) are answered once per repository rather than
+once per task.
+"""
+import sqlite3
+from typing import Dict, List, Optional, Sequence
+
+# Bound parameters per statement (SQLITE_MAX_VARIABLE_NUMBER)
+MAX_VARIABLES = 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999
+
+_UNSET = object()
+
+
+class TaskRepository:
+    """Task inserts and their supporting lookups for one transaction."""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self._today_sessions: Dict[int, int] = {}
+        self._default_project = _UNSET
+
+    def today_session_id(self, user_id: int) -> int:
+        """Id of the user's session for today, created if missing."""
+        if user_id not in self._today_sessions:
+            self.cursor.execute("""
+                INSERT INTO daily_sessions (user_id, date, status)
+                VALUES (?, date('now'), 'in_progress')
+                ON CONFLICT(user_id, date) DO NOTHING
+            """, (user_id,))
+            self.cursor.execute(
+                "SELECT id FROM daily_sessions WHERE user_id = ? AND date = date('now')", (user_id,)
+            )
+            self._today_sessions[user_id] = self.cursor.fetchone()[0]
+        return self._today_sessions[user_id]
+
+    def default_project_id(self) -> Optional[str]:
+        """Id of the first project (as stored in tasks.project_id), or None."""
+        if self._default_project is _UNSET:
+            self.cursor.execute("SELECT id FROM projects LIMIT 1")
+            row = self.cursor.fetchone()
+            self._default_project = str(row[0]) if row else None
+        return self._default_project
+
+    def insert_many(
+        self,
+        tasks: Sequence[Dict],
+        conflict_key: Sequence[str] = (),
+        update_columns: Optional[Sequence[str]] = None,
+    ) -> List[int]:
+        """
+        Insert tasks and return their ids in the same order.
+
+        Every dict must have the same keys (task column names); columns left
+        out keep their defaults.
+
+        Args:
+            tasks: Rows to insert.
+            conflict_key: Columns of a unique index. When given, a row whose key
+                already exists updates that task instead (an upsert).
+            update_columns: Columns an upsert overwrites (default: every given
+                column except the key and created_at).
+        """
+        if not tasks:
+            return []
+        columns = list(tasks[0])
+        per_statement = max(1, MAX_VARIABLES // len(columns))
+        placeholders = "(" + ", ".join("?" * len(columns)) + ")"
+
+        upsert = ""
+        if conflict_key:
+            if update_columns is None:
+                update_columns = [c for c in columns if c not in conflict_key and c != "created_at"]
+            upsert = (
+                f" ON CONFLICT({', '.join(conflict_key)}) DO UPDATE SET "
+                + ", ".join(f"{c} = excluded.{c}" for c in update_columns)
+            )
+
+        ids = []
+        for start in range(0, len(tasks), per_statement):
+            chunk = tasks[start:start + per_statement]
+            self.cursor.execute(
+                f"INSERT INTO tasks ({', '.join(columns)}) VALUES "
+                + ", ".join([placeholders] * len(chunk))
+                + upsert
+                + f" RETURNING {', '.join(['id', *conflict_key])}",
+                [task[column] for task in chunk for column in columns],
+            )
+            rows = self.cursor.fetchall()
+            if conflict_key:
+                # Updated rows keep their old ids; match them up by key.
+                by_key = {tuple(row[1:]): row[0] for row in rows}
+                ids.extend(by_key[tuple(task[c] for c in conflict_key)] for task in chunk)
+            else:
+                # RETURNING order is unspecified, but AUTOINCREMENT ids of one
+                # statement increase in row order.
+                ids.extend(sorted(row[0] for row in rows))
+        return ids
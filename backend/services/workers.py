@@ -0,0 +1,222 @@
+"""
+Process pool for CPU-bound work (document extraction, OCR, video frames,
+chart rendering).
+
+Request handlers await run_in_worker() instead of calling PyMuPDF,
+python-docx or easyocr inline, so the event loop only does I/O. The pool is
+a set of single-process executors, each running one task at a time. A task's
+timeout starts once it has a warm process of its own, so time spent waiting
+for a free process or spawning one is not counted. A task still running when
+its timeout expires is stopped by killing its process alone; the other
+processes and their tasks are not affected, and the killed one is replaced
+on demand. Task functions live at module level so they can be pickled, and
+keep their heavy objects (UnifiedService, OCR models) cached per worker
+process.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", str(os.cpu_count() or 2)))
+
+# Default per-task timeouts in seconds
+EXTRACTION_TIMEOUT = float(os.getenv("EXTRACTION_TIMEOUT_SECONDS", "120"))
+OCR_TIMEOUT = float(os.getenv("OCR_TIMEOUT_SECONDS", "60"))
+VIDEO_TIMEOUT = float(os.getenv("VIDEO_TIMEOUT_SECONDS", "3600"))
+RENDER_TIMEOUT = float(os.getenv("RENDER_TIMEOUT_SECONDS", "30"))
+
+_pool: Optional["WorkerPool"] = None
+_pool_lock = threading.Lock()
+
+
+class WorkerTimeout(TimeoutError):
+    """A worker task ran past its timeout and was stopped."""
+
+
+class _Worker:
+    """One worker process, killed and replaced as a whole when its task times out."""
+
+    def __init__(self):
+        # spawn: forking a threaded server process is not safe
+        self.executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+
+    def kill(self):
+        # ProcessPoolExecutor cannot stop a running task; terminating its
+        # (only) process is the way.
+        for process in list((self.executor._processes or {}).values()):
+            process.terminate()
+        self.close()
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class WorkerPool:
+    """Up to size worker processes, each lent to one task at a time."""
+
+    def __init__(self, size: int):
+        self.size = max(1, size)
+        self._lock = threading.Lock()
+        self._idle = []
+        self._started = 0
+        self._waiters = deque()
+        self._closed = False
+
+    async def checkout(self) -> _Worker:
+        """Wait for a free worker, starting one if the pool is not full yet."""
+        waiter = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Worker pool is shut down")
+            if self._idle:
+                waiter.set_result(self._idle.pop())
+            elif self._started < self.size:
+                self._started += 1
+                waiter.set_result(None)
+            else:
+                self._waiters.append(waiter)
+        try:
+            worker = await asyncio.wrap_future(waiter)
+        except asyncio.CancelledError:
+            # Handed over just as we were cancelled: give it back.
+            if waiter.done() and not waiter.cancelled():
+                self.checkin(waiter.result())
+            raise
+        if worker is None:
+            # A new process; start it before the caller's timeout begins.
+            worker = _Worker()
+            try:
+                await asyncio.wrap_future(worker.executor.submit(os.getpid))
+            except BaseException:
+                worker.kill()
+                self.checkin(None)
+                raise
+        return worker
+
+    def checkin(self, worker: Optional[_Worker]):
+        """Return a worker; None means it was killed and may be replaced."""
+        with self._lock:
+            if not self._closed:
+                while self._waiters:
+                    waiter = self._waiters.popleft()
+                    if waiter.set_running_or_notify_cancel():
+                        waiter.set_result(worker)
+                        return
+                if worker is None:
+                    self._started -= 1
+                else:
+                    self._idle.append(worker)
+                return
+        if worker is not None:
+            worker.close()
+
+    def shutdown(self):
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            waiters, self._waiters = self._waiters, deque()
+        for worker in idle:
+            worker.close()
+        for waiter in waiters:
+            if waiter.set_running_or_notify_cancel():
+                waiter.set_exception(RuntimeError("Worker pool is shut down"))
+
+
+def get_pool() -> WorkerPool:
+    """Return the shared pool, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WorkerPool(WORKER_PROCESSES)
+        return _pool
+
+
+def shutdown_workers():
+    """Stop the pool; called on application shutdown."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
+
+
+async def run_in_worker(fn: Callable, *args, timeout: Optional[float] = EXTRACTION_TIMEOUT, **kwargs) -> Any:
+    """
+    Run fn(*args, **kwargs) in a worker process and await its result.
+
+    Raises WorkerTimeout when the task runs longer than timeout seconds,
+    counted from when it starts. Cancelling the awaiting coroutine before
+    then drops the task; a task already running finishes in the background.
+    """
+    pool = get_pool()
+    worker = await pool.checkout()
+    future = worker.executor.submit(fn, *args, **kwargs)
+
+    returned = threading.Lock()  # the worker goes back to the pool once
+
+    def release(done: Future):
+        # The worker is free again once its task is done, also if the caller
+        # stopped waiting for it; a crashed process is replaced.
+        if returned.acquire(blocking=False):
+            if not done.cancelled() and isinstance(done.exception(), BrokenProcessPool):
+                worker.kill()
+                pool.checkin(None)
+            else:
+                pool.checkin(worker)
+
+    future.add_done_callback(release)
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+    except asyncio.TimeoutError:
+        if returned.acquire(blocking=False):
+            logger.warning(f"{fn.__name__} exceeded {timeout}s; replacing its worker process")
+            worker.kill()
+            pool.checkin(None)
+        raise WorkerTimeout(f"{fn.__name__} did not finish within {timeout} seconds")
+
+
+# ============= Task functions (run inside worker processes) =============
+
+_unified_service = None
+_video_processor = None
+
+
+def _get_unified_service():
+    global _unified_service
+    if _unified_service is None:
+        from Nexa.services.services import UnifiedService
+        _unified_service = UnifiedService()
+    return _unified_service
+
+
+def extract_text(file_path: str, max_chars: Optional[int] = None, file_type: Optional[str] = None) -> str:
+    """Extract document text via UnifiedService (uses its extraction cache)."""
+    return _get_unified_service().extract_from_file(file_path, max_chars=max_chars, file_type=file_type)
+
+
+def capture_screen() -> dict:
+    """Capture a screenshot and OCR it."""
+    return _get_unified_service().capture_and_process_screen(store=False)
+
+
+def process_video(video_path: str, output_dir: str, interval_seconds: int) -> dict:
+    """Extract frames from a video and OCR them."""
+    global _video_processor
+    if _video_processor is None:
+        from backend.services.video_processor import VideoProcessor
+        _video_processor = VideoProcessor()
+    return _video_processor.process_video_with_ocr(video_path, output_dir, interval_seconds, store=True)
+
+
+def render_timeline_chart(milestones: list, output_path: str, project_name: str, today=None) -> Optional[str]:
+    """Draw the milestone Gantt chart (matplotlib stays loaded in the worker)."""
+    from Nexa.services.timeline_renderer import render_timeline
+    return render_timeline(milestones, output_path, project_name, today)
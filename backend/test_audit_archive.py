@@ -0,0 +1,54 @@
+"""Tests for monthly audit log partitioning."""
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.services.audit_archive import AuditLogArchive
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from backend.models.database import Database
+    return Database(str(tmp_path / "audit.db"))
+
+
+def _insert(db, rows):
+    conn = db.get_connection()
+    conn.executemany(
+        "INSERT INTO audit_logs (user_id, action, details, created_at) VALUES (?, ?, ?, ?)", rows
+    )
+    conn.commit()
+    conn.close()
+
+
+def test_rotate_query_and_retention(db):
+    _insert(db, [
+        (1, "USER_LOGIN", "old", "2023-12-31 23:59:59"),
+        (1, "TASK_UPDATED", "jan", "2024-01-15 10:00:00"),
+        (2, "USER_LOGIN", "feb", "2024-02-01 00:00:00"),
+        (1, "USER_LOGIN", "mar", "2024-03-05 08:00:00"),
+    ])
+    archive = AuditLogArchive(db, retention_months=2)
+
+    assert archive.rotate(datetime(2024, 3, 10)) == 3
+    assert [t for _, _, t in archive.partitions()] == [
+        "audit_logs_2023_12", "audit_logs_2024_01", "audit_logs_2024_02"
+    ]
+    conn = db.get_connection()
+    assert conn.execute("SELECT COUNT(*) FROM audit_logs").fetchone()[0] == 1
+    conn.close()
+
+    logins = archive.query(user_id=1, action="USER_LOGIN")
+    assert [row["details"] for row in logins] == ["mar", "old"]
+    in_range = archive.query(start=datetime(2024, 1, 1), end=datetime(2024, 2, 2))
+    assert [row["details"] for row in in_range] == ["feb", "jan"]
+
+    assert archive.apply_retention(datetime(2024, 3, 10)) == ["audit_logs_2023_12"]
+    assert [row["details"] for row in archive.query()] == ["mar", "feb", "jan"]
+    # Nothing left to move
+    assert archive.rotate(datetime(2024, 3, 10)) == 0
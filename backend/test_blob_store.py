@@ -0,0 +1,96 @@
+"""
+Tests for the content-addressed upload blob store.
+"""
+import io
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.models.writer import DatabaseWriter
+from backend.services.blob_store import BlobStore, REFERENCING_TABLES
+
+
+class TempDatabase:
+    """Just the tables the blob store touches (and a write queue), in a throwaway SQLite file."""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        conn = self.get_connection()
+        conn.execute("""
+            CREATE TABLE blobs (
+                hash TEXT PRIMARY KEY, size INTEGER NOT NULL, ref_count INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL, last_written_at REAL NOT NULL
+            )
+        """)
+        for table in REFERENCING_TABLES:
+            conn.execute(f"CREATE TABLE {table} (id INTEGER PRIMARY KEY, blob_hash TEXT)")
+        conn.commit()
+        conn.close()
+        self.writer = DatabaseWriter(self.get_connection)
+
+    def get_connection(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+
+def _reference(db, store, table, blob_hash):
+    conn = db.get_connection()
+    cursor = conn.cursor()
+    cursor.execute(f"INSERT INTO {table} (blob_hash) VALUES (?)", (blob_hash,))
+    store.add_ref(cursor, blob_hash)
+    conn.commit()
+    conn.close()
+
+
+def test_duplicates_are_stored_once(tmp_path):
+    db = TempDatabase(str(tmp_path / "test.db"))
+    store = BlobStore(db, root=str(tmp_path / "blobs"))
+
+    first = store.put_stream(io.BytesIO(b"same bytes"))
+    second = store.put_stream(io.BytesIO(b"same bytes"))
+    _reference(db, store, "transcripts", first)
+    _reference(db, store, "uploaded_files", second)
+
+    assert first == second
+    with open(store.path_for(first), "rb") as f:
+        assert f.read() == b"same bytes"
+    conn = db.get_connection()
+    assert conn.execute("SELECT ref_count FROM blobs").fetchall()[0][0] == 2
+    conn.close()
+    assert os.listdir(store.tmp_dir) == []
+
+
+def test_garbage_collection_removes_unreferenced_blobs(tmp_path):
+    db = TempDatabase(str(tmp_path / "test.db"))
+    store = BlobStore(db, root=str(tmp_path / "blobs"))
+
+    kept = store.put_stream(io.BytesIO(b"kept"))
+    orphan = store.put_stream(io.BytesIO(b"orphan"))
+    _reference(db, store, "videos", kept)
+
+    assert store.collect_garbage(grace_seconds=3600) == {"blobs": 0, "bytes": 0}
+    assert store.collect_garbage(grace_seconds=-1) == {"blobs": 1, "bytes": len(b"orphan")}
+    assert os.path.exists(store.path_for(kept))
+    assert not os.path.exists(store.path_for(orphan))
+
+
+def test_deleting_a_row_releases_its_blob(tmp_path):
+    db = TempDatabase(str(tmp_path / "test.db"))
+    store = BlobStore(db, root=str(tmp_path / "blobs"))
+    blob_hash = store.put_stream(io.BytesIO(b"shot"))
+    _reference(db, store, "screenshots", blob_hash)
+
+    conn = db.get_connection()
+    cursor = conn.cursor()
+    row_id = cursor.execute("SELECT id FROM screenshots").fetchone()[0]
+    assert store.delete_row(cursor, "screenshots", row_id)
+    assert not store.delete_row(cursor, "screenshots", row_id)
+    conn.commit()
+    assert conn.execute("SELECT ref_count FROM blobs").fetchone()[0] == 0
+    conn.close()
+
+    assert store.collect_garbage(grace_seconds=-1)["blobs"] == 1
+    assert not os.path.exists(store.path_for(blob_hash))
@@ -0,0 +1,90 @@
+import os
+import sys
+
+import pytest
+from fastapi import Request
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.services.chart_images import image_response, make_thumbnail, parse_range, thumbnail_path
+
+
+@pytest.fixture
+def chart(tmp_path):
+    from PIL import Image
+    path = tmp_path / "timeline_1.png"
+    Image.new("RGB", (1600, 900), "white").save(path)
+    return str(path)
+
+
+def get(path, **headers):
+    """image_response() for a GET with the given request headers."""
+    scope = {
+        "type": "http", "method": "GET", "path": "/image", "query_string": b"",
+        "headers": [(k.replace("_", "-").lower().encode(), v.encode()) for k, v in headers.items()],
+    }
+    return image_response(Request(scope), path)
+
+
+def test_parse_range():
+    assert parse_range("bytes=0-99", 1000) == (0, 99)
+    assert parse_range("bytes=900-", 1000) == (900, 999)
+    assert parse_range("bytes=-100", 1000) == (900, 999)
+    assert parse_range("bytes=500-5000", 1000) == (500, 999)
+    assert parse_range("bytes=0-1,5-6", 1000) is None
+    assert parse_range("items=0-1", 1000) is None
+    with pytest.raises(ValueError):
+        parse_range("bytes=1000-", 1000)
+
+
+def test_conditional_and_range_requests(chart):
+    content = open(chart, "rb").read()
+    full = get(chart)
+    assert full.status_code == 200
+    assert "immutable" in full.headers["cache-control"]
+    assert full.headers["accept-ranges"] == "bytes"
+
+    etag = full.headers["etag"]
+    assert get(chart, if_none_match=etag).status_code == 304
+    assert get(chart, if_modified_since=full.headers["last-modified"]).status_code == 304
+
+    partial = get(chart, range="bytes=10-19")
+    assert partial.status_code == 206
+    assert partial.body == content[10:20]
+    assert partial.headers["content-range"] == f"bytes 10-19/{len(content)}"
+
+    assert get(chart, range="bytes=10-19", if_range='"other"').status_code == 200
+    assert get(chart, range=f"bytes={len(content)}-").status_code == 416
+
+
+def test_make_thumbnail(chart):
+    from PIL import Image
+    path = make_thumbnail(chart, (480, 270))
+    assert path == thumbnail_path(chart)
+    with Image.open(path) as thumbnail:
+        assert thumbnail.size == (480, 270)
+
+
+def test_signed_urls(monkeypatch):
+    from urllib.parse import parse_qs, urlsplit
+    from backend.services import chart_images
+
+    monkeypatch.setenv("CHART_URL_SECRET", "test-secret")
+    chart_images._url_secret.cache_clear()
+    try:
+        url = chart_images.chart_image_url(7, 3)
+        parts = urlsplit(url)
+        assert parts.path == "/api/team-leader/timeline/charts/7/image"
+        query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        expires, signature = int(query["expires"]), query["signature"]
+        assert query["user"] == "3"
+        # Stable within a window, so the browser cache keeps working
+        assert chart_images.chart_image_url(7, 3) == url
+
+        assert chart_images.verify_signature(7, "image", 3, expires, signature)
+        assert not chart_images.verify_signature(7, "thumbnail", 3, expires, signature)
+        assert not chart_images.verify_signature(8, "image", 3, expires, signature)
+        assert not chart_images.verify_signature(7, "image", 4, expires, signature)
+        assert not chart_images.verify_signature(7, "image", 3, expires, signature, now=expires + 1)
+    finally:
+        chart_images._url_secret.cache_clear()
@@ -0,0 +1,132 @@
+"""Tests for the single-writer group-commit queue."""
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.models.writer import DatabaseWriter
+
+
+@pytest.fixture
+def writer(tmp_path):
+    path = str(tmp_path / "writer.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT UNIQUE)")
+    conn.close()
+
+    commits = []
+    def connect():
+        conn = sqlite3.connect(path)
+        conn.set_trace_callback(lambda sql: sql == "COMMIT" and commits.append(sql))
+        return conn
+
+    w = DatabaseWriter(connect, batch_window=0.05)
+    w.path, w.commits = path, commits
+    yield w
+    w.close()
+
+
+def test_concurrent_writes_are_group_committed(writer):
+    with ThreadPoolExecutor(max_workers=20) as pool:
+        ids = list(pool.map(
+            lambda i: writer.execute("INSERT INTO items (name) VALUES (?)", (f"item{i}",)).result(),
+            range(100),
+        ))
+
+    assert sorted(ids) == list(range(1, 101))
+    assert len(writer.commits) < 100
+    conn = sqlite3.connect(writer.path)
+    assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 100
+
+
+def test_failing_operation_does_not_affect_its_batch(writer):
+    gate = threading.Event()
+    # Hold the writer so the next three operations land in one batch
+    blocker = writer.submit(lambda cursor: gate.wait())
+    ok = writer.execute("INSERT INTO items (name) VALUES ('a')")
+
+    def half_done(cursor):
+        cursor.execute("INSERT INTO items (name) VALUES ('b')")
+        cursor.execute("INSERT INTO items (name) VALUES ('a')")  # duplicate
+
+    bad = writer.submit(half_done)
+    ok2 = writer.execute("INSERT INTO items (name) VALUES ('c')")
+    gate.set()
+
+    blocker.result()
+    assert ok.result() and ok2.result()
+    with pytest.raises(sqlite3.IntegrityError):
+        bad.result()
+    conn = sqlite3.connect(writer.path)
+    assert [r[0] for r in conn.execute("SELECT name FROM items ORDER BY name")] == ["a", "c"]
+
+
+def test_close_flushes_queued_writes(writer):
+    futures = [writer.execute("INSERT INTO items (name) VALUES (?)", (str(i),)) for i in range(10)]
+    writer.close()
+    assert all(f.done() for f in futures)
+    conn = sqlite3.connect(writer.path)
+    assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 10
+
+
+def test_audit_events_are_batched_and_flushed_on_close(writer):
+    from backend.models.audit import AuditBuffer
+
+    conn = sqlite3.connect(writer.path)
+    conn.execute("""
+        CREATE TABLE audit_logs (id INTEGER PRIMARY KEY, user_id INTEGER, action TEXT, resource_type TEXT,
+                                 resource_id INTEGER, details TEXT, ip_address TEXT, created_at TIMESTAMP)
+    """)
+    conn.commit()
+
+    buffer = AuditBuffer(lambda: writer, flush_size=10, flush_interval=60)
+    for i in range(25):
+        buffer.add(1, "TASK_UPDATED", "tasks", i)
+    # Two size-triggered flushes so far; the last 5 events wait for the timer or close()
+    buffer.flush_size = 1000
+    buffer.close()
+
+    assert conn.execute("SELECT COUNT(*) FROM audit_logs").fetchone()[0] == 25
+    assert len(writer.commits) <= 3
+
+
+def test_connect_failure_fails_submitted_writes():
+    def connect():
+        raise sqlite3.OperationalError("unable to open database file")
+
+    writer = DatabaseWriter(connect)
+    first = writer.execute("INSERT INTO items (name) VALUES ('a')")
+    with pytest.raises(sqlite3.OperationalError):
+        first.result(timeout=5)
+    # Submitted after the writer thread gave up
+    with pytest.raises(sqlite3.OperationalError):
+        writer.execute("INSERT INTO items (name) VALUES ('b')").result(timeout=5)
+    writer.close(timeout=5)
+
+
+def test_audit_events_added_after_close_are_still_flushed(writer):
+    from backend.models.audit import AuditBuffer
+
+    conn = sqlite3.connect(writer.path)
+    conn.execute("""
+        CREATE TABLE audit_logs (id INTEGER PRIMARY KEY, user_id INTEGER, action TEXT, resource_type TEXT,
+                                 resource_id INTEGER, details TEXT, ip_address TEXT, created_at TIMESTAMP)
+    """)
+    conn.commit()
+
+    buffer = AuditBuffer(lambda: writer, flush_size=1000, flush_interval=0.05)
+    buffer.add(1, "USER_LOGIN", "users", 1)
+    buffer.close()
+    buffer.add(1, "USER_LOGOUT", "users", 1)
+
+    deadline = time.monotonic() + 5
+    while conn.execute("SELECT COUNT(*) FROM audit_logs").fetchone()[0] < 2 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert conn.execute("SELECT COUNT(*) FROM audit_logs").fetchone()[0] == 2
+    buffer.close()
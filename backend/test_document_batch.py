@@ -0,0 +1,67 @@
+"""Tests for concurrent ingestion and extraction of document batches."""
+import asyncio
+import io
+import os
+import sys
+import time
+
+import pytest
+from fastapi import UploadFile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.services import workers
+from backend.services.document_batch import ingest_and_extract
+
+
+def _read_slowly(path):
+    """Worker task: the file says how long to take."""
+    with open(path) as f:
+        text = f.read()
+    time.sleep(float(text.split()[0]))
+    return text
+
+
+@pytest.fixture(autouse=True)
+def _stop_pool():
+    yield
+    workers.shutdown_workers()
+
+
+def _uploads(*bodies):
+    return [UploadFile(io.BytesIO(body.encode()), filename=f"doc{i}.txt") for i, body in enumerate(bodies)]
+
+
+def test_extracts_in_parallel_and_in_order(tmp_path, monkeypatch):
+    monkeypatch.setattr(workers, "WORKER_PROCESSES", 3)
+    files = _uploads("2.0 first", "0.2 second", "1.0 third")
+
+    async def run():
+        # Start the worker processes (and import this module in them) first,
+        # so only extraction is timed
+        warmup = tmp_path / "warmup.txt"
+        warmup.write_text("0.5 warmup")
+        await asyncio.gather(*(workers.run_in_worker(_read_slowly, str(warmup)) for _ in range(3)))
+        started = time.monotonic()
+        documents = await ingest_and_extract(files, str(tmp_path), "u1", extractor=_read_slowly)
+        return documents, time.monotonic() - started
+
+    documents, elapsed = asyncio.run(run())
+    assert elapsed < 2.8  # one after another would take 3.2s
+    assert [d.text for d in documents] == ["2.0 first", "0.2 second", "1.0 third"]
+    assert all(d.error is None and os.path.exists(d.path) for d in documents)
+
+
+def test_slow_file_times_out_alone(tmp_path, monkeypatch):
+    monkeypatch.setattr(workers, "WORKER_PROCESSES", 2)
+    files = _uploads("0.5 fast", "30 stuck")
+
+    async def run():
+        warmup = tmp_path / "warmup.txt"
+        warmup.write_text("0.2 warmup")
+        await asyncio.gather(*(workers.run_in_worker(_read_slowly, str(warmup)) for _ in range(2)))
+        return await ingest_and_extract(files, str(tmp_path), "u1", file_timeout=3, extractor=_read_slowly)
+
+    documents = asyncio.run(run())
+    assert documents[0].text == "0.5 fast" and documents[0].error is None
+    assert documents[1].text == "" and "did not finish" in documents[1].error
@@ -0,0 +1,129 @@
+"""Golden tests: event extraction must match the original inline rules exactly."""
+import os
+import random
+import re
+import sys
+from datetime import date, datetime
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.services.event_extraction import extract_event, extract_events
+
+TODAY = date(2025, 1, 15)
+
+
+def legacy_extract_event(title, content):
+    """The rules as they were inlined in update_all_to_events (today fixed to TODAY)."""
+    update_dict = {"title": title, "content": content or ""}
+    full_text = f"{update_dict['title']}\n{update_dict['content']}"
+
+    date_patterns = [
+        r'(?:start date|begin|starts?|from)[\s:]*(?:🕓|🗓️)?[\s]*([A-Za-z]+\s+\d{1,2},?\s+\d{4})',
+        r'(?:end date|deadline|due|until|by)[\s:]*(?:🕔|🗓️)?[\s]*([A-Za-z]+\s+\d{1,2},?\s+\d{4})',
+        r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
+        r'(\d{4}[/-]\d{1,2}[/-]\d{1,2})',
+    ]
+    time_patterns = [
+        r'(\d{1,2}):(\d{2})\s*(am|pm|AM|PM)',
+        r'(\d{1,2})\s*(am|pm|AM|PM)',
+    ]
+
+    priority = "medium"
+    if re.search(r'priority[\s:]*(?:🔴|high|urgent)', full_text, re.IGNORECASE):
+        priority = "high"
+    elif re.search(r'priority[\s:]*(?:🟢|low)', full_text, re.IGNORECASE):
+        priority = "low"
+
+    status = "pending"
+    if re.search(r'status[\s:]*(?:🟢|completed|done)', full_text, re.IGNORECASE):
+        status = "completed"
+    elif re.search(r'status[\s:]*(?:🟡|in progress|ongoing)', full_text, re.IGNORECASE):
+        status = "in_progress"
+
+    start_date = None
+    start_time = "09:00"
+    for pattern in date_patterns:
+        match = re.search(pattern, full_text, re.IGNORECASE)
+        if match and 'start' in pattern:
+            try:
+                date_str = match.group(1)
+                parsed_date = datetime.strptime(date_str.replace(',', ''), '%B %d %Y')
+                start_date = parsed_date.strftime('%Y-%m-%d')
+                break
+            except:
+                pass
+
+    for keywords, default in (("(?:start|begin|from)", "09:00"), ("(?:end|deadline|by|until)", "18:00")):
+        found = default
+        for pattern in time_patterns:
+            match = re.search(keywords + '.*?' + pattern, full_text, re.IGNORECASE)
+            if match:
+                hour = int(match.group(1))
+                minute = int(match.group(2)) if len(match.groups()) > 2 and match.group(2) else 0
+                meridiem = match.group(3 if len(match.groups()) > 2 else 2).lower()
+                if meridiem == 'pm' and hour < 12:
+                    hour += 12
+                elif meridiem == 'am' and hour == 12:
+                    hour = 0
+                found = f"{hour:02d}:{minute:02d}"
+                break
+        if default == "09:00":
+            start_time = found
+        else:
+            end_time = found
+
+    if not start_date:
+        start_date = TODAY.strftime('%Y-%m-%d')
+
+    return {
+        "title": update_dict['title'],
+        "description": update_dict['content'][:500] if update_dict['content'] else update_dict['title'],
+        "start_time": start_time,
+        "end_time": end_time,
+        "date": start_date,
+        "type": "task",
+        "priority": priority,
+        "status": status
+    }
+
+
+GOLDEN = [
+    ("Sprint planning", "Start date: November 10, 2025\nStart: 10:30 am\nEnd: 4 PM\nPriority: 🔴 High\nStatus: 🟡 In progress"),
+    ("Release", "🗓️ Starts November 3 2025 from 9am until 11:15pm, priority low, status done"),
+    ("Bad date", "from Febtober 31, 2025 at 12:05 AM"),
+    ("Cross line", "start\n10:00 am\nend of day"),
+    ("Overlaps", "statustart: March 2, 2024 statusdone endeadline 7pm"),
+    ("Hour only first", "from 11 am then 3:45 pm"),
+    ("Weekend", "Attending the weekend offsite by 5 PM"),
+    ("Empty", ""),
+    ("Empty", None),
+    ("Big hour", "start at 123:45 pm, until 0 am"),
+    ("Folding", "ſtart 10 am, ENDS 5 pm, prıorıty: HIGH, İ"),
+]
+
+
+@pytest.mark.parametrize("title,content", GOLDEN)
+def test_matches_legacy_rules(title, content):
+    assert extract_event(title, content, TODAY) == legacy_extract_event(title, content)
+
+
+def test_matches_legacy_rules_on_random_text():
+    rng = random.Random(1234)
+    vocabulary = [
+        "start", "Start date:", "starts", "begin", "From", "end", "deadline", "by", "until", "BY",
+        "priority", "Priority:", "status", "Status :", "high", "urgent", "low", "done", "completed",
+        "in progress", "ongoing", "🔴", "🟢", "🟡", "🗓️", "🕓", "November", "march", "May", "Febtober",
+        "10", "3", "31,", "2025", "12", "12:00", "9:30", "11:59", "7", "am", "PM", "pm", "AM",
+        "\n", " ", ":", ",", "weekend", "restart", "baby", "x",
+        "November 10, 2025", "march 3 2024", "May 31, 2025", "Febtober 2, 2025", "June 31 2025",
+        "ſtatus", "prıority", "İ",
+    ]
+    updates = []
+    for _ in range(3000):
+        words = rng.choices(vocabulary, k=rng.randint(0, 25))
+        text = "".join(w + rng.choice(["", " ", " ", "\n"]) for w in words)
+        updates.append((rng.choice(["Task", "start 9am", "Deadline"]), text))
+
+    assert extract_events(updates, TODAY) == [legacy_extract_event(t, c) for t, c in updates]
@@ -0,0 +1,47 @@
+"""
+Tests for streaming upload ingestion.
+"""
+import asyncio
+import hashlib
+import io
+import os
+import sys
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.services import ingest
+from backend.services.ingest import ingest_to_file
+
+
+def _upload(data: bytes) -> UploadFile:
+    return UploadFile(file=io.BytesIO(data), filename="notes.txt")
+
+
+def test_ingest_to_file_streams_in_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest, "CHUNK_BYTES", 4)
+    data = b"0123456789" * 3
+    path = str(tmp_path / "docs" / "notes.txt")
+
+    result = asyncio.run(ingest_to_file(_upload(data), path,
+                                        expected_sha256=hashlib.sha256(data).hexdigest()))
+
+    assert result.size == len(data)
+    with open(path, "rb") as f:
+        assert f.read() == data
+
+
+@pytest.mark.parametrize("kwargs, status", [
+    ({"max_bytes": 5}, 413),
+    ({"expected_sha256": "0" * 64}, 400),
+])
+def test_rejected_uploads_leave_nothing_behind(tmp_path, kwargs, status):
+    path = str(tmp_path / "notes.txt")
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(ingest_to_file(_upload(b"too large to keep"), path, **kwargs))
+
+    assert error.value.status_code == status
+    assert os.listdir(tmp_path) == []
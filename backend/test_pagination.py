@@ -0,0 +1,67 @@
+import os
+import sys
+
+import pytest
+from fastapi import HTTPException
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.services.pagination import (
+    after_cursor, decode_cursor, encode_cursor, limit_clause, page_size, paginate, parse_fields, project
+)
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(["2025-11-03 10:00:00", 42])
+    assert decode_cursor(cursor, 2) == ["2025-11-03 10:00:00", 42]
+    condition, params = after_cursor(("created_at", "id"), cursor)
+    assert condition == "(created_at, id) < (?, ?)"
+    assert params == ["2025-11-03 10:00:00", 42]
+    assert after_cursor(("created_at", "id"), None) == ("", [])
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", encode_cursor([1]), encode_cursor({"a": 1})])
+def test_invalid_cursor(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor, 2)
+    assert exc.value.status_code == 400
+
+
+def test_fields():
+    assert parse_fields(None, ["id", "title"]) is None
+    assert parse_fields("title, id,title", ["id", "title"]) == ["title", "id"]
+    with pytest.raises(HTTPException) as exc:
+        parse_fields("id,secret", ["id", "title"])
+    assert exc.value.status_code == 400
+    assert project({"id": 1, "title": "a"}, ["title"]) == {"title": "a"}
+
+
+def test_keyset_pages_cover_all_rows(tmp_path):
+    import sqlite3
+    conn = sqlite3.connect(str(tmp_path / "p.db"))
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, created_at TEXT)")
+    conn.executemany("INSERT INTO t (created_at) VALUES (?)", [(f"2025-01-{i % 5 + 1:02d}",) for i in range(23)])
+
+    seen, cursor = [], None
+    while True:
+        condition, params = after_cursor(("created_at", "id"), cursor)
+        rows = conn.execute(
+            "SELECT id, created_at FROM t" + (f" WHERE {condition}" if condition else "")
+            + " ORDER BY created_at DESC, id DESC LIMIT ?", [*params, 5 + 1]
+        ).fetchall()
+        page, cursor = paginate(rows, 5, lambda row: (row[1], row[0]))
+        seen.extend(page)
+        if cursor is None:
+            break
+    expected = conn.execute("SELECT id, created_at FROM t ORDER BY created_at DESC, id DESC").fetchall()
+    assert seen == expected
+
+
+def test_unpaged_unless_requested():
+    assert page_size(None, None, 20) is None
+    assert page_size(None, encode_cursor([1]), 20) == 20
+    assert page_size(5, None, 20) == 5
+    assert limit_clause(None) == ("", [])
+    assert limit_clause(5) == (" LIMIT ?", [6])
+    rows = list(range(30))
+    assert paginate(rows, None, lambda row: (row,)) == (rows, None)
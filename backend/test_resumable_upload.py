@@ -0,0 +1,131 @@
+"""
+Tests for the resumable (tus-style) upload service.
+"""
+import asyncio
+import base64
+import hashlib
+import os
+import sys
+
+import pytest
+from fastapi import HTTPException
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.services.resumable_upload import ResumableUploadService, CHECKSUM_MISMATCH
+
+
+@pytest.fixture
+def uploads(tmp_path, monkeypatch):
+    # The database module creates its default DB in the cwd on import.
+    monkeypatch.chdir(tmp_path)
+    from backend.models.database import Database
+    database = Database(str(tmp_path / "test.db"))
+    conn = database.get_connection()
+    conn.execute("INSERT INTO users (id, username, password, name, role) VALUES (1, 'u', 'p', 'U', 'employee')")
+    conn.commit()
+    conn.close()
+    return ResumableUploadService(database, root=str(tmp_path / "partial"))
+
+
+def _body(*chunks):
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+    return stream()
+
+
+def _checksum(data: bytes) -> str:
+    return "sha256 " + base64.b64encode(hashlib.sha256(data).digest()).decode()
+
+
+def _append(uploads, upload_id, offset, data, checksum=None):
+    return asyncio.run(uploads.append(upload_id, 1, offset, _body(data[:3], data[3:]), checksum))
+
+
+def test_chunks_resume_from_the_last_verified_offset(uploads):
+    upload = uploads.create(1, "2025-11-06", "screen.mp4", total_size=10)
+
+    assert _append(uploads, upload["id"], 0, b"01234", _checksum(b"01234")) == 5
+
+    # A corrupted chunk does not advance the offset...
+    with pytest.raises(HTTPException) as error:
+        _append(uploads, upload["id"], 5, b"XXXXX", _checksum(b"56789"))
+    assert error.value.status_code == CHECKSUM_MISMATCH
+    assert uploads.get(upload["id"], 1)["upload_offset"] == 5
+
+    # ...and neither does a chunk sent at the wrong offset.
+    with pytest.raises(HTTPException) as error:
+        _append(uploads, upload["id"], 0, b"01234")
+    assert error.value.status_code == 409
+
+    assert _append(uploads, upload["id"], 5, b"56789", _checksum(b"56789")) == 10
+    with open(upload["partial_path"], "rb") as f:
+        assert f.read() == b"0123456789"
+
+
+def test_concurrent_patch_cannot_overwrite_the_chunk_being_written(uploads):
+    upload = uploads.create(1, "2025-11-06", "screen.mp4", total_size=5)
+
+    async def race():
+        started, release = asyncio.Event(), asyncio.Event()
+
+        async def slow_body():
+            yield b"012"
+            started.set()
+            await release.wait()
+            yield b"34"
+
+        first = asyncio.ensure_future(uploads.append(upload["id"], 1, 0, slow_body(), _checksum(b"01234")))
+        await started.wait()
+        # Same offset while the first PATCH is still writing, with a corrupt chunk
+        with pytest.raises(HTTPException) as error:
+            await uploads.append(upload["id"], 1, 0, _body(b"XXXXX"), _checksum(b"56789"))
+        release.set()
+        return error.value.status_code, await first
+
+    assert asyncio.run(race()) == (409, 5)
+    with open(upload["partial_path"], "rb") as f:
+        assert f.read() == b"01234"
+
+
+def test_finalize_requires_a_complete_upload_and_happens_once(uploads):
+    upload = uploads.create(1, "2025-11-06", "screen.mp4", total_size=4)
+
+    with pytest.raises(HTTPException) as error:
+        uploads.claim_for_finalize(upload["id"], 1)
+    assert error.value.status_code == 409
+
+    _append(uploads, upload["id"], 0, b"abcd")
+    assert uploads.claim_for_finalize(upload["id"], 1)["id"] == upload["id"]
+    with pytest.raises(HTTPException):
+        uploads.claim_for_finalize(upload["id"], 1)  # in progress elsewhere
+
+    uploads.mark_finalized(upload["id"], video_id=None)
+    assert uploads.claim_for_finalize(upload["id"], 1) is None
+
+
+def test_failed_finalize_can_be_retried_and_is_not_cleaned_up(uploads, tmp_path):
+    from backend.services.blob_store import BlobStore
+    store = BlobStore(uploads.db, root=str(tmp_path / "blobs"))
+    upload = uploads.create(1, "2025-11-06", "screen.mp4", total_size=4)
+    _append(uploads, upload["id"], 0, b"abcd")
+    claimed = uploads.claim_for_finalize(upload["id"], 1)
+
+    conn = uploads.db.get_connection()
+    conn.execute("UPDATE resumable_uploads SET updated_at = '2000-01-01 00:00:00'")
+    conn.commit()
+    conn.close()
+    assert uploads.cleanup_stale() == 0  # finalizing
+
+    # The blob is linked in; registering the video failed, so the claim is released.
+    blob_hash = store.put_file(claimed["partial_path"], link=True)
+    uploads.release_claim(upload["id"])
+
+    retried = uploads.claim_for_finalize(upload["id"], 1)
+    assert store.put_file(retried["partial_path"], link=True) == blob_hash
+    uploads.mark_finalized(upload["id"], video_id=None)
+    uploads.remove_partial(retried)
+    assert not os.path.exists(retried["partial_path"])
+    with open(store.path_for(blob_hash), "rb") as f:
+        assert f.read() == b"abcd"
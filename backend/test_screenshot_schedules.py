@@ -0,0 +1,142 @@
+"""
+Tests for the database-driven screenshot schedules, with a fake capture and a virtual clock.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.services.screenshot_schedules import ScreenshotScheduleService, from_timestamp
+
+START = from_timestamp("2026-01-05 09:00:00")
+
+
+class VirtualClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _fake_capture(path):
+    with open(path, "w") as f:
+        f.write(path)
+    return f"text of {os.path.basename(path)}"
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    # The database module creates its default DB in the cwd on import.
+    monkeypatch.chdir(tmp_path)
+    from backend.models.database import Database
+    database = Database(str(tmp_path / "test.db"))
+    conn = database.get_connection()
+    conn.execute("INSERT INTO users (id, username, password, name, role) VALUES (1, 'u', 'p', 'U', 'employee')")
+    conn.execute("INSERT INTO daily_sessions (id, user_id, date, status) VALUES (1, 1, '2026-01-05', 'in_progress')")
+    conn.commit()
+    conn.close()
+    yield database
+    database.close_writer()
+
+
+def _add_schedule(db, interval, duration, started_at="2026-01-05 09:00:00"):
+    conn = db.get_connection()
+    cursor = conn.execute("""
+        INSERT INTO screenshot_schedules (session_id, user_id, interval_minutes, duration_minutes, status, started_at)
+        VALUES (1, 1, ?, ?, 'active', ?)
+    """, (interval, duration, started_at))
+    conn.commit()
+    conn.close()
+    return cursor.lastrowid
+
+
+def _schedule(db, schedule_id):
+    conn = db.get_connection()
+    row = conn.execute("SELECT * FROM screenshot_schedules WHERE id = ?", (schedule_id,)).fetchone()
+    conn.close()
+    return row
+
+
+def _service(db, clock, tmp_path):
+    return ScreenshotScheduleService(db, capture=_fake_capture, clock=clock,
+                                     output_dir=str(tmp_path / "shots"), run_thread=False)
+
+
+def _tick(service):
+    dispatched = service.run_due()
+    assert service.wait_idle(5)
+    return dispatched
+
+
+def test_captures_persist_and_resume_after_restart(db, tmp_path):
+    schedule_id = _add_schedule(db, interval=10, duration=60)
+    clock = VirtualClock(START)
+    service = _service(db, clock, tmp_path)
+    assert service.start()
+
+    assert _tick(service) == 1
+    clock.now += 600
+    assert _tick(service) == 1
+    row = _schedule(db, schedule_id)
+    assert row['captures_taken'] == 2
+    assert row['last_capture_at'] == "2026-01-05 09:10:00"
+
+    conn = db.get_connection()
+    shots = conn.execute("SELECT * FROM screenshots ORDER BY id").fetchall()
+    conn.close()
+    assert [shot['capture_mode'] for shot in shots] == ['scheduled', 'scheduled']
+    assert all(os.path.exists(shot['file_path']) and shot['blob_hash'] for shot in shots)
+
+    # Down from 09:10 to 09:25: the missed 09:20 capture is taken at once, only once.
+    service.shutdown()
+    clock.now = START + 25 * 60
+    service = _service(db, clock, tmp_path)
+    assert service.start()
+    assert _tick(service) == 1
+    clock.now = START + 30 * 60
+    assert _tick(service) == 0
+    assert _schedule(db, schedule_id)['captures_taken'] == 3
+
+    clock.now = START + 60 * 60
+    assert _tick(service) == 0
+    row = _schedule(db, schedule_id)
+    assert row['status'] == 'completed'
+    assert row['captures_taken'] == 3
+    service.shutdown()
+
+
+def test_sync_follows_table(db, tmp_path):
+    expired = _add_schedule(db, interval=5, duration=30, started_at="2026-01-05 08:00:00")
+    running = _add_schedule(db, interval=5, duration=30)
+    clock = VirtualClock(START)
+    service = _service(db, clock, tmp_path)
+    assert service.start()
+
+    # Ended while the server was down
+    assert _schedule(db, expired)['status'] == 'completed'
+    assert _tick(service) == 1
+
+    # Stopped through the API, possibly by another worker
+    conn = db.get_connection()
+    conn.execute("UPDATE screenshot_schedules SET status = 'stopped' WHERE id = ?", (running,))
+    conn.commit()
+    conn.close()
+    service.sync()
+    clock.now += 300
+    assert _tick(service) == 0
+    assert _schedule(db, running)['captures_taken'] == 1
+    service.shutdown()
+
+
+def test_one_process_owns_the_schedules(db, tmp_path):
+    clock = VirtualClock(START)
+    owner = _service(db, clock, tmp_path)
+    other = _service(db, clock, tmp_path)
+    assert owner.start()
+    assert not other.start()
+    owner.shutdown()
+    assert other.start()
+    other.shutdown()
@@ -0,0 +1,76 @@
+"""Tests for bulk task insertion."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.services import task_repository
+from backend.services.task_repository import TaskRepository
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from backend.models.database import Database
+    database = Database(str(tmp_path / "tasks.db"))
+    conn = database.get_connection()
+    conn.execute("INSERT INTO users (id, username, password, name, role) VALUES (1, 'u', 'p', 'U', 'employee')")
+    conn.commit()
+    conn.close()
+    return database
+
+
+def test_bulk_insert_in_few_statements(db, monkeypatch):
+    # Small statement limit so the 200 tasks span several INSERTs
+    monkeypatch.setattr(task_repository, "MAX_VARIABLES", 3 * 64)
+    statements = []
+    conn = db.get_connection()
+    conn.set_trace_callback(statements.append)
+    cursor = conn.cursor()
+
+    repository = TaskRepository(cursor)
+    session_id = repository.today_session_id(1)
+    tasks = [
+        {"session_id": repository.today_session_id(1), "user_id": 1, "title": f"task {i}"}
+        for i in range(200)
+    ]
+    ids = repository.insert_many(tasks)
+    conn.commit()
+    writes = [s for s in statements if s.lstrip().startswith(("INSERT", "SELECT"))]
+
+    assert len(ids) == 200 and ids == sorted(ids)
+    titles = dict(conn.execute("SELECT id, title FROM tasks").fetchall())
+    assert [titles[i] for i in ids] == [f"task {i}" for i in range(200)]
+    assert {row[0] for row in conn.execute("SELECT session_id FROM tasks")} == {session_id}
+    # Session get-or-create (insert + select) once, then ceil(200 / 64) inserts
+    assert len(writes) == 2 + 4
+    conn.close()
+
+
+def test_upsert_by_source_update_keeps_ids(db):
+    conn = db.get_connection()
+    cursor = conn.cursor()
+    repository = TaskRepository(cursor)
+    session_id = repository.today_session_id(1)
+
+    def rows(titles):
+        return [
+            {"session_id": session_id, "user_id": 1, "source_update_id": update_id, "title": title}
+            for update_id, title in titles
+        ]
+
+    first = repository.insert_many(rows([(10, "a"), (11, "b")]), conflict_key=("user_id", "source_update_id"))
+    cursor.execute("UPDATE tasks SET status = 'completed' WHERE id = ?", (first[0],))
+    again = repository.insert_many(
+        rows([(12, "c"), (10, "a v2"), (11, "b")]),
+        conflict_key=("user_id", "source_update_id"),
+        update_columns=("title",),
+    )
+    conn.commit()
+
+    assert again[1:] == first and again[0] not in first
+    tasks = {row["id"]: (row["title"], row["status"]) for row in conn.execute("SELECT * FROM tasks")}
+    assert tasks == {first[0]: ("a v2", "completed"), first[1]: ("b", "pending"), again[0]: ("c", "pending")}
+    conn.close()
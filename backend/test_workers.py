@@ -0,0 +1,59 @@
+"""Tests for the worker process pool."""
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.services import workers
+
+
+def _square(x):
+    return x * x
+
+
+def _sleep(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+@pytest.fixture(autouse=True)
+def _stop_pool():
+    yield
+    workers.shutdown_workers()
+
+
+def test_run_in_worker_returns_result():
+    assert asyncio.run(workers.run_in_worker(_square, 7)) == 49
+
+
+def test_timeout_stops_task_and_pool_recovers():
+    with pytest.raises(workers.WorkerTimeout):
+        asyncio.run(workers.run_in_worker(_sleep, 30, timeout=0.5))
+    # The stuck process was replaced; new work runs on a fresh one.
+    assert asyncio.run(workers.run_in_worker(_square, 3)) == 9
+
+
+def test_timeout_spares_other_tasks(monkeypatch):
+    monkeypatch.setattr(workers, "WORKER_PROCESSES", 2)
+
+    async def run():
+        stuck = workers.run_in_worker(_sleep, 30, timeout=1)
+        other = workers.run_in_worker(_sleep, 2, timeout=10)
+        return await asyncio.gather(stuck, other, return_exceptions=True)
+
+    stuck, other = asyncio.run(run())
+    assert isinstance(stuck, workers.WorkerTimeout)
+    assert other == 2
+
+
+def test_timeout_excludes_queueing(monkeypatch):
+    monkeypatch.setattr(workers, "WORKER_PROCESSES", 1)
+
+    async def run():
+        return await asyncio.gather(*(workers.run_in_worker(_sleep, 0.6, timeout=1) for _ in range(3)))
+
+    assert asyncio.run(run()) == [0.6, 0.6, 0.6]
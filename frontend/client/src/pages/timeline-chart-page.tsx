@@ -31,7 +31,8 @@ interface UploadedFile {
 interface TimelineChartData {
   project_name: string;
   image_path: string;
-  image_base64: string | null;
+  image_url: string | null;
+  thumbnail_url: string | null;
   summary_text: string;
   created_at: string;
 }
@@ -111,7 +112,8 @@ export default function TimelineChartPage() {
       const mockData: TimelineChartData = {
         project_name: projectName,
         image_path: "/timeline-chart.png",
-        image_base64: null, // Will use a public URL instead
+        image_url: null, // Uses the public image instead
+        thumbnail_url: null,
         summary_text: `# ${projectName} - Project Timeline Analysis
 
 ## Timeline Overview